@@ -0,0 +1,489 @@
+import copy
+import cProfile
+import pstats
+import random
+import time
+import tracemalloc
+
+from minigrid.core.roomgrid import RoomGrid
+
+from game.core.array_grid import ArrayGrid
+from game.core.hazard import FireSpread
+from game.sar.env import PickupVictimEnv
+from game.sar.events import VictimRescued
+from game.sar.health import VictimHealth
+from game.sar.multi_agent import MultiAgentRescueEnv
+from game.sar.objects import (
+    FAKE_VICTIMS,
+    KIND_FAKE,
+    KIND_OTHER,
+    REAL_VICTIMS,
+    FakeVictim,
+    kind_of,
+)
+from game.sar.safety import LavaDistance
+from game.sar.shaping import PotentialShaping
+from game.sar.utils import VictimPlacer
+from utils import skip_run
+
+
+def make_env(**kwargs):
+    random.seed(0)
+    env = PickupVictimEnv(
+        num_rows=3,
+        num_cols=3,
+        render_mode="rgb_array",
+        victim_placer=VictimPlacer(num_fake_victims=3, num_real_victims=1),
+        **kwargs,
+    )
+    env.reset(seed=0)
+    return env
+
+
+def random_actions(n, seed=0):
+    rng = random.Random(seed)
+    # Turns and forward moves only, so the episode does not end early
+    return [rng.choice((0, 1, 2, 2)) for _ in range(n)]
+
+
+def run_steps(env, actions):
+    for action in actions:
+        _, _, terminated, truncated, _ = env.step(action)
+        if terminated or truncated:
+            env.reset()
+
+
+def step_allocations(env, actions):
+    """Mean peak bytes allocated while executing one step."""
+    tracemalloc.start()
+    total = 0
+    for action in actions:
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        _, _, terminated, truncated, _ = env.step(action)
+        total += tracemalloc.get_traced_memory()[1] - current
+        if terminated or truncated:
+            env.reset()
+    tracemalloc.stop()
+    return total / len(actions)
+
+
+with skip_run("run", "observation_buffers") as check, check():
+    actions = random_actions(5000)
+    for reuse in (False, True):
+        env = make_env(reuse_obs_buffers=reuse)
+        allocated = step_allocations(env, actions[:1000])
+
+        env.reset(seed=0)
+        start = time.perf_counter()
+        run_steps(env, actions)
+        rate = len(actions) / (time.perf_counter() - start)
+
+        print(
+            f"reuse_obs_buffers={reuse!s:5}: {rate:8.0f} steps/s, "
+            f"{allocated:8.0f} bytes allocated per step"
+        )
+
+
+with skip_run("run", "step_fast") as check, check():
+    actions = random_actions(5000)
+    env = make_env()
+    for name, step in (("step", env.step), ("step_fast", env.step_fast)):
+        env.reset(seed=0)
+        start = time.perf_counter()
+        for action in actions:
+            result = step(action)
+            if result[-3] or result[-2]:
+                env.reset()
+        rate = len(actions) / (time.perf_counter() - start)
+        print(f"{name:9}: {rate:8.0f} steps/s")
+
+
+with skip_run("run", "snapshot_restore") as check, check():
+    env = make_env()
+    actions = random_actions(20)
+    n = 2000
+
+    start = time.perf_counter()
+    for _ in range(n):
+        snap = env.snapshot()
+    snapshot_rate = n / (time.perf_counter() - start)
+
+    # Branch from the same state over and over, as a tree search would
+    start = time.perf_counter()
+    for _ in range(n):
+        for action in actions:
+            env.step_fast(action)
+        env.restore(snap)
+    branch_rate = n / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(n):
+        env.restore(snap)
+    restore_rate = n / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(50):
+        copy.deepcopy(env)
+    deepcopy_rate = 50 / (time.perf_counter() - start)
+
+    print(f"snapshot          : {snapshot_rate:10.0f} /s")
+    print(f"restore           : {restore_rate:10.0f} /s")
+    print(f"20 steps + restore: {branch_rate:10.0f} /s")
+    print(f"copy.deepcopy(env): {deepcopy_rate:10.0f} /s")
+
+
+with skip_run("run", "victim_flyweights") as check, check():
+    # Fake victim placements of a large map: 20x20 rooms with 12 fakes each
+    rng = random.Random(0)
+    variants = [
+        (rng.choice(VictimPlacer.SHIFTS), rng.choice(VictimPlacer.DIRECTIONS))
+        for _ in range(20 * 20 * 12)
+    ]
+    for name, make in (("per placement", FakeVictim), ("flyweight", FakeVictim.shared)):
+        tracemalloc.start()
+        objects = [make(shift, direction, color="red") for shift, direction in variants]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"{name:13}: {len(objects)} fake victims, {size / 1024:8.1f} KiB")
+
+    random.seed(0)
+    env = PickupVictimEnv(
+        num_rows=4,
+        num_cols=4,
+        render_mode="rgb_array",
+        victim_placer=VictimPlacer(num_fake_victims=12, num_real_victims=2),
+    )
+    env.reset(seed=0)
+
+    # Victim dispatch as done by RescueAction and the victim counts
+    storage = env.grid.grid
+    n = 200
+    start = time.perf_counter()
+    for _ in range(n):
+        for obj in storage:
+            isinstance(obj, REAL_VICTIMS) or isinstance(obj, FAKE_VICTIMS)
+    isinstance_rate = n * len(storage) / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for _ in range(n):
+        for obj in storage:
+            kind_of(obj) != KIND_OTHER
+    kind_rate = n * len(storage) / (time.perf_counter() - start)
+    print(f"isinstance dispatch: {isinstance_rate / 1e6:6.1f} M cells/s")
+    print(f"kind code dispatch : {kind_rate / 1e6:6.1f} M cells/s")
+
+    # Rescue a fake victim from the same state over and over
+    env.agent_pos = next(
+        (x - 1, y)
+        for y in range(env.height)
+        for x in range(1, env.width)
+        if getattr(env.grid.get(x, y), "kind", None) == KIND_FAKE
+        and env.grid.get(x - 1, y) is None
+    )
+    env.agent_dir = 0
+    snap = env.snapshot()
+    start = time.perf_counter()
+    for _ in range(5000):
+        env.step_fast(env.actions.pickup)
+        env.restore(snap)
+    print(f"pickup + restore   : {5000 / (time.perf_counter() - start):8.0f} /s")
+
+
+with skip_run("run", "layout_reuse") as check, check():
+    for reuse in (False, True):
+        env = make_env(reuse_layout=reuse)
+        start = time.perf_counter()
+        for _ in range(100):
+            env.reset()
+        rate = 100 / (time.perf_counter() - start)
+        print(f"reuse_layout={reuse!s:5}: {rate:8.1f} resets/s")
+
+
+with skip_run("run", "reset_profile") as check, check():
+    env = make_env()
+    n = 200
+    for name, build in (
+        ("RoomGrid._gen_grid", lambda: RoomGrid._gen_grid(env, env.width, env.height)),
+        ("wall template", lambda: env._gen_rooms(env.width, env.height)),
+    ):
+        start = time.perf_counter()
+        for _ in range(n):
+            build()
+        print(f"{name:18}: {(time.perf_counter() - start) / n * 1e6:8.1f} us per build")
+
+    # Share of the room building in a full reset
+    profiler = cProfile.Profile()
+    profiler.enable()
+    for _ in range(20):
+        env.reset()
+    profiler.disable()
+    stats = pstats.Stats(profiler)
+    shares = {}
+    for (_, _, func), (_, _, _, cumulative, _) in stats.stats.items():
+        if func in ("_gen_rooms", "connect_all", "gen_contents"):
+            shares[func] = shares.get(func, 0) + cumulative / stats.total_tt
+    for func, share in shares.items():
+        print(f"{func:18}: {share:6.1%} of reset time")
+
+
+with skip_run("run", "array_grid") as check, check():
+    env = make_env()
+    levels = 1000
+    for name, store in (
+        ("Grid", lambda grid: copy.deepcopy(grid)),
+        ("ArrayGrid", ArrayGrid.from_grid),
+    ):
+        tracemalloc.start()
+        kept = [store(env.grid) for _ in range(levels)]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"{name:9}: {size / levels / 1024:7.1f} KiB per level")
+
+    compact = kept[0]
+    for name, grid in (("Grid", env.grid), ("ArrayGrid", compact)):
+        env.grid = grid
+        start = time.perf_counter()
+        for _ in range(1000):
+            env._count_objects_by_kind(KIND_FAKE)
+        elapsed = time.perf_counter() - start
+        print(f"{name:9}: {elapsed * 1e3:7.1f} us per victim count")
+
+
+with skip_run("run", "large_map") as check, check():
+    # Per-step cost (step, mission status and camera frame) should not grow
+    # with the map; generation grows with the number of rooms
+    for size in (3, 6, 10, 20):
+        random.seed(0)
+        env = PickupVictimEnv(
+            num_rows=size,
+            num_cols=size,
+            large_map=True,
+            render_mode="rgb_array",
+            victim_placer=VictimPlacer(num_fake_victims=1, num_real_victims=1),
+        )
+        start = time.perf_counter()
+        env.reset(seed=0)
+        generation = time.perf_counter() - start
+
+        # Warm up the tile render cache first
+        for action in random_actions(100, seed=1):
+            env.step(action)
+            env.render()
+
+        actions = random_actions(1000)
+        start = time.perf_counter()
+        for action in actions:
+            env.step(action)
+            env.get_mission_status()
+            env.render()
+        step = (time.perf_counter() - start) / len(actions)
+        print(
+            f"{size:2}x{size:<2} rooms: {generation:6.2f} s generation, "
+            f"{step * 1e3:6.2f} ms per step + frame"
+        )
+
+
+with skip_run("run", "multi_agent") as check, check():
+    # One team env against one single-agent env per agent
+    steps = 500
+    for num_agents in (1, 4, 16):
+        rng = random.Random(0)
+        actions = [
+            [rng.choice((0, 1, 2, 2, 3, 5)) for _ in range(num_agents)]
+            for _ in range(steps)
+        ]
+
+        random.seed(0)
+        team = MultiAgentRescueEnv(
+            num_agents=num_agents,
+            large_map=True,
+            render_mode="rgb_array",
+            victim_placer=VictimPlacer(num_fake_victims=3, num_real_victims=1),
+        )
+        team.reset(seed=0)
+        elapsed = 0.0
+        for joint in actions:
+            start = time.perf_counter()
+            _, _, terminated, truncated, _ = team.step(joint)
+            elapsed += time.perf_counter() - start
+            if terminated or truncated:
+                team.reset()
+        team_rate = steps / elapsed
+
+        envs = [make_env(large_map=True) for _ in range(num_agents)]
+        elapsed = 0.0
+        for joint in actions:
+            start = time.perf_counter()
+            results = [env.step(action) for env, action in zip(envs, joint)]
+            elapsed += time.perf_counter() - start
+            for env, (_, _, terminated, truncated, _) in zip(envs, results):
+                if terminated or truncated:
+                    env.reset()
+        separate_rate = steps / elapsed
+
+        print(
+            f"{num_agents:2} agents: team {team_rate:7.0f} joint steps/s, "
+            f"separate envs {separate_rate:7.0f} joint steps/s"
+        )
+
+
+with skip_run("run", "fire_spread") as check, check():
+    # Overhead of the spreading fire per step, against the map size. Turns
+    # only, so the agent stays put while the fire grows
+    steps = 300
+    for size in (3, 6, 10, 20):
+        rates = []
+        for fire in (None, FireSpread(spread_probability=0.02)):
+            random.seed(0)
+            env = PickupVictimEnv(
+                num_rows=size,
+                num_cols=size,
+                large_map=True,
+                fire_spread=fire,
+                victim_placer=VictimPlacer(num_fake_victims=1, num_real_victims=1),
+            )
+            env.reset(seed=0)
+            elapsed = 0.0
+            for _ in range(steps):
+                start = time.perf_counter()
+                _, _, terminated, truncated, _ = env.step(env.actions.left)
+                elapsed += time.perf_counter() - start
+                if terminated or truncated:
+                    env.reset()
+            rates.append(elapsed / steps)
+        print(
+            f"{size:2}x{size:<2} rooms ({env.width}x{env.height} cells): "
+            f"{rates[0] * 1e3:6.3f} ms per step, {rates[1] * 1e3:6.3f} ms with fire "
+            f"({(rates[1] - rates[0]) * 1e6:+5.0f} us)"
+        )
+
+
+with skip_run("run", "victim_health") as check, check():
+    # Per-step cost of the health timers with hundreds of victims, some of
+    # them running out during the run
+    steps = 500
+    rates = []
+    for health in (None, VictimHealth()):
+        random.seed(0)
+        env = PickupVictimEnv(
+            num_rows=10,
+            num_cols=10,
+            large_map=True,
+            add_lava=False,
+            victim_health=health,
+            victim_placer=VictimPlacer(num_fake_victims=1, num_real_victims=3),
+        )
+        env.reset(seed=0)
+        elapsed = 0.0
+        for action in random_actions(steps):
+            start = time.perf_counter()
+            _, _, terminated, truncated, _ = env.step(action)
+            elapsed += time.perf_counter() - start
+            if terminated or truncated:
+                env.reset()
+        rates.append(elapsed / steps)
+    print(
+        f"{len(health.positions)} victims, {env.lost_victims} lost: "
+        f"{rates[0] * 1e3:.3f} ms per step, {rates[1] * 1e3:.3f} ms with health "
+        f"({(rates[1] - rates[0]) * 1e6:+.0f} us)"
+    )
+
+
+with skip_run("run", "fog_of_war") as check, check():
+    # Seen-cells tracking on every observation, fog overlay on every frame
+    actions = random_actions(500)
+    for fog in (False, True):
+        env = make_env(fog_of_war=fog)
+        run_steps(env, actions[:50])
+        start = time.perf_counter()
+        run_steps(env, actions)
+        step = (time.perf_counter() - start) / len(actions)
+        # Fill minigrid's tile cache
+        env.render()
+        start = time.perf_counter()
+        for _ in range(100):
+            env.render()
+        frame = (time.perf_counter() - start) / 100
+        coverage = f", {env.seen_cells.coverage:.0%} seen" if fog else ""
+        print(
+            f"fog {'on ' if fog else 'off'}: {step * 1e3:.3f} ms per step, "
+            f"{frame * 1e3:.2f} ms per frame{coverage}"
+        )
+
+
+with skip_run("run", "lava_distance") as check, check():
+    # The field is built once per level, then "how far is the lava?" is a
+    # lookup instead of a search
+    for size in (3, 10, 20):
+        random.seed(0)
+        safety = LavaDistance()
+        env = PickupVictimEnv(
+            num_rows=size,
+            num_cols=size,
+            large_map=True,
+            lava_distance=safety,
+            victim_placer=VictimPlacer(num_fake_victims=1, num_real_victims=1),
+        )
+        env.reset(seed=0)
+        start = time.perf_counter()
+        safety.reset(env.grid)
+        build = time.perf_counter() - start
+
+        rng = random.Random(0)
+        cells = [
+            (rng.randrange(env.width), rng.randrange(env.height))
+            for _ in range(10_000)
+        ]
+        start = time.perf_counter()
+        for pos in cells:
+            safety[pos]
+        lookup = (time.perf_counter() - start) / len(cells)
+        print(
+            f"{size:2}x{size:<2} rooms: {build * 1e3:6.1f} ms per level, "
+            f"{lookup * 1e6:.2f} us per lookup"
+        )
+
+
+with skip_run("run", "shaping") as check, check():
+    # The distance fields are built on reset and updated in place on
+    # rescues, unlocks and key pickups, every other step reads them
+    steps = 300
+    for size in (3, 10, 20):
+        rates = []
+        for shaped in (False, True):
+            random.seed(0)
+            env = PickupVictimEnv(
+                num_rows=size,
+                num_cols=size,
+                large_map=True,
+                victim_placer=VictimPlacer(num_fake_victims=1, num_real_victims=5),
+            )
+            if shaped:
+                env = PotentialShaping(env)
+            env.reset(seed=0)
+            rng = random.Random(0)
+            elapsed = 0.0
+            for _ in range(steps):
+                action = rng.choice((0, 1, 2, 2, 3, 5))
+                start = time.perf_counter()
+                _, _, terminated, truncated, _ = env.step(action)
+                elapsed += time.perf_counter() - start
+                if terminated or truncated:
+                    env.reset()
+            rates.append(elapsed / steps)
+        start = time.perf_counter()
+        env._scan()
+        env.distance()
+        build = time.perf_counter() - start
+        base = env.unwrapped
+        rescues = sorted(env._victims)[:20]
+        start = time.perf_counter()
+        for pos in rescues:
+            base.events.emit(VictimRescued, pos, base.grid.get(*pos))
+            env.distance()
+        rescue = (time.perf_counter() - start) / len(rescues)
+        print(
+            f"{size:2}x{size:<2} rooms: {rates[0] * 1e3:6.3f} ms per step, "
+            f"{rates[1] * 1e3:6.3f} ms shaped, {build * 1e3:5.1f} ms to build, "
+            f"{rescue * 1e3:5.2f} ms per rescue update"
+        )
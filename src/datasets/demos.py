@@ -0,0 +1,173 @@
+"""
+Expert demonstrations generated by the scripted rescue bot.
+
+Episodes are played in a process pool; each worker replays its episodes
+into egocentric observations and the parent appends them to a sharded
+memory-mapped dataset (see ``offline.py``)::
+
+    python -m src.datasets.demos demos/ --episodes 10000 --workers 8
+"""
+
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ..game_recorder import GameRecorder
+from .offline import ShardWriter, replay_observations
+
+DEFAULT_ENV = {"num_rows": 3, "num_cols": 3, "lava_per_room": 1}
+DEFAULT_VICTIMS = {"num_fake_victims": 3, "num_real_victims": 1}
+
+
+def make_env(env_kwargs=None, victim_kwargs=None):
+    """Create a headless ``PickupVictimEnv`` for batch generation."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from ..game.sar.env import PickupVictimEnv
+    from ..game.sar.utils import VictimPlacer
+
+    return PickupVictimEnv(
+        render_mode="rgb_array",
+        victim_placer=VictimPlacer(**{**DEFAULT_VICTIMS, **(victim_kwargs or {})}),
+        **{**DEFAULT_ENV, **(env_kwargs or {})},
+    )
+
+
+def play_episodes(seeds, env_kwargs=None, victim_kwargs=None, view_size=7):
+    """
+    Play one bot episode per seed.
+
+    Args:
+        seeds: Level seeds (also used to seed the placers)
+        env_kwargs: Extra ``PickupVictimEnv`` arguments
+        victim_kwargs: ``VictimPlacer`` arguments
+        view_size: Side of the egocentric observation
+
+    Returns:
+        list: ``(obs, actions, rewards, meta)`` per episode
+    """
+    from ..game.sar.bot import RescueBot, run_episode
+
+    env = make_env(env_kwargs, victim_kwargs)
+    bot = RescueBot(env)
+    recorder = GameRecorder(env)
+    episodes = []
+    for seed in seeds:
+        random.seed(seed)
+        env.reset(seed=seed)
+        recorder.start()
+        actions, rewards, success = run_episode(env, bot, on_step=recorder.step)
+        rec = recorder.recording
+        meta = {
+            "seed": int(seed),
+            "success": success,
+            "config": rec.config,
+            "max_steps": rec.config["max_steps"],
+            "agent_start_pos": [int(v) for v in rec.agent_start_pos],
+            "agent_start_dir": int(rec.agent_start_dir),
+        }
+        episodes.append(
+            (replay_observations(rec, view_size), actions, rewards, meta)
+        )
+    return episodes
+
+
+def _play_chunk(args):
+    return play_episodes(*args)
+
+
+def generate_demos(
+    out_dir,
+    num_episodes,
+    workers=None,
+    seed=0,
+    chunk_size=16,
+    env_kwargs=None,
+    victim_kwargs=None,
+    only_success=True,
+    shard_size=100_000,
+    view_size=7,
+):
+    """
+    Generate bot demonstrations into a sharded memory-mapped dataset.
+
+    Args:
+        out_dir: Output directory
+        num_episodes: Number of levels to play
+        workers: Worker processes (None = one per CPU, 1 = no pool)
+        seed: First level seed; episode ``k`` uses ``seed + k``
+        chunk_size: Episodes per worker task
+        env_kwargs: Extra ``PickupVictimEnv`` arguments
+        victim_kwargs: ``VictimPlacer`` arguments
+        only_success: Skip episodes the bot could not finish
+        shard_size: Transitions per shard
+        view_size: Side of the egocentric observation
+
+    Returns:
+        dict: ``episodes``, ``successes``, ``transitions``, ``seconds``,
+        ``demos_per_sec`` and ``steps_per_sec``
+    """
+    seeds = list(range(seed, seed + num_episodes))
+    tasks = [
+        (seeds[k : k + chunk_size], env_kwargs, victim_kwargs, view_size)
+        for k in range(0, len(seeds), chunk_size)
+    ]
+    writer = ShardWriter(out_dir, shard_size=shard_size, view_size=view_size)
+    successes = 0
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = map(_play_chunk, tasks)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(_play_chunk, tasks)
+    try:
+        for chunk in results:
+            for obs, actions, rewards, meta in chunk:
+                successes += meta["success"]
+                if only_success and not meta["success"]:
+                    continue
+                writer.add_episode(obs, actions, rewards, meta)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    writer.close()
+    seconds = time.perf_counter() - start
+
+    return {
+        "episodes": num_episodes,
+        "successes": successes,
+        "transitions": writer.num_steps,
+        "seconds": seconds,
+        "demos_per_sec": num_episodes / seconds,
+        "steps_per_sec": writer.num_steps / seconds,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("out_dir")
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rows", type=int, default=DEFAULT_ENV["num_rows"])
+    parser.add_argument("--cols", type=int, default=DEFAULT_ENV["num_cols"])
+    parser.add_argument("--keep-failures", action="store_true")
+    args = parser.parse_args()
+
+    stats = generate_demos(
+        args.out_dir,
+        args.episodes,
+        workers=args.workers,
+        seed=args.seed,
+        env_kwargs={"num_rows": args.rows, "num_cols": args.cols},
+        only_success=not args.keep_failures,
+    )
+    print(
+        f"{stats['episodes']} episodes ({stats['successes']} solved), "
+        f"{stats['transitions']} transitions in {stats['seconds']:.1f}s: "
+        f"{stats['demos_per_sec']:.1f} demos/s, {stats['steps_per_sec']:.0f} steps/s"
+    )
@@ -0,0 +1,362 @@
+"""
+Offline-RL dataset built from game recordings.
+
+Recordings are replayed into fixed-size egocentric observations and written
+to sharded ``.npy`` files. Shards are opened with ``mmap_mode="r"`` so a
+minibatch only reads the rows it needs instead of loading whole shards.
+
+Layout on disk::
+
+    out_dir/
+        metadata.json           # shards, episode boundaries, level config
+        shard_00000/obs.npy     # (N, view, view) int8 object ids
+        shard_00000/action.npy  # (N,) uint8
+        shard_00000/reward.npy  # (N,) float32
+        shard_00000/done.npy    # (N,) bool
+        shard_00000/episode.npy # (N,) int32 global episode index
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from ..game_recorder import OBJ_TO_ID, GameRecording, load
+
+FIELDS = {
+    "obs": np.int8,
+    "action": np.uint8,
+    "reward": np.float32,
+    "done": np.bool_,
+    "episode": np.int32,
+}
+
+# Direction index -> forward vector (right, down, left, up), as in minigrid
+DIR_TO_VEC = ((1, 0), (0, 1), (-1, 0), (0, -1))
+
+EMPTY = OBJ_TO_ID[None]
+WALL = OBJ_TO_ID["Wall"]
+DOOR = OBJ_TO_ID["Door"]
+KEY = OBJ_TO_ID["Key"]
+LAVA = OBJ_TO_ID["Lava"]
+PICKUP_IDS = (OBJ_TO_ID["Victim"], OBJ_TO_ID["FakeVictim"])
+
+
+def view_offsets(view_size):
+    """
+    Offsets from the agent to every cell of its egocentric view.
+
+    The view uses the minigrid convention: index ``[i, j]`` with the agent at
+    ``(view_size // 2, view_size - 1)`` looking towards ``j = 0``.
+
+    Returns:
+        np.ndarray: Array of shape (4, 2, view_size, view_size) with the
+        x and y offsets for each agent direction.
+    """
+    i, j = np.meshgrid(np.arange(view_size), np.arange(view_size), indexing="ij")
+    ahead = view_size - 1 - j
+    side = i - view_size // 2
+    offsets = np.zeros((4, 2, view_size, view_size), dtype=np.int32)
+    for d, (fx, fy) in enumerate(DIR_TO_VEC):
+        rx, ry = -fy, fx
+        offsets[d, 0] = fx * ahead + rx * side
+        offsets[d, 1] = fy * ahead + ry * side
+    return offsets
+
+
+def egocentric_view(grid, x, y, direction, offsets):
+    """Crop an id grid (height x width) around the agent. Outside cells are walls."""
+    h, w = grid.shape
+    xs = x + offsets[direction, 0]
+    ys = y + offsets[direction, 1]
+    inside = (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+    view = np.full(xs.shape, WALL, dtype=np.int8)
+    view[inside] = grid[ys[inside], xs[inside]]
+    return view
+
+
+def iter_replay(rec: GameRecording):
+    """
+    Replay a recording on its id grid.
+
+    When the recording stores agent poses they are used directly. Older
+    recordings without poses are simulated: doors are assumed to open when
+    toggled since the id grid does not keep lock state.
+
+    Yields:
+        tuple: ``(x, y, direction, grid)`` before each action and once more
+        after the last one. ``grid`` is updated in place between yields.
+    """
+    grid = np.array(rec.grid, dtype=np.int8, copy=True)
+    h, w = grid.shape
+    x, y = rec.agent_start_pos
+    d = rec.agent_start_dir
+    poses = getattr(rec, "poses", None) or []
+    carrying = EMPTY
+    open_doors = set()
+
+    for t, action in enumerate(rec.actions):
+        yield x, y, d, grid
+
+        fx, fy = x + DIR_TO_VEC[d][0], y + DIR_TO_VEC[d][1]
+        cell = grid[fy, fx] if 0 <= fx < w and 0 <= fy < h else WALL
+
+        if action == 0:
+            d = (d - 1) % 4
+        elif action == 1:
+            d = (d + 1) % 4
+        elif action == 2:
+            if cell in (EMPTY, LAVA) or (cell == DOOR and (fx, fy) in open_doors):
+                x, y = fx, fy
+        else:
+            carrying = _interact(grid, fx, fy, cell, action, carrying, open_doors)
+
+        if t < len(poses):
+            x, y, d = poses[t]
+
+    yield x, y, d, grid
+
+
+def _interact(grid, fx, fy, cell, action, carrying, open_doors):
+    """Apply a pickup, drop or toggle on the front cell; return what is carried."""
+    if action == 3:
+        if cell in PICKUP_IDS:
+            grid[fy, fx] = EMPTY
+        elif cell == KEY and carrying == EMPTY:
+            carrying = KEY
+            grid[fy, fx] = EMPTY
+    elif action == 4:
+        if cell == EMPTY and carrying != EMPTY:
+            grid[fy, fx] = carrying
+            carrying = EMPTY
+    elif action == 5:
+        if cell == DOOR:
+            open_doors ^= {(fx, fy)}
+    return carrying
+
+
+def replay_observations(rec: GameRecording, view_size=7):
+    """
+    Return the egocentric observation before each action of a recording.
+
+    Args:
+        rec: Recording to replay
+        view_size: Side of the square egocentric view
+
+    Returns:
+        np.ndarray: Observations of shape (num_actions, view_size, view_size)
+    """
+    offsets = view_offsets(view_size)
+    obs = np.empty((len(rec.actions), view_size, view_size), dtype=np.int8)
+    for t, (x, y, d, grid) in enumerate(iter_replay(rec)):
+        if t == len(obs):
+            break
+        obs[t] = egocentric_view(grid, x, y, d, offsets)
+    return obs
+
+
+class ShardWriter:
+    """Accumulates transitions and flushes them to fixed-size memory-mappable shards."""
+
+    def __init__(self, out_dir, shard_size=100_000, view_size=7):
+        """
+        Args:
+            out_dir: Directory the dataset is written to
+            shard_size: Number of transitions per shard
+            view_size: Side of the egocentric observation
+        """
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.shard_size = shard_size
+        self.view_size = view_size
+        self.shards = []
+        self.episodes = []
+        self.num_steps = 0
+        self._pending = {name: [] for name in FIELDS}
+        self._pending_len = 0
+
+    def add_episode(self, obs, actions, rewards, meta=None):
+        """
+        Append one episode.
+
+        Args:
+            obs: Observations of shape (T, view_size, view_size)
+            actions: T actions
+            rewards: T rewards
+            meta: Extra level metadata stored with the episode boundaries
+        """
+        length = len(actions)
+        if length == 0:
+            return
+        episode = len(self.episodes)
+        done = np.zeros(length, dtype=np.bool_)
+        done[-1] = True
+
+        columns = {
+            "obs": np.asarray(obs, dtype=FIELDS["obs"]),
+            "action": np.asarray(actions, dtype=FIELDS["action"]),
+            "reward": np.asarray(rewards, dtype=FIELDS["reward"]),
+            "done": done,
+            "episode": np.full(length, episode, dtype=FIELDS["episode"]),
+        }
+        self.episodes.append(
+            {"start": self.num_steps, "length": length, **(meta or {})}
+        )
+        self.num_steps += length
+
+        for name, column in columns.items():
+            self._pending[name].append(column)
+        self._pending_len += length
+        while self._pending_len >= self.shard_size:
+            self._flush(self.shard_size)
+
+    def add_recording(self, rec: GameRecording, source=None):
+        """Replay a recording and append it as one episode."""
+        meta = {
+            "source": str(source) if source is not None else None,
+            "timestamp": rec.timestamp,
+            "config": rec.config,
+            "max_steps": rec.config.get("max_steps"),
+            "agent_start_pos": [int(v) for v in rec.agent_start_pos],
+            "agent_start_dir": int(rec.agent_start_dir),
+        }
+        obs = replay_observations(rec, self.view_size)
+        self.add_episode(obs, rec.actions, rec.rewards, meta)
+
+    def _flush(self, size):
+        """Write the first ``size`` pending transitions as a new shard."""
+        shard_dir = self.out_dir / f"shard_{len(self.shards):05d}"
+        shard_dir.mkdir(exist_ok=True)
+        for name in FIELDS:
+            data = np.concatenate(self._pending[name])
+            np.save(shard_dir / f"{name}.npy", data[:size])
+            self._pending[name] = [data[size:]]
+        self._pending_len -= size
+        self.shards.append({"path": shard_dir.name, "length": size})
+
+    def close(self):
+        """Flush the remaining transitions and write the metadata file."""
+        if self._pending_len:
+            self._flush(self._pending_len)
+        metadata = {
+            "view_size": self.view_size,
+            "num_steps": self.num_steps,
+            "shards": self.shards,
+            "episodes": self.episodes,
+        }
+        with open(self.out_dir / "metadata.json", "w") as f:
+            json.dump(metadata, f)
+
+
+class MemmapDataset:
+    """Read-only view of a sharded dataset with random minibatch sampling."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        with open(self.root / "metadata.json") as f:
+            self.metadata = json.load(f)
+        self.episodes = self.metadata["episodes"]
+        lengths = [shard["length"] for shard in self.metadata["shards"]]
+        # offsets[k] is the global index of the first transition in shard k
+        self.offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        self._shards = [None] * len(lengths)
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def shard(self, k):
+        """Return the memory-mapped arrays of shard ``k``, opening them lazily."""
+        if self._shards[k] is None:
+            shard_dir = self.root / self.metadata["shards"][k]["path"]
+            self._shards[k] = {
+                name: np.load(shard_dir / f"{name}.npy", mmap_mode="r")
+                for name in FIELDS
+            }
+        return self._shards[k]
+
+    def gather(self, indices):
+        """Gather transitions at the given global indices."""
+        indices = np.asarray(indices, dtype=np.int64)
+        view_size = self.metadata["view_size"]
+        batch = {
+            name: np.empty(
+                indices.shape + ((view_size, view_size) if name == "obs" else ()),
+                dtype=dtype,
+            )
+            for name, dtype in FIELDS.items()
+        }
+        shard_ids = np.searchsorted(self.offsets, indices, side="right") - 1
+        for k in np.unique(shard_ids):
+            mask = shard_ids == k
+            local = indices[mask] - self.offsets[k]
+            order = np.argsort(local)
+            arrays = self.shard(k)
+            for name in FIELDS:
+                # Sorted reads keep page access sequential within the shard
+                rows = np.empty((len(local),) + arrays[name].shape[1:], FIELDS[name])
+                rows[order] = arrays[name][local[order]]
+                batch[name][mask] = rows
+        return batch
+
+    def sample(self, batch_size, rng=None):
+        """
+        Draw a random minibatch of transitions.
+
+        Args:
+            batch_size: Number of transitions
+            rng: Optional numpy Generator
+
+        Returns:
+            dict: Arrays keyed by ``obs``, ``action``, ``reward``, ``done``, ``episode``
+        """
+        rng = rng or np.random.default_rng()
+        return self.gather(rng.integers(0, len(self), size=batch_size))
+
+    def episode(self, i):
+        """Return all transitions of episode ``i`` together with its metadata."""
+        info = self.episodes[i]
+        batch = self.gather(np.arange(info["start"], info["start"] + info["length"]))
+        batch["meta"] = info
+        return batch
+
+
+def export_recordings(paths, out_dir, shard_size=100_000, view_size=7):
+    """
+    Convert recording pickles into a sharded memory-mapped dataset.
+
+    Recordings are loaded one at a time, so memory use is bounded by a single
+    recording plus one shard.
+
+    Args:
+        paths: Iterable of recording file paths
+        out_dir: Output directory
+        shard_size: Number of transitions per shard
+        view_size: Side of the egocentric observation
+
+    Returns:
+        MemmapDataset: The exported dataset
+    """
+    writer = ShardWriter(out_dir, shard_size=shard_size, view_size=view_size)
+    for path in paths:
+        writer.add_recording(load(path), source=path)
+    writer.close()
+    return MemmapDataset(out_dir)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("recordings", type=Path, help="directory of .pkl recordings")
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--shard-size", type=int, default=100_000)
+    parser.add_argument("--view-size", type=int, default=7)
+    args = parser.parse_args()
+
+    dataset = export_recordings(
+        sorted(args.recordings.glob("*.pkl")),
+        args.out_dir,
+        shard_size=args.shard_size,
+        view_size=args.view_size,
+    )
+    print(f"Exported {len(dataset.episodes)} episodes, {len(dataset)} transitions")
@@ -0,0 +1,210 @@
+"""
+Per-episode metrics for a directory of game recordings.
+
+Recordings are scanned in parallel with a process pool and collected into a
+single summary table (one row per recording)::
+
+    python -m src.features.recording_metrics recordings/ --out summary.csv
+"""
+
+import csv
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from ..datasets.offline import DIR_TO_VEC, EMPTY, LAVA, WALL, iter_replay
+from ..game_recorder import OBJ_TO_ID, load
+
+VICTIM = OBJ_TO_ID["Victim"]
+FAKE_VICTIM = OBJ_TO_ID["FakeVictim"]
+DOOR = OBJ_TO_ID["Door"]
+
+COLUMNS = [
+    "file",
+    "timestamp",
+    "num_rows",
+    "num_cols",
+    "room_size",
+    "victims_total",
+    "victims_saved",
+    "fake_pickups",
+    "lava_death",
+    "steps",
+    "max_steps",
+    "step_ratio",
+    "moves",
+    "path_efficiency",
+    "steps_per_victim",
+    "total_reward",
+]
+
+
+def shortest_moves(grid, start, goal):
+    """
+    Number of forward moves from ``start`` to a cell next to ``goal``.
+
+    Only empty cells and doors are walkable; lava, walls and other objects
+    block the path.
+
+    Returns:
+        int | None: Move count, or None if no path exists.
+    """
+    h, w = grid.shape
+    gx, gy = goal
+    targets = {(gx + dx, gy + dy) for dx, dy in DIR_TO_VEC}
+    seen = {start}
+    queue = deque([(start, 0)])
+    while queue:
+        (x, y), dist = queue.popleft()
+        if (x, y) in targets:
+            return dist
+        for dx, dy in DIR_TO_VEC:
+            nx, ny = x + dx, y + dy
+            if (nx, ny) in seen or not (0 <= nx < w and 0 <= ny < h):
+                continue
+            if grid[ny, nx] not in (EMPTY, DOOR):
+                continue
+            seen.add((nx, ny))
+            queue.append(((nx, ny), dist + 1))
+    return None
+
+
+def episode_metrics(path):
+    """
+    Compute the metrics of a single recording.
+
+    Path efficiency compares, for each stretch between two rescues, the
+    shortest walkable route to the rescued victim with the forward moves the
+    participant actually made (1.0 means every rescue was reached optimally).
+
+    Args:
+        path: Recording pickle path
+
+    Returns:
+        dict: One summary-table row keyed by ``COLUMNS``
+    """
+    rec = load(path)
+    config = rec.config or {}
+    max_steps = config.get("max_steps")
+
+    victims_total = int(np.count_nonzero(rec.grid == VICTIM))
+    saved = fakes = moves = 0
+    optimal_moves = actual_moves = 0
+    segment_start, segment_moves = tuple(rec.agent_start_pos), 0
+    rescue_steps = []
+    lava_death = False
+
+    replay = iter_replay(rec)
+    x, y, d, grid = next(replay)
+    for t, action in enumerate(rec.actions):
+        fx, fy = x + DIR_TO_VEC[d][0], y + DIR_TO_VEC[d][1]
+        h, w = grid.shape
+        cell = grid[fy, fx] if 0 <= fx < w and 0 <= fy < h else WALL
+
+        if action == 3 and cell == VICTIM:
+            best = shortest_moves(grid, segment_start, (fx, fy))
+            if best is not None:
+                optimal_moves += best
+                actual_moves += segment_moves
+            saved += 1
+            rescue_steps.append(t + 1)
+        elif action == 3 and cell == FAKE_VICTIM:
+            fakes += 1
+
+        nx, ny, d, grid = next(replay)
+        if (nx, ny) != (x, y):
+            moves += 1
+            segment_moves += 1
+            if grid[ny, nx] == LAVA:
+                lava_death = True
+        x, y = nx, ny
+        if action == 3 and cell == VICTIM:
+            segment_start, segment_moves = (x, y), 0
+
+    steps = len(rec.actions)
+    return {
+        "file": str(path),
+        "timestamp": rec.timestamp,
+        "num_rows": config.get("num_rows"),
+        "num_cols": config.get("num_cols"),
+        "room_size": config.get("room_size"),
+        "victims_total": victims_total,
+        "victims_saved": saved,
+        "fake_pickups": fakes,
+        "lava_death": lava_death,
+        "steps": steps,
+        "max_steps": max_steps,
+        "step_ratio": steps / max_steps if max_steps else None,
+        "moves": moves,
+        "path_efficiency": (
+            optimal_moves / actual_moves if actual_moves else None
+        ),
+        "steps_per_victim": rescue_steps[-1] / saved if saved else None,
+        "total_reward": float(sum(rec.rewards)),
+    }
+
+
+def scan_recordings(paths, workers=None, chunksize=8):
+    """
+    Compute metrics for many recordings with a process pool.
+
+    Args:
+        paths: Recording pickle paths
+        workers: Number of worker processes (None = one per CPU)
+        chunksize: Recordings handed to a worker at a time
+
+    Returns:
+        list: Summary rows in the order of ``paths``
+    """
+    paths = list(paths)
+    if workers == 1:
+        return [episode_metrics(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(episode_metrics, paths, chunksize=chunksize))
+
+
+def write_summary(rows, out_path):
+    """Write summary rows as a CSV table."""
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def print_summary(rows):
+    """Print study-level aggregates of the summary rows."""
+    if not rows:
+        print("No recordings found")
+        return
+
+    def mean(key):
+        values = [row[key] for row in rows if row[key] is not None]
+        return sum(values) / len(values) if values else float("nan")
+
+    print(f"Episodes: {len(rows)}")
+    print(f"Victims saved (mean): {mean('victims_saved'):.2f}")
+    print(f"Fake pickups (mean): {mean('fake_pickups'):.2f}")
+    print(f"Lava deaths: {sum(row['lava_death'] for row in rows)}")
+    print(f"Steps / max_steps (mean): {mean('step_ratio'):.2f}")
+    print(f"Path efficiency (mean): {mean('path_efficiency'):.2f}")
+    print(f"Steps per victim (mean): {mean('steps_per_victim'):.1f}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("recordings", type=Path, help="directory of .pkl recordings")
+    parser.add_argument("--out", type=Path, default=Path("summary.csv"))
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    rows = scan_recordings(
+        sorted(args.recordings.rglob("*.pkl")), workers=args.workers
+    )
+    write_summary(rows, args.out)
+    print_summary(rows)
+    print(f"Saved: {args.out}")
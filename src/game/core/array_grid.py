@@ -0,0 +1,224 @@
+import numpy as np
+from minigrid.core.constants import IDX_TO_COLOR, OBJECT_TO_IDX
+from minigrid.core.grid import Grid
+from minigrid.core.world_object import WorldObj
+
+EMPTY = OBJECT_TO_IDX["empty"]
+
+# Object types with per-instance state (open doors, carried keys, ...). Cells
+# holding one keep the live object, every other cell is rebuilt on demand.
+MUTABLE_TYPES = {OBJECT_TO_IDX[name] for name in ("door", "key", "ball", "box")}
+
+# type index -> callable(color, state) for objects ``WorldObj.decode`` does
+# not know about, see ``register_decoder``
+DECODERS = {}
+
+# (type, color, state) -> shared instance of an immutable object
+_flyweights = {}
+
+
+def register_decoder(type_name, decoder):
+    """Teach ``ArrayGrid`` to rebuild objects of a custom type."""
+    DECODERS[OBJECT_TO_IDX[type_name]] = decoder
+    # Drop instances built before the decoder existed
+    for key in [key for key in _flyweights if key[0] == OBJECT_TO_IDX[type_name]]:
+        del _flyweights[key]
+
+
+def decode_object(type_idx, color_idx, state):
+    decoder = DECODERS.get(type_idx)
+    if decoder is not None:
+        return decoder(IDX_TO_COLOR[color_idx], state)
+    return WorldObj.decode(type_idx, color_idx, state)
+
+
+class CellView:
+    """
+    List-like view over the cells of an ``ArrayGrid``.
+
+    Stands in for the ``Grid.grid`` list (``grid.grid[y * width + x]``,
+    slicing, iteration) so that code written against minigrid's storage
+    keeps working; reading a cell materializes its object.
+    """
+
+    def __init__(self, grid):
+        self._grid = grid
+
+    def __len__(self):
+        return self._grid.width * self._grid.height
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            get = self._grid.get_index
+            return [get(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return self._grid.get_index(index)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            indices = range(*index.indices(len(self)))
+            values = list(value)
+            if len(values) != len(indices):
+                raise ValueError("cannot resize the cells of a grid")
+            for i, obj in zip(indices, values):
+                self._grid.set_index(i, obj)
+            return
+        if index < 0:
+            index += len(self)
+        self._grid.set_index(index, value)
+
+    def __iter__(self):
+        get = self._grid.get_index
+        return (get(i) for i in range(len(self)))
+
+
+class ArrayGrid(Grid):
+    """
+    Grid stored as uint8 arrays of object type, color, state and variant.
+
+    A drop-in replacement for minigrid's ``Grid`` (``get``, ``set``,
+    ``encode``, ``render``, ``slice``, ...). ``WorldObj`` instances are
+    only created when a cell is read: immutable objects (walls, lava,
+    victims) come back as shared flyweights, while doors, keys, balls and
+    boxes are materialized once and kept, since they carry state that the
+    arrays cannot follow (a door opened through ``toggle``). For those cells
+    the kept object is authoritative; ``encode`` reads it back.
+
+    ``variant`` holds the object's integer ``kind`` (see ``sar.objects``),
+    so victim scans are array operations. A level takes 4 bytes per cell.
+    """
+
+    def __init__(self, width, height):
+        assert width >= 3
+        assert height >= 3
+        self.width = width
+        self.height = height
+        size = width * height
+        self._types = bytearray([EMPTY]) * size
+        self._colors = bytearray(size)
+        self._states = bytearray(size)
+        self._variants = bytearray(size)
+        self._objs = {}
+
+    @property
+    def grid(self):
+        return CellView(self)
+
+    def _view(self, buffer):
+        return np.frombuffer(buffer, dtype=np.uint8).reshape(self.height, self.width)
+
+    @property
+    def types(self):
+        """``(height, width)`` uint8 view of the object types."""
+        return self._view(self._types)
+
+    @property
+    def colors(self):
+        return self._view(self._colors)
+
+    @property
+    def variants(self):
+        return self._view(self._variants)
+
+    @property
+    def nbytes(self):
+        """Bytes used by the cell arrays (the kept mutable objects aside)."""
+        return 4 * self.width * self.height
+
+    def get_index(self, index):
+        type_idx = self._types[index]
+        if type_idx == EMPTY:
+            return None
+        obj = self._objs.get(index)
+        if obj is not None:
+            return obj
+
+        key = (type_idx, self._colors[index], self._states[index])
+        if type_idx in MUTABLE_TYPES:
+            obj = self._objs[index] = decode_object(*key)
+            obj.init_pos = obj.cur_pos = (index % self.width, index // self.width)
+            return obj
+        obj = _flyweights.get(key)
+        if obj is None:
+            obj = _flyweights[key] = decode_object(*key)
+        return obj
+
+    def set_index(self, index, obj):
+        if obj is None:
+            self._types[index] = EMPTY
+            self._colors[index] = self._states[index] = self._variants[index] = 0
+            self._objs.pop(index, None)
+            return
+        type_idx, color_idx, state = obj.encode()
+        self._types[index] = type_idx
+        self._colors[index] = color_idx
+        self._states[index] = state
+        self._variants[index] = getattr(obj, "kind", 0)
+        if type_idx in MUTABLE_TYPES:
+            self._objs[index] = obj
+        else:
+            self._objs.pop(index, None)
+
+    def get(self, i, j):
+        assert 0 <= i < self.width
+        assert 0 <= j < self.height
+        return self.get_index(j * self.width + i)
+
+    def set(self, i, j, v):
+        assert (
+            0 <= i < self.width
+        ), f"column index {i} outside of grid of width {self.width}"
+        assert (
+            0 <= j < self.height
+        ), f"row index {j} outside of grid of height {self.height}"
+        self.set_index(j * self.width + i, v)
+
+    def count(self, type_name):
+        """Number of cells holding an object of ``type_name``."""
+        return int(np.count_nonzero(self.types == OBJECT_TO_IDX[type_name]))
+
+    def count_kind(self, kind):
+        """Number of cells holding an object of integer ``kind``."""
+        return int(np.count_nonzero(self.variants == kind))
+
+    def find_kind(self, kind):
+        """``(x, y)`` positions of the objects of integer ``kind``, row by row."""
+        ys, xs = np.nonzero(self.variants == kind)
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def encode(self, vis_mask=None):
+        array = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        array[..., 0] = self.types
+        array[..., 1] = self.colors
+        array[..., 2] = self._view(self._states)
+        for index, obj in self._objs.items():
+            array[index // self.width, index % self.width] = obj.encode()
+        array = array.transpose(1, 0, 2).copy()
+        if vis_mask is not None:
+            array[~vis_mask] = 0
+        return array
+
+    @classmethod
+    def from_grid(cls, grid):
+        """Compact copy of a minigrid ``Grid``."""
+        array_grid = cls(grid.width, grid.height)
+        for index, obj in enumerate(grid.grid):
+            if obj is not None:
+                array_grid.set_index(index, obj)
+        return array_grid
+
+    def to_grid(self):
+        """Materialize every cell into a plain minigrid ``Grid``."""
+        grid = Grid(self.width, self.height)
+        grid.grid[:] = list(self.grid)
+        return grid
+
+    def __getstate__(self):
+        # Kept objects are rebuilt from the arrays after unpickling
+        state = self.__dict__.copy()
+        state["_states"] = bytearray(self._states)
+        for index, obj in self._objs.items():
+            state["_states"][index] = obj.encode()[2]
+        state["_objs"] = {}
+        return state
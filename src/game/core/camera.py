@@ -3,6 +3,67 @@ from dataclasses import dataclass
 from typing import Tuple
 
 import numpy as np
+from minigrid.core.grid import Grid
+
+
+# Tiles under the fog of war are drawn this many times darker
+FOG_DIVISOR = 3
+
+
+def fog_overlay(img, seen, top_x, top_y, tile_size, divisor=FOG_DIVISOR):
+    """
+    Darken, in place, the tiles of a rendered window never seen by the agent.
+
+    Args:
+        img: Rendered window, its top left tile is cell ``(top_x, top_y)``
+        seen: Bool array ``(width, height)`` of the seen cells
+        tile_size: Pixels per tile
+        divisor: Darkening of the unseen tiles
+
+    Returns:
+        np.ndarray: ``img``
+    """
+    rows, cols = img.shape[0] // tile_size, img.shape[1] // tile_size
+    unseen = ~seen[top_x : top_x + cols, top_y : top_y + rows].T
+    # View of the pixels as (row, col) tiles, so a cell mask selects tiles
+    tiles = img.reshape(rows, tile_size, cols, tile_size, 3).swapaxes(1, 2)
+    fogged = tiles[unseen]
+    fogged //= divisor
+    tiles[unseen] = fogged
+    return img
+
+
+def render_window(
+    grid, top_x, top_y, width, height, tile_size, agent_pos, agent_dir, seen=None
+):
+    """
+    Render only the tiles of a window of the grid.
+
+    Gives the same pixels as cropping ``grid.render(...)`` to the window
+    (clipped to the grid), but the cost depends on the window size instead
+    of the map size. With ``seen``, cells never seen are under fog (see
+    ``fog_overlay``).
+    """
+    x0, y0 = max(0, top_x), max(0, top_y)
+    x1, y1 = min(grid.width, top_x + width), min(grid.height, top_y + height)
+    img = np.zeros(((y1 - y0) * tile_size, (x1 - x0) * tile_size, 3), dtype=np.uint8)
+    agent_x, agent_y = agent_pos
+
+    for y in range(y0, y1):
+        py = (y - y0) * tile_size
+        for x in range(x0, x1):
+            agent_here = x == agent_x and y == agent_y
+            tile = Grid.render_tile(
+                grid.get(x, y),
+                agent_dir=agent_dir if agent_here else None,
+                highlight=False,
+                tile_size=tile_size,
+            )
+            px = (x - x0) * tile_size
+            img[py : py + tile_size, px : px + tile_size] = tile
+    if seen is not None:
+        fog_overlay(img, seen, x0, y0, tile_size)
+    return img
 
 
 @dataclass
@@ -27,10 +88,12 @@ class FullviewCamera(CameraStrategy):
     def __init__(self, tile_size=32):
         self.tile_size = tile_size
 
-    def get_crop(self, grid, agent_pos, agent_dir, **kwargs):
+    def get_crop(self, grid, agent_pos, agent_dir, seen=None, **kwargs):
         full_img = grid.render(
             self.tile_size, agent_pos, agent_dir, highlight_mask=None
         )
+        if seen is not None:
+            fog_overlay(full_img, seen, 0, 0, self.tile_size)
         return full_img
 
 
@@ -41,10 +104,13 @@ class AgentCenteredCamera(CameraStrategy):
         self.extra_tiles = extra_tiles
         self.tile_size = tile_size
 
-    def get_crop(self, grid, agent_pos, agent_dir, room=None, **kwargs) -> np.ndarray:
+    def get_crop(
+        self, grid, agent_pos, agent_dir, room=None, seen=None, **kwargs
+    ) -> np.ndarray:
         """Get a crop centered on the agent's current room."""
         agent_x, agent_y = agent_pos
-        room_w, room_h = room.size
+        # Environments without rooms get the extra tiles only
+        room_w, room_h = room.size if room is not None else (0, 0)
 
         width_tiles = room_w + self.extra_tiles[0]
         height_tiles = room_h + self.extra_tiles[1]
@@ -55,16 +121,17 @@ class AgentCenteredCamera(CameraStrategy):
         top_x = max(0, min(top_x, grid.width - width_tiles))
         top_y = max(0, min(top_y, grid.height - height_tiles))
 
-        bot_x = top_x + width_tiles
-        bot_y = top_y + height_tiles
-
-        px_min, px_max = top_x * self.tile_size, bot_x * self.tile_size
-        py_min, py_max = top_y * self.tile_size, bot_y * self.tile_size
-
-        full_img = grid.render(
-            self.tile_size, agent_pos, agent_dir, highlight_mask=None
+        return render_window(
+            grid,
+            top_x,
+            top_y,
+            width_tiles,
+            height_tiles,
+            self.tile_size,
+            agent_pos,
+            agent_dir,
+            seen,
         )
-        return full_img[py_min:py_max, px_min:px_max, :]
 
 
 class EdgeFollowCamera(CameraStrategy):
@@ -113,25 +180,33 @@ class EdgeFollowCamera(CameraStrategy):
         self.top_y = max(0, min(self.top_y, grid_height - view_h))
 
     def get_crop(
-        self, grid, agent_pos, agent_dir, grid_width=None, grid_height=None, **kwargs
+        self,
+        grid,
+        agent_pos,
+        agent_dir,
+        grid_width=None,
+        grid_height=None,
+        seen=None,
+        **kwargs,
     ) -> np.ndarray:
         """Get a crop that follows the agent with edge-following behavior."""
         agent_x, agent_y = agent_pos
         self._update_position(agent_x, agent_y, grid_width, grid_height)
 
         view_w, view_h = self.config.view_tiles
-        tile_size = self.config.tile_size
-
-        # Render full grid
-        full_img = grid.render(tile_size, agent_pos, agent_dir, highlight_mask=None)
 
-        # Calculate pixel boundaries
-        px_min = self.top_x * tile_size
-        px_max = (self.top_x + view_w) * tile_size
-        py_min = self.top_y * tile_size
-        py_max = (self.top_y + view_h) * tile_size
-
-        return full_img[py_min:py_max, px_min:px_max, :]
+        # Render only the tiles inside the view
+        return render_window(
+            grid,
+            self.top_x,
+            self.top_y,
+            view_w,
+            view_h,
+            self.config.tile_size,
+            agent_pos,
+            agent_dir,
+            seen,
+        )
 
     def reset(self):
         """Reset camera state."""
@@ -0,0 +1,116 @@
+from minigrid.core.grid import Grid
+
+from .array_grid import CellView
+
+
+class ChunkedGrid(Grid):
+    """
+    Sparse grid made of square chunks, allocated only where there is content.
+
+    Meant for outdoor and urban maps much larger than their content (an
+    OSM extract rasterized at one cell per meter): cells are stored in
+    ``chunk_size x chunk_size`` chunks keyed by chunk coordinates, a chunk
+    is created by the first object set in it and dropped again when its
+    last object is removed, so memory follows the number of objects rather
+    than the bounding box. Reading a cell of a missing chunk returns None.
+
+    A drop-in replacement for minigrid's ``Grid``. ``get``, ``set`` and
+    ``slice`` cost the same whatever the map size, so observations and
+    camera views only touch the chunks under them; whole-grid operations
+    (``encode``, a full ``render``, iterating ``grid``) stay O(area).
+    """
+
+    def __init__(self, width, height, chunk_size=16):
+        assert width >= 3
+        assert height >= 3
+        self.width = width
+        self.height = height
+        self.chunk_size = chunk_size
+        # (cx, cy) -> flat list of chunk_size * chunk_size cells
+        self.chunks = {}
+        # (cx, cy) -> number of objects in the chunk
+        self._counts = {}
+
+    @property
+    def grid(self):
+        return CellView(self)
+
+    @property
+    def num_cells(self):
+        """Cells held by the allocated chunks."""
+        return len(self.chunks) * self.chunk_size**2
+
+    def chunk_coords(self, i, j):
+        """Coordinates of the chunk holding cell ``(i, j)``."""
+        return i // self.chunk_size, j // self.chunk_size
+
+    def chunk(self, cx, cy):
+        """Cells of chunk ``(cx, cy)`` row by row, or None if not allocated."""
+        return self.chunks.get((cx, cy))
+
+    def get(self, i, j):
+        assert 0 <= i < self.width
+        assert 0 <= j < self.height
+        size = self.chunk_size
+        chunk = self.chunks.get((i // size, j // size))
+        if chunk is None:
+            return None
+        return chunk[(j % size) * size + i % size]
+
+    def set(self, i, j, v):
+        assert (
+            0 <= i < self.width
+        ), f"column index {i} outside of grid of width {self.width}"
+        assert (
+            0 <= j < self.height
+        ), f"row index {j} outside of grid of height {self.height}"
+        size = self.chunk_size
+        key = (i // size, j // size)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            if v is None:
+                return
+            chunk = self.chunks[key] = [None] * (size * size)
+            self._counts[key] = 0
+
+        index = (j % size) * size + i % size
+        count = self._counts[key] + (v is not None) - (chunk[index] is not None)
+        chunk[index] = v
+        if count:
+            self._counts[key] = count
+        else:
+            del self.chunks[key], self._counts[key]
+
+    def get_index(self, index):
+        return self.get(index % self.width, index // self.width)
+
+    def set_index(self, index, obj):
+        self.set(index % self.width, index // self.width, obj)
+
+    def objects(self):
+        """``((x, y), obj)`` of every object, chunk by chunk."""
+        size = self.chunk_size
+        for (cx, cy), chunk in self.chunks.items():
+            for index, obj in enumerate(chunk):
+                if obj is not None:
+                    yield (cx * size + index % size, cy * size + index // size), obj
+
+    def count_kind(self, kind):
+        """Number of cells holding an object of integer ``kind``."""
+        return sum(1 for _, obj in self.objects() if getattr(obj, "kind", 0) == kind)
+
+    def find_kind(self, kind):
+        """``(x, y)`` positions of the objects of integer ``kind``, row by row."""
+        return sorted(
+            (pos for pos, obj in self.objects() if getattr(obj, "kind", 0) == kind),
+            key=lambda pos: (pos[1], pos[0]),
+        )
+
+    @classmethod
+    def from_grid(cls, grid, chunk_size=16):
+        """Sparse copy of a minigrid ``Grid``."""
+        chunked = cls(grid.width, grid.height, chunk_size)
+        for index, obj in enumerate(grid.grid):
+            if obj is not None:
+                chunked.set_index(index, obj)
+        return chunked
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import numpy as np
 import pygame
+from minigrid.core.grid import Grid
 from minigrid.core.mission import MissionSpace
 from minigrid.minigrid_env import MiniGridEnv
 
@@ -15,10 +16,16 @@ class SAREnv(MiniGridEnv):
         agent_start_dir=0,
         window=None,
         max_steps: int | None = None,
+        grid_class=Grid,
+        camera_strategy=None,
         **kwargs,
     ):
         self.agent_start_pos = agent_start_pos
         self.agent_start_dir = agent_start_dir
+        # Grid storage used by _gen_grid, e.g. ChunkedGrid for sparse maps
+        self.grid_class = grid_class
+        # Optional camera (see core.camera); without one the full frame is rendered
+        self.camera = camera_strategy
 
         mission_space = MissionSpace(mission_func=self._gen_mission)
 
@@ -31,6 +38,7 @@ class SAREnv(MiniGridEnv):
             max_steps=max_steps,
             **kwargs,
         )
+        self.grid = grid_class(self.width, self.height)
         self.window = window
         self.screen_size = screen_size
 
@@ -45,9 +53,18 @@ class SAREnv(MiniGridEnv):
         )  # Could be user-defined or a constant like 1024
 
         # Get the base image (e.g. from the environment)
-        frame = self.get_frame(
-            self.highlight, self.tile_size, self.agent_pov
-        )  # shape: (H, W, C)
+        if self.camera is not None:
+            frame = self.camera.get_crop(
+                grid=self.grid,
+                agent_pos=self.agent_pos,
+                agent_dir=self.agent_dir,
+                grid_width=self.width,
+                grid_height=self.height,
+            )
+        else:
+            frame = self.get_frame(
+                self.highlight, self.tile_size, self.agent_pov
+            )  # shape: (H, W, C)
 
         if self.render_mode == "rgb_array":
             return frame
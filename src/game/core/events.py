@@ -0,0 +1,108 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class AgentMoved:
+    """The agent changed position or direction."""
+
+    pos: tuple
+    direction: int
+    prev_pos: tuple
+    prev_direction: int
+
+
+@dataclass(frozen=True, slots=True)
+class DoorOpened:
+    pos: tuple
+    door: object
+
+
+@dataclass(frozen=True, slots=True)
+class DoorClosed:
+    pos: tuple
+    door: object
+
+
+@dataclass(frozen=True, slots=True)
+class DoorUnlocked:
+    pos: tuple
+    door: object
+
+
+@dataclass(frozen=True, slots=True)
+class KeyPicked:
+    pos: tuple
+    key: object
+
+
+@dataclass(frozen=True, slots=True)
+class ObjectDropped:
+    pos: tuple
+    obj: object
+
+
+@dataclass(frozen=True, slots=True)
+class LavaDeath:
+    pos: tuple
+
+
+@dataclass(frozen=True, slots=True)
+class EpisodeReset:
+    """A new level was generated."""
+
+
+@dataclass(frozen=True, slots=True)
+class StateRestored:
+    """The environment was set back to a snapshot."""
+
+    snapshot: object
+
+
+class EventBus:
+    """
+    Synchronous publish/subscribe hub for environment events.
+
+    Handlers are registered per event class. ``emit`` takes the event
+    class and its fields and only builds the event when a handler for that
+    class exists, so an event nobody listens to costs one dict lookup.
+    Publishers that do extra work to gather the fields check ``listens``
+    first.
+
+    Handlers registered with ``episode=True`` belong to the current episode
+    (e.g. the mission instruction) and are dropped by ``end_episode``.
+    """
+
+    def __init__(self):
+        self._handlers = {}
+        self._episode = []
+
+    def listens(self, *event_types):
+        """Whether any of ``event_types`` has a handler."""
+        handlers = self._handlers
+        return any(event_type in handlers for event_type in event_types)
+
+    def subscribe(self, event_type, handler, episode=False):
+        self._handlers.setdefault(event_type, []).append(handler)
+        if episode:
+            self._episode.append((event_type, handler))
+        return handler
+
+    def unsubscribe(self, event_type, handler):
+        handlers = self._handlers.get(event_type)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+            if not handlers:
+                del self._handlers[event_type]
+
+    def end_episode(self):
+        for event_type, handler in self._episode:
+            self.unsubscribe(event_type, handler)
+        self._episode.clear()
+
+    def emit(self, event_type, *fields):
+        handlers = self._handlers.get(event_type)
+        if handlers:
+            event = event_type(*fields)
+            # Copy, handlers may unsubscribe themselves
+            for handler in tuple(handlers):
+                handler(event)
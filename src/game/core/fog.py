@@ -0,0 +1,54 @@
+import numpy as np
+
+from .observation import view_offsets
+
+
+class SeenCells:
+    """
+    Cells seen at least once during the episode, for exploration metrics
+    and fog of war.
+
+    ``seen`` is a ``(width, height)`` bool array OR-ed with the visible cells
+    of every observation, and ``count`` follows the number of seen cells so
+    that ``coverage`` is O(1). Visibility is read from the observation
+    image itself: minigrid encodes invisible cells as all zeros (type
+    ``unseen``), so any observation (minigrid's, the observation buffer's or
+    a batch of them) can be folded in. Snapshots do not cover it, a restore
+    keeps what was seen.
+    """
+
+    def __init__(self, width, height, view_size):
+        self.seen = np.zeros((width, height), dtype=bool)
+        self.count = 0
+        self._offsets = view_offsets(view_size)
+
+    def clear(self):
+        self.seen.fill(False)
+        self.count = 0
+
+    @property
+    def coverage(self):
+        """Share of the grid cells seen so far, in [0, 1]."""
+        return self.count / self.seen.size
+
+    def observe(self, positions, directions, images):
+        """
+        Mark the cells visible in a batch of observations as seen.
+
+        Args:
+            positions: Int array ``(n, 2)`` of the observers' positions
+            directions: Int array ``(n,)`` of their directions
+            images: Observation images ``(n, view, view, 3)``
+        """
+        width, height = self.seen.shape
+        xs = positions[:, 0, None, None] + self._offsets[directions, 0]
+        ys = positions[:, 1, None, None] + self._offsets[directions, 1]
+        visible = (images[..., 0] != 0) & (xs >= 0) & (xs < width)
+        visible &= (ys >= 0) & (ys < height)
+
+        cells = xs[visible] * height + ys[visible]
+        flat = self.seen.ravel()
+        # Cells seen by several observers count once
+        new = np.unique(cells[~flat[cells]])
+        flat[new] = True
+        self.count += len(new)
@@ -0,0 +1,117 @@
+import numpy as np
+from minigrid.core.constants import OBJECT_TO_IDX, STATE_TO_IDX
+
+EMPTY = OBJECT_TO_IDX["empty"]
+DOOR = OBJECT_TO_IDX["door"]
+LAVA = OBJECT_TO_IDX["lava"]
+OPEN = STATE_TO_IDX["open"]
+
+
+def spread_fire(burning, fuel, probability, rng):
+    """
+    One step of fire spread over whole grids, in place.
+
+    Every fuel cell next to a burning cell (4-neighbourhood) catches fire
+    with probability ``probability`` per burning neighbour, independently.
+    Arrays may carry leading batch dimensions, so one call advances the
+    fire of a whole batch of grids. Both arrays must be C-contiguous.
+
+    Args:
+        burning: Bool array ``(..., width, height)`` of burning cells
+        fuel: Bool array of the same shape, cells the fire can enter
+        probability: Spread probability per burning neighbour and step
+        rng: numpy ``Generator``
+
+    Returns:
+        np.ndarray: Flat indices (into ``burning.ravel()``) of the cells that
+        caught fire, which are now burning and no longer fuel
+    """
+    neighbours = np.zeros(burning.shape, dtype=np.uint8)
+    neighbours[..., 1:, :] += burning[..., :-1, :]
+    neighbours[..., :-1, :] += burning[..., 1:, :]
+    neighbours[..., :, 1:] += burning[..., :, :-1]
+    neighbours[..., :, :-1] += burning[..., :, 1:]
+
+    # Random draws only for the cells on the fire front
+    candidates = np.flatnonzero((neighbours > 0) & fuel)
+    chance = 1.0 - (1.0 - probability) ** neighbours.ravel()[candidates]
+    ignited = candidates[rng.random(len(candidates)) < chance]
+    burning.ravel()[ignited] = True
+    fuel.ravel()[ignited] = False
+    return ignited
+
+
+class FireSpread:
+    """
+    Fire that spreads from lava over time.
+
+    Lava cells are burning. Fuel is the cells the fire can enter: empty
+    cells and open doors (closed and locked doors too with
+    ``through_closed_doors``, no doors at all without ``through_doors``).
+    Walls, every other object (victims, keys) and the ``barriers`` cells
+    stop the fire. The state is two bool arrays of shape ``(width, height)``
+    advanced by ``spread_fire``, so a step costs a few array operations
+    whatever the map size; the environment turns the ignited cells into lava.
+    """
+
+    def __init__(
+        self,
+        spread_probability=0.05,
+        through_doors=True,
+        through_closed_doors=False,
+        barriers=(),
+    ):
+        """
+        Args:
+            spread_probability: Chance per step that a burning cell sets
+                fire to each neighbouring fuel cell
+            through_doors: Let the fire burn open doors
+            through_closed_doors: Let the fire burn closed and locked doors
+            barriers: ``(x, y)`` cells that never burn (fire walls, sprinklers)
+        """
+        self.spread_probability = spread_probability
+        self.through_doors = through_doors
+        self.through_closed_doors = through_closed_doors
+        self.barriers = {tuple(pos) for pos in barriers}
+        self.burning = None
+        self.fuel = None
+        self.rng = None
+
+    def reset(self, grid, rng):
+        """Read the burning and fuel cells of a level from ``grid``."""
+        self.rng = rng
+        encoded = grid.encode()
+        types, states = encoded[..., 0], encoded[..., 2]
+        self.burning = types == LAVA
+        self.fuel = types == EMPTY
+        if self.through_doors:
+            doors = types == DOOR
+            if not self.through_closed_doors:
+                doors &= states == OPEN
+            self.fuel |= doors
+        if self.barriers:
+            self.fuel[tuple(np.array(sorted(self.barriers)).T)] = False
+
+    def update_cell(self, pos, obj):
+        """Re-read one cell after it changed (pickup, drop, door toggle)."""
+        pos = tuple(int(v) for v in pos)
+        if obj is None:
+            fuel = True
+        elif obj.type == "door":
+            fuel = self.through_doors and (obj.is_open or self.through_closed_doors)
+        else:
+            fuel = False
+        self.fuel[pos] = fuel and not self.burning[pos] and pos not in self.barriers
+
+    def step(self):
+        """
+        Spread the fire by one step.
+
+        Returns:
+            list: ``(x, y)`` of the cells that caught fire
+        """
+        ignited = spread_fire(
+            self.burning, self.fuel, self.spread_probability, self.rng
+        )
+        height = self.burning.shape[1]
+        return [(index // height, index % height) for index in ignited.tolist()]
@@ -0,0 +1,82 @@
+from minigrid.core.world_object import Door, Wall
+
+# Walls never change once placed, so all wall cells share one instance
+WALL = Wall()
+
+# Compiled wall templates, see wall_template
+_templates = {}
+
+
+def wall_template(room_size, num_rows, num_cols):
+    """
+    Flat cell list of the outer and partition walls of a room grid.
+
+    The same cells ``RoomGrid`` produces with ``wall_rect`` for every room,
+    compiled once per (room_size, num_rows, num_cols) and filled with the
+    shared ``WALL``. Index with ``y * width + x``.
+    """
+    key = (room_size, num_rows, num_cols)
+    cells = _templates.get(key)
+    if cells is None:
+        width = (room_size - 1) * num_cols + 1
+        height = (room_size - 1) * num_rows + 1
+        cells = [None] * (width * height)
+        for y in range(height):
+            for x in range(width):
+                if x % (room_size - 1) == 0 or y % (room_size - 1) == 0:
+                    cells[y * width + x] = WALL
+        cells = _templates[key] = tuple(cells)
+    return cells
+
+
+class LayoutSkeleton:
+    """
+    Structure of a generated level: walls, doors, locked rooms and keys.
+
+    Captured once after the layout was generated, before any lava, victims
+    or agent are placed, and stamped back into a fresh grid with one list
+    copy so that only the contents have to be generated again.
+    """
+
+    def __init__(self, env):
+        self.width, self.height = env.grid.width, env.grid.height
+        self.room_grid = env.room_grid
+        self.cells = tuple(env.grid.grid)
+
+        # Objects whose state or position can change during an episode
+        self.doors = []
+        self.objects = []
+        for index, obj in enumerate(self.cells):
+            if obj is None or obj.type == "wall":
+                continue
+            pos = (index % self.width, index // self.width)
+            self.objects.append((pos, obj))
+            if isinstance(obj, Door):
+                self.doors.append((obj, obj.is_open, obj.is_locked))
+
+        self.rooms = [
+            (room, list(room.objs), room.locked)
+            for row in env.room_grid
+            for room in row
+        ]
+
+    def matches(self, env):
+        """True if the skeleton can be restored into ``env``."""
+        return (
+            env.room_grid is self.room_grid
+            and (env.width, env.height) == (self.width, self.height)
+        )
+
+    def restore(self, env):
+        """Replace ``env``'s grid by a fresh copy of the skeleton."""
+        env.grid = type(env.grid)(self.width, self.height)
+        env.grid.grid[:] = self.cells
+
+        for door, is_open, is_locked in self.doors:
+            door.is_open, door.is_locked = is_open, is_locked
+        for pos, obj in self.objects:
+            obj.init_pos = obj.cur_pos = pos
+        for room, objs, locked in self.rooms:
+            room.objs = list(objs)
+            room.locked = locked
+        env.carrying = None
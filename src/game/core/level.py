@@ -1,13 +1,49 @@
 import numpy as np
 import pygame
+from minigrid.core.actions import Actions
+from minigrid.core.grid import Grid
+from minigrid.core.roomgrid import Room
+from minigrid.core.world_object import Door, Key, Lava
 from minigrid.envs.babyai.core.levelgen import LevelGen
+from minigrid.envs.babyai.core.roomgrid_level import RejectSampling
 
+from .array_grid import ArrayGrid
 from .camera import CameraStrategy, EdgeFollowCamera
+from .events import (
+    AgentMoved,
+    DoorClosed,
+    DoorOpened,
+    DoorUnlocked,
+    EpisodeReset,
+    EventBus,
+    KeyPicked,
+    LavaDeath,
+    ObjectDropped,
+    StateRestored,
+)
+from .fog import SeenCells
+from .layout import wall_template
+from .observation import ObservationBuffer
+from .rooms import RoomGraph, door_states
+from .snapshot import Snapshot, SnapshotJournal
+
+# Event types ``SARLevelGen.step`` can publish for each action
+STEP_EVENTS = {
+    Actions.left: (AgentMoved, LavaDeath),
+    Actions.right: (AgentMoved, LavaDeath),
+    Actions.forward: (AgentMoved, LavaDeath),
+    Actions.pickup: (KeyPicked,),
+    Actions.drop: (ObjectDropped,),
+    Actions.toggle: (DoorUnlocked, DoorOpened, DoorClosed),
+}
 
 
 class SARLevelGen(LevelGen):
     """Search and Rescue level generator with pluggable camera system."""
 
+    # Object classes counted as victims in the room graph
+    victim_types = ()
+
     def __init__(
         self,
         room_size=8,
@@ -22,11 +58,17 @@ class SARLevelGen(LevelGen):
         instr_kinds=["action", "and", "seq"],
         window=None,
         camera_strategy=None,
+        reuse_obs_buffers=False,
+        array_grid=False,
+        fog_of_war=False,
         **kwargs,
     ):
         if window is None:
             self.window = pygame.display.set_mode([800, 800])
 
+        # Grid storage: minigrid's object list, or compact uint8 arrays
+        self.grid_class = ArrayGrid if array_grid else Grid
+
         super().__init__(
             room_size,
             num_rows,
@@ -44,6 +86,276 @@ class SARLevelGen(LevelGen):
         # Use strategy pattern for camera
         self.camera = camera_strategy or EdgeFollowCamera()
         self.saved_victims = 0
+        self._room_graph = None
+        self._room_graph_key = None
+
+        # Write observations into one preallocated buffer instead of
+        # allocating new arrays every step (see ObservationBuffer for the
+        # lifetime of the returned observations)
+        self.obs_buffer = (
+            ObservationBuffer(self.agent_view_size) if reuse_obs_buffers else None
+        )
+        self._skip_obs = False
+        self._journal = None
+
+        # Cells seen during the episode (exploration coverage), drawn as fog
+        # of war by the cameras. Observations skipped by step_fast are not seen.
+        self.seen_cells = None
+        if fog_of_war:
+            self.seen_cells = SeenCells(self.width, self.height, self.agent_view_size)
+
+        # Typed notifications of what changed, see core.events
+        self.events = EventBus()
+
+    def gen_obs(self):
+        if self._skip_obs:
+            return None
+        if self.obs_buffer is not None:
+            obs = self.obs_buffer.fill(self)
+        else:
+            obs = super().gen_obs()
+        if self.seen_cells is not None:
+            pos, direction = np.array([self.agent_pos]), np.array([self.agent_dir])
+            self.seen_cells.observe(pos, direction, obs["image"][None])
+        return obs
+
+    def get_obs(self):
+        """Observation of the current state, e.g. after a run of ``step_fast`` calls."""
+        return self.gen_obs()
+
+    def step_fast(self, action):
+        """
+        Advance the environment without generating an observation.
+
+        Meant for tree search and replay, where only the state transition
+        matters. Call ``get_obs`` when an observation is needed.
+
+        Returns:
+            tuple: ``(reward, terminated, truncated, info)``
+        """
+        self._skip_obs = True
+        try:
+            _, reward, terminated, truncated, info = self.step(action)
+        finally:
+            self._skip_obs = False
+        return reward, terminated, truncated, info
+
+    def reset(self, **kwargs):
+        self._room_graph = None
+        self.events.end_episode()
+        if self.seen_cells is not None:
+            self.seen_cells.clear()
+        result = super().reset(**kwargs)
+        self._journal = SnapshotJournal(self.grid)
+        self.events.emit(EpisodeReset)
+        return result
+
+    def step(self, action):
+        if action in (self.actions.pickup, self.actions.drop, self.actions.toggle):
+            self._journal.record(self.front_pos)
+        if not self.events.listens(*STEP_EVENTS.get(action, ())):
+            return super().step(action)
+
+        pos, direction = tuple(self.agent_pos), self.agent_dir
+        fwd_pos = tuple(self.front_pos)
+        fwd_obj = self.grid.get(*fwd_pos)
+        door_state = None
+        if isinstance(fwd_obj, Door):
+            door_state = (fwd_obj.is_open, fwd_obj.is_locked)
+        result = super().step(action)
+        self._publish(action, pos, direction, fwd_pos, fwd_obj, door_state)
+        return result
+
+    def _publish(self, action, pos, direction, fwd_pos, fwd_obj, door_state):
+        """Emit the events of one step from the state before and after it."""
+        events = self.events
+        new_pos = tuple(self.agent_pos)
+        if new_pos != pos or self.agent_dir != direction:
+            events.emit(AgentMoved, new_pos, self.agent_dir, pos, direction)
+            if isinstance(fwd_obj, Lava) and new_pos == fwd_pos:
+                events.emit(LavaDeath, fwd_pos)
+        elif action == self.actions.toggle and door_state is not None:
+            was_open, was_locked = door_state
+            if was_locked and not fwd_obj.is_locked:
+                events.emit(DoorUnlocked, fwd_pos, fwd_obj)
+            if fwd_obj.is_open != was_open:
+                event_type = DoorOpened if fwd_obj.is_open else DoorClosed
+                events.emit(event_type, fwd_pos, fwd_obj)
+        elif action == self.actions.pickup:
+            if isinstance(fwd_obj, Key) and self.carrying is fwd_obj:
+                events.emit(KeyPicked, fwd_pos, fwd_obj)
+        elif action == self.actions.drop:
+            dropped = self.grid.get(*fwd_pos)
+            if dropped is not None and dropped is not fwd_obj:
+                events.emit(ObjectDropped, fwd_pos, dropped)
+
+    def snapshot(self) -> Snapshot:
+        """
+        Capture the current state for a later ``restore``.
+
+        Much cheaper than ``copy.deepcopy(env)``: the grid is stored as a flat
+        tuple of object references plus the door states, and the window,
+        camera and level layout are shared. Snapshots are valid until the
+        next ``reset``.
+
+        Taking a snapshot still costs O(cells) for the reference copy of the
+        grid, while restoring an ancestor only costs O(changes) through the
+        journal. A journal-only snapshot would make restoring any other
+        snapshot replay the history, so the copy is kept.
+        """
+        journal = self._journal
+        return Snapshot(
+            grid=self.grid,
+            cells=tuple(self.grid.grid),
+            doors=tuple((door.is_open, door.is_locked) for door in journal.doors),
+            agent_pos=tuple(self.agent_pos),
+            agent_dir=self.agent_dir,
+            carrying=self.carrying,
+            saved_victims=self.saved_victims,
+            step_count=self.step_count,
+            max_steps=self.max_steps,
+            mark=journal.mark(),
+        )
+
+    def restore(self, snapshot: Snapshot):
+        """
+        Return to the state captured by ``snapshot``.
+
+        When the snapshot is an ancestor of the current state, which is the
+        usual case when branching from it repeatedly, only the cells changed
+        since it was taken are written back.
+
+        Raises:
+            ValueError: If the snapshot was taken before the last ``reset``
+        """
+        if snapshot.grid is not self.grid:
+            raise ValueError("snapshot was taken in a previous episode")
+
+        journal = self._journal
+        storage, cells = self.grid.grid, snapshot.cells
+        changed = journal.changed_since(snapshot.mark)
+        if changed is None:
+            changed = [i for i, obj in enumerate(storage) if obj is not cells[i]]
+            changed.extend(journal.door_slots)
+            journal.rebase()
+        else:
+            journal.truncate(snapshot.mark)
+
+        width = self.grid.width
+        for index in changed:
+            obj = storage[index] = cells[index]
+            if obj is None:
+                continue
+            obj.cur_pos = (index % width, index // width)
+            slot = journal.door_slots.get(index)
+            if slot is not None:
+                obj.is_open, obj.is_locked = snapshot.doors[slot]
+
+        self.agent_pos = snapshot.agent_pos
+        self.agent_dir = snapshot.agent_dir
+        self.carrying = snapshot.carrying
+        if self.carrying is not None:
+            self.carrying.cur_pos = (-1, -1)
+        self.saved_victims = snapshot.saved_victims
+        self.step_count = snapshot.step_count
+        self.max_steps = snapshot.max_steps
+        # Door states may differ from the cached graph, object counts surely do
+        self._room_graph = None
+        self.events.emit(StateRestored, snapshot)
+
+    @property
+    def room_graph(self) -> RoomGraph:
+        """
+        Cached room-level graph of the current level.
+
+        The graph is rebuilt only when a door changed state (opened, closed
+        or unlocked) since it was last built.
+        """
+        key = door_states(self)
+        if self._room_graph is None or key != self._room_graph_key:
+            counts = None
+            if self._room_graph is not None:
+                counts = {
+                    index: (node.victims, node.keys)
+                    for index, node in self._room_graph.nodes.items()
+                }
+            self._room_graph = RoomGraph(self, self.victim_types)
+            self._room_graph_key = key
+            if counts is not None:
+                # Object counts are maintained incrementally, keep them
+                for index, (victims, keys) in counts.items():
+                    self._room_graph.nodes[index].victims = victims
+                    self._room_graph.nodes[index].keys = keys
+        return self._room_graph
+
+    def _gen_grid(self, width, height):
+        # Same rejection loop as RoomGridLevel._gen_grid, with the rooms
+        # built by _gen_rooms instead of RoomGrid._gen_grid
+        while True:
+            try:
+                self._gen_rooms(width, height)
+                self.gen_mission()
+                self.validate_instrs(self.instrs)
+            except RecursionError as error:
+                print("Timeout during mission generation:", error)
+                continue
+            except RejectSampling as error:
+                print("Sampling rejected:", error)
+                continue
+            break
+
+        # Generate the surface form for the instructions
+        self.surface = self.instrs.surface(self)
+        self.mission = self.surface
+
+    def _gen_rooms(self, width, height):
+        """
+        Rooms and walls as in ``RoomGrid._gen_grid``.
+
+        The walls are copied from a compiled template instead of being set
+        cell by cell; door positions are drawn in the same order, so seeded
+        levels do not change.
+        """
+        self.grid = self.grid_class(width, height)
+        self.grid.grid[:] = wall_template(self.room_size, self.num_rows, self.num_cols)
+
+        step = self.room_size - 1
+        self.room_grid = [
+            [
+                Room((i * step, j * step), (self.room_size, self.room_size))
+                for i in range(self.num_cols)
+            ]
+            for j in range(self.num_rows)
+        ]
+
+        for j in range(self.num_rows):
+            for i in range(self.num_cols):
+                room = self.room_grid[j][i]
+                x_l, y_l = room.top[0] + 1, room.top[1] + 1
+                x_m, y_m = room.top[0] + step, room.top[1] + step
+
+                # Door positions, order is right, down, left, up
+                if i < self.num_cols - 1:
+                    room.neighbors[0] = self.room_grid[j][i + 1]
+                    room.door_pos[0] = (x_m, self._rand_int(y_l, y_m))
+                if j < self.num_rows - 1:
+                    room.neighbors[1] = self.room_grid[j + 1][i]
+                    room.door_pos[1] = (self._rand_int(x_l, x_m), y_m)
+                if i > 0:
+                    room.neighbors[2] = self.room_grid[j][i - 1]
+                    room.door_pos[2] = room.neighbors[2].door_pos[0]
+                if j > 0:
+                    room.neighbors[3] = self.room_grid[j - 1][i]
+                    room.door_pos[3] = room.neighbors[3].door_pos[1]
+
+        # The agent starts in the middle, facing right
+        self.agent_pos = np.array(
+            (
+                (self.num_cols // 2) * step + (self.room_size // 2),
+                (self.num_rows // 2) * step + (self.room_size // 2),
+            )
+        )
+        self.agent_dir = 0
 
     def gen_mission(self):
         """Generate the mission layout and instructions."""
@@ -77,6 +389,7 @@ class SARLevelGen(LevelGen):
             room=room,
             grid_width=self.width,
             grid_height=self.height,
+            seen=None if self.seen_cells is None else self.seen_cells.seen,
             **kwargs,
         )
 
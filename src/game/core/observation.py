@@ -0,0 +1,218 @@
+import numpy as np
+from minigrid.core.constants import OBJECT_TO_IDX
+from minigrid.core.world_object import Wall
+
+# Cells outside the grid are seen as walls, as in ``Grid.slice``
+OUTSIDE = Wall()
+EMPTY = (OBJECT_TO_IDX["empty"], 0, 0)
+
+
+def view_cells(view_size):
+    """
+    Per-direction list of ``(i, j, dx, dy)`` mapping view cells to world offsets.
+
+    The view uses the minigrid convention: the agent sits at
+    ``(view_size // 2, view_size - 1)`` and looks towards ``j = 0``.
+    """
+    table = []
+    for fx, fy in ((1, 0), (0, 1), (-1, 0), (0, -1)):
+        rx, ry = -fy, fx
+        cells = []
+        for i in range(view_size):
+            for j in range(view_size):
+                ahead, side = view_size - 1 - j, i - view_size // 2
+                cells.append((i, j, fx * ahead + rx * side, fy * ahead + ry * side))
+        table.append(cells)
+    return table
+
+
+class ObservationBuffer:
+    """
+    Preallocated storage for the agent's partial observation.
+
+    ``fill`` produces exactly what ``MiniGridEnv.gen_obs`` returns, but it
+    writes into one image array and one dict that are allocated once per
+    environment instead of building sliced and rotated ``Grid`` copies on
+    every step.
+
+    Lifetime: the returned dict and its ``image`` are views into this
+    buffer and are overwritten by the next ``step`` or ``reset`` of the same
+    environment. Copy them (``obs["image"].copy()``) to keep an observation
+    around, e.g. in a replay buffer.
+    """
+
+    def __init__(self, view_size):
+        self.view_size = view_size
+        self.image = np.zeros((view_size, view_size, 3), dtype=np.uint8)
+        self.mask = np.zeros((view_size, view_size), dtype=bool)
+        self.cells = [[None] * view_size for _ in range(view_size)]
+        self.obs = {"image": self.image, "direction": 0, "mission": ""}
+        self._view_cells = view_cells(view_size)
+
+    def _process_vis(self):
+        """Visibility mask of ``self.cells``, as in ``Grid.process_vis``."""
+        size = self.view_size
+        cells, mask = self.cells, self.mask
+        mask.fill(False)
+        mask[size // 2, size - 1] = True
+        for j in reversed(range(size)):
+            for i in range(size - 1):
+                if not mask[i, j]:
+                    continue
+                cell = cells[i][j]
+                if cell and not cell.see_behind():
+                    continue
+                mask[i + 1, j] = True
+                if j > 0:
+                    mask[i + 1, j - 1] = True
+                    mask[i, j - 1] = True
+            for i in reversed(range(1, size)):
+                if not mask[i, j]:
+                    continue
+                cell = cells[i][j]
+                if cell and not cell.see_behind():
+                    continue
+                mask[i - 1, j] = True
+                if j > 0:
+                    mask[i - 1, j - 1] = True
+                    mask[i, j - 1] = True
+        return mask
+
+    def fill(self, env):
+        """
+        Write the current observation of ``env`` into the buffer.
+
+        Returns:
+            dict: The shared observation dict (see the class docstring for
+            how long it stays valid)
+        """
+        grid = env.grid
+        width, height, storage = grid.width, grid.height, grid.grid
+        ax, ay = env.agent_pos
+        cells = self.cells
+
+        for i, j, dx, dy in self._view_cells[env.agent_dir]:
+            x, y = ax + dx, ay + dy
+            if 0 <= x < width and 0 <= y < height:
+                cells[i][j] = storage[y * width + x]
+            else:
+                cells[i][j] = OUTSIDE
+
+        if env.see_through_walls:
+            mask = self.mask
+            mask.fill(True)
+        else:
+            mask = self._process_vis()
+
+        # The agent sees what it is carrying in its own cell
+        size = self.view_size
+        cells[size // 2][size - 1] = env.carrying
+
+        image = self.image
+        image.fill(0)
+        for i in range(size):
+            row = cells[i]
+            for j in range(size):
+                if mask[i, j]:
+                    cell = row[j]
+                    image[i, j] = EMPTY if cell is None else cell.encode()
+
+        obs = self.obs
+        obs["direction"] = env.agent_dir
+        obs["mission"] = env.mission
+        return obs
+
+
+def view_offsets(view_size):
+    """
+    World offsets of the view cells as an array, for vectorized gathers.
+
+    Returns:
+        np.ndarray: int array of shape ``(4, 2, view_size, view_size)`` with the
+        x and y offsets of every view cell ``[i, j]``, per agent direction
+    """
+    offsets = np.zeros((4, 2, view_size, view_size), dtype=np.intp)
+    for direction, cells in enumerate(view_cells(view_size)):
+        for i, j, dx, dy in cells:
+            offsets[direction, :, i, j] = dx, dy
+    return offsets
+
+
+def _pack(bits):
+    """Python int whose bit ``k`` is ``bits.ravel()[k]``."""
+    return int.from_bytes(np.packbits(bits, axis=None, bitorder="little"), "little")
+
+
+def _fill(gen, pro, shift, steps):
+    """Spread the bits of ``gen`` along ``shift`` through the bits of ``pro``."""
+    for step in steps:
+        gen |= pro & shift(gen, step)
+        pro &= shift(pro, step)
+    return gen
+
+
+def batch_process_vis(opaque):
+    """
+    Visibility masks of a batch of views, same result as ``Grid.process_vis``.
+
+    minigrid sweeps every view row left then right, spreading visibility
+    through see-through cells and into the row in front. Here a row of all
+    views is packed into one Python integer (one block of bits per view,
+    with a gap so that shifts cannot leak into the next view) and each
+    sweep is a logarithmic occluded fill, so the whole batch costs a few
+    dozen integer operations per row.
+
+    Args:
+        opaque: Bool array ``(batch, view_size, view_size)`` of the cells
+            that block sight (walls, closed doors), indexed ``[n, i, j]``
+
+    Returns:
+        np.ndarray: Bool array of the same shape, True where visible
+    """
+    batch, size, _ = opaque.shape
+    # Bits per view, at least twice the view size and whole bytes
+    stride = -(-2 * size // 8) * 8
+    row_bytes = batch * stride // 8
+
+    cells = np.zeros((size, batch, stride), dtype=bool)
+    cells[:, :, :size] = ~opaque.transpose(2, 0, 1)
+    packed = np.packbits(cells, axis=None, bitorder="little").tobytes()
+    clear = [
+        int.from_bytes(packed[j * row_bytes : (j + 1) * row_bytes], "little")
+        for j in range(size)
+    ]
+
+    def pattern(first, last):
+        block = np.zeros((batch, stride), dtype=bool)
+        block[:, first:last] = True
+        return _pack(block)
+
+    full = pattern(0, size)
+    low, high = pattern(0, size - 1), pattern(1, size)
+
+    def up(bits, step):
+        return (bits << step) & full
+
+    def down(bits, step):
+        return bits >> step
+
+    steps = [1 << k for k in range(max(1, (size - 1).bit_length()))]
+    rows = [0] * size
+    rows[size - 1] = pattern(size // 2, size // 2 + 1)
+    for j in reversed(range(size)):
+        row_clear = clear[j]
+        left = _fill(rows[j], up(row_clear, 1), up, steps)
+        right = _fill(left, down(row_clear, 1), down, steps)
+        rows[j] = right
+        if j > 0:
+            # Both sweeps also light the cells in front of those they pass
+            from_left = left & row_clear & low
+            from_right = right & row_clear & high
+            rows[j - 1] |= (
+                from_left | from_right | up(from_left, 1) | down(from_right, 1)
+            )
+
+    packed = b"".join(row.to_bytes(row_bytes, "little") for row in rows)
+    bits = np.unpackbits(np.frombuffer(packed, dtype=np.uint8), bitorder="little")
+    bits = bits.view(bool).reshape(size, batch, stride)
+    return bits[:, :, :size].transpose(1, 2, 0)
@@ -0,0 +1,285 @@
+"""
+Building floor plans from OpenStreetMap extracts.
+
+Building footprints are stream-parsed from OSM XML (``iter_footprints``),
+rasterized into grids of walls, room interiors and doors (``rasterize``)
+and cached on disk (``load_buildings``), so that only the first load of an
+extract pays for the parsing.
+"""
+
+import hashlib
+import math
+import xml.etree.ElementTree as ET
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+# Cell codes of a rasterized layout
+OPEN = 0
+WALL = 1
+DOOR = 2
+
+# Meters per degree of latitude, and of longitude at the equator
+METERS_PER_DEGREE = 111_320.0
+
+# Bump when the rasterization changes, to invalidate cached layouts
+CACHE_VERSION = 1
+
+
+@dataclass
+class Footprint:
+    """Outline of a building, as (lat, lon) points of a closed way."""
+
+    osm_id: int
+    name: str
+    points: list
+
+
+@dataclass
+class BuildingLayout:
+    """
+    Rasterized floor plan of a building.
+
+    ``cells`` is a ``(height, width)`` uint8 array of ``OPEN``, ``WALL`` and
+    ``DOOR`` codes. Like a ``RoomGrid``, partition walls run every
+    ``room_size - 1`` cells from the grid origin, so with
+    ``step = room_size - 1`` the interior of room ``(i, j)`` spans ``x`` in
+    ``[i * step + 1, (i + 1) * step)`` and likewise for ``y``. Everything
+    outside the footprint is wall.
+    """
+
+    osm_id: int
+    name: str
+    cells: np.ndarray
+    room_size: int
+    _rooms: dict = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def width(self):
+        return self.cells.shape[1]
+
+    @property
+    def height(self):
+        return self.cells.shape[0]
+
+    @property
+    def num_cols(self):
+        return (self.width - 1) // (self.room_size - 1)
+
+    @property
+    def num_rows(self):
+        return (self.height - 1) // (self.room_size - 1)
+
+    @property
+    def rooms(self):
+        """``(i, j)`` -> open ``(x, y)`` cells of every non-empty room."""
+        if self._rooms is None:
+            step = self.room_size - 1
+            ys, xs = np.nonzero(self.cells == OPEN)
+            self._rooms = {}
+            for x, y in zip(xs.tolist(), ys.tolist()):
+                self._rooms.setdefault((x // step, y // step), []).append((x, y))
+        return self._rooms
+
+
+def iter_footprints(path):
+    """
+    Stream the building footprints of an OSM XML file.
+
+    The file is read with ``iterparse`` and every top-level element is
+    dropped once handled, so memory holds the node coordinates but never
+    the document tree. Buildings mapped as multipolygon relations, and ways
+    that are not closed or reference nodes outside the extract, are skipped.
+
+    Yields:
+        Footprint: One per closed building way, in file order
+    """
+    nodes = {}
+    context = ET.iterparse(path, events=("start", "end"))
+    _, root = next(context)
+
+    for event, elem in context:
+        if event != "end":
+            continue
+        if elem.tag == "node":
+            lat, lon = float(elem.get("lat")), float(elem.get("lon"))
+            nodes[int(elem.get("id"))] = (lat, lon)
+        elif elem.tag == "way":
+            tags = {tag.get("k"): tag.get("v") for tag in elem.iter("tag")}
+            refs = [int(nd.get("ref")) for nd in elem.iter("nd")]
+            if (
+                tags.get("building", "no") != "no"
+                and len(refs) >= 4
+                and refs[0] == refs[-1]
+                and all(ref in nodes for ref in refs)
+            ):
+                yield Footprint(
+                    osm_id=int(elem.get("id")),
+                    name=tags.get("name", ""),
+                    points=[nodes[ref] for ref in refs],
+                )
+        if elem.tag in ("node", "way", "relation"):
+            root.clear()
+
+
+def _inside(xs, ys, polygon):
+    """Even-odd test of the points ``(xs, ys)`` against a closed polygon."""
+    inside = np.zeros(xs.shape, dtype=bool)
+    for (x0, y0), (x1, y1) in zip(polygon[:-1], polygon[1:]):
+        if y0 == y1:
+            continue
+        crosses = (y0 > ys) != (y1 > ys)
+        x_cross = x0 + (ys - y0) * (x1 - x0) / (y1 - y0)
+        inside ^= crosses & (xs < x_cross)
+    return inside
+
+
+def rasterize(footprint, cell_size=1.5, room_size=8):
+    """
+    Floor plan of a footprint on the room grid.
+
+    The outline is projected to local meters, cells whose center lies
+    inside it become floor, and partition walls split the floor into rooms.
+    Each pair of neighbouring rooms gets one door in the middle of their
+    shared wall, and only the largest connected part of the building is
+    kept, so every open cell can be reached.
+
+    Args:
+        footprint: Building outline
+        cell_size: Meters per grid cell
+        room_size: Room size including walls, as in ``RoomGrid``
+
+    Returns:
+        BuildingLayout: The floor plan, or None if no room is left
+    """
+    lat0 = max(lat for lat, _ in footprint.points)
+    lon0 = min(lon for _, lon in footprint.points)
+    scale = METERS_PER_DEGREE / cell_size
+    lon_scale = scale * math.cos(math.radians(lat0))
+    # One cell of margin, so the outline starts on a partition line
+    polygon = [
+        ((lon - lon0) * lon_scale + 1, (lat0 - lat) * scale + 1)
+        for lat, lon in footprint.points
+    ]
+
+    step = room_size - 1
+    # Round up to whole rooms
+    width = math.ceil(max(x for x, _ in polygon) / step) * step + 1
+    height = math.ceil(max(y for _, y in polygon) / step) * step + 1
+
+    ys, xs = np.mgrid[0:height, 0:width]
+    floor = _inside(xs + 0.5, ys + 0.5, polygon)
+    floor[:, ::step] = False
+    floor[::step, :] = False
+
+    cells = np.full((height, width), WALL, dtype=np.uint8)
+    cells[floor] = OPEN
+    _add_doors(cells, step)
+    _keep_largest_part(cells)
+
+    if not (cells == OPEN).any():
+        return None
+    return BuildingLayout(footprint.osm_id, footprint.name, cells, room_size)
+
+
+def _add_doors(cells, step):
+    """One door per shared wall segment with floor on both sides."""
+    height, width = cells.shape
+    # Vertical partitions
+    for x in range(step, width - 1, step):
+        for y0 in range(0, height - 1, step):
+            ys = [
+                y
+                for y in range(y0 + 1, y0 + step)
+                if cells[y, x - 1] == OPEN and cells[y, x + 1] == OPEN
+            ]
+            if ys:
+                cells[ys[len(ys) // 2], x] = DOOR
+    # Horizontal partitions
+    for y in range(step, height - 1, step):
+        for x0 in range(0, width - 1, step):
+            xs = [
+                x
+                for x in range(x0 + 1, x0 + step)
+                if cells[y - 1, x] == OPEN and cells[y + 1, x] == OPEN
+            ]
+            if xs:
+                cells[y, xs[len(xs) // 2]] = DOOR
+
+
+def _keep_largest_part(cells):
+    """Wall off every connected part of the floor but the largest."""
+    label = np.zeros(cells.shape, dtype=np.int32)
+    sizes = [0]
+    for y, x in zip(*np.nonzero(cells != WALL)):
+        if label[y, x]:
+            continue
+        part = len(sizes)
+        label[y, x] = part
+        queue = deque([(y, x)])
+        size = 0
+        while queue:
+            cy, cx = queue.popleft()
+            size += 1
+            for ny, nx in ((cy + 1, cx), (cy - 1, cx), (cy, cx + 1), (cy, cx - 1)):
+                if cells[ny, nx] != WALL and not label[ny, nx]:
+                    label[ny, nx] = part
+                    queue.append((ny, nx))
+        sizes.append(size)
+    if len(sizes) > 2:
+        cells[(label != int(np.argmax(sizes))) & (cells != WALL)] = WALL
+
+
+def _cache_file(path, cache_dir, cell_size, room_size):
+    stat = path.stat()
+    key = f"{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}:{cell_size}:{room_size}"
+    key += f":{CACHE_VERSION}"
+    digest = hashlib.sha1(key.encode()).hexdigest()[:12]
+    return Path(cache_dir) / f"{path.stem}-{digest}.npz"
+
+
+def load_buildings(path, cell_size=1.5, room_size=8, cache_dir=None):
+    """
+    Rasterized floor plans of all buildings of an OSM extract.
+
+    The layouts are cached in ``cache_dir`` (default: ``cache/`` next to the
+    extract), keyed on the file and the rasterization parameters; later
+    loads read the cache instead of parsing the extract.
+
+    Args:
+        path: OSM XML file
+        cell_size: Meters per grid cell
+        room_size: Room size including walls
+        cache_dir: Directory of the cached layouts
+
+    Returns:
+        list[BuildingLayout]: Layouts in file order
+    """
+    path = Path(path)
+    cache_dir = path.parent / "cache" if cache_dir is None else cache_dir
+    cache = _cache_file(path, cache_dir, cell_size, room_size)
+
+    if cache.exists():
+        with np.load(cache) as data:
+            entries = enumerate(zip(data["ids"], data["names"]))
+            return [
+                BuildingLayout(int(osm_id), str(name), data[f"cells_{i}"], room_size)
+                for i, (osm_id, name) in entries
+            ]
+
+    layouts = []
+    for footprint in iter_footprints(path):
+        layout = rasterize(footprint, cell_size, room_size)
+        if layout is not None:
+            layouts.append(layout)
+
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(
+        cache,
+        ids=np.array([layout.osm_id for layout in layouts], dtype=np.int64),
+        names=np.array([layout.name for layout in layouts], dtype=str),
+        **{f"cells_{index}": layout.cells for index, layout in enumerate(layouts)},
+    )
+    return layouts
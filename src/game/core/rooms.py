@@ -0,0 +1,174 @@
+from collections import deque
+from dataclasses import dataclass, field
+
+from minigrid.core.world_object import Door, Key
+
+
+@dataclass
+class RoomNode:
+    """One room of the lattice, addressed by its (column, row) index."""
+
+    index: tuple
+    top: tuple
+    size: tuple
+    locked: bool
+    # Number of real victims currently in the room
+    victims: int = 0
+    # Keys in the room as ((x, y), color)
+    keys: list = field(default_factory=list)
+
+
+@dataclass
+class RoomEdge:
+    """Connection between two neighbouring rooms."""
+
+    pos: tuple
+    # None for a plain opening in the wall
+    color: str = None
+    is_open: bool = True
+    is_locked: bool = False
+
+
+class RoomGraph:
+    """
+    Room-level view of a ``RoomGrid`` level.
+
+    Rooms are nodes, doors are edges, and room-to-room hop counts are
+    precomputed twice: once through every door and once avoiding locked
+    doors. The graph is built from the room lattice and the door objects;
+    ``SARLevelGen.room_graph`` rebuilds it only when a door changes state.
+    """
+
+    def __init__(self, env, victim_types=()):
+        """
+        Args:
+            env: Level with ``room_grid`` already generated
+            victim_types: Object classes counted as victims
+        """
+        self.room_size = env.room_size
+        self.shape = (env.num_cols, env.num_rows)
+        self.nodes = {}
+        self.edges = {}
+        self.adjacency = {}
+        self.victim_types = tuple(victim_types)
+
+        for row in env.room_grid:
+            for room in row:
+                index = self.index_of(env, room)
+                self.nodes[index] = RoomNode(index, room.top, room.size, room.locked)
+                self.adjacency[index] = []
+
+        for row in env.room_grid:
+            for room in row:
+                a = self.index_of(env, room)
+                for k, door in enumerate(room.doors):
+                    neighbor = room.neighbors[k]
+                    if door is None or neighbor is None:
+                        continue
+                    b = self.index_of(env, neighbor)
+                    self.adjacency[a].append(b)
+                    if (b, a) in self.edges:
+                        self.edges[a, b] = self.edges[b, a]
+                    elif isinstance(door, Door):
+                        self.edges[a, b] = RoomEdge(
+                            room.door_pos[k], door.color, door.is_open, door.is_locked
+                        )
+                    else:
+                        self.edges[a, b] = RoomEdge(room.door_pos[k])
+
+        self._count_objects(env)
+        self.hops = self._all_pairs(through_locked=True)
+        self.free_hops = self._all_pairs(through_locked=False)
+
+    @staticmethod
+    def index_of(env, room):
+        """(column, row) index of a room, matching ``env.get_room(i, j)``."""
+        return (
+            room.top[0] // (env.room_size - 1),
+            room.top[1] // (env.room_size - 1),
+        )
+
+    def _count_objects(self, env):
+        grid = env.grid
+        for node in self.nodes.values():
+            (tx, ty), (sx, sy) = node.top, node.size
+            for x in range(tx + 1, tx + sx - 1):
+                for y in range(ty + 1, ty + sy - 1):
+                    obj = grid.get(x, y)
+                    if isinstance(obj, self.victim_types):
+                        node.victims += 1
+                    elif isinstance(obj, Key):
+                        node.keys.append(((x, y), obj.color))
+
+    def _all_pairs(self, through_locked):
+        """BFS from every room. Returns {source: {target: (hops, next room)}}."""
+        table = {}
+        for source in self.nodes:
+            reached = {source: (0, None)}
+            queue = deque([source])
+            while queue:
+                room = queue.popleft()
+                hops, first = reached[room]
+                for neighbor in self.adjacency[room]:
+                    if neighbor in reached:
+                        continue
+                    if not through_locked and self.edges[room, neighbor].is_locked:
+                        continue
+                    reached[neighbor] = (hops + 1, first or neighbor)
+                    queue.append(neighbor)
+            table[source] = reached
+        return table
+
+    def room_of(self, pos):
+        """Index of the room containing cell ``pos``, as ``env.room_from_pos``."""
+        i = min(int(pos[0]) // (self.room_size - 1), self.shape[0] - 1)
+        j = min(int(pos[1]) // (self.room_size - 1), self.shape[1] - 1)
+        return i, j
+
+    def distance(self, a, b, through_locked=False):
+        """Number of doors between two rooms, or None if unreachable."""
+        table = self.hops if through_locked else self.free_hops
+        entry = table[a].get(b)
+        return None if entry is None else entry[0]
+
+    def path(self, a, b, through_locked=False):
+        """Rooms on a shortest route from ``a`` to ``b`` (both included), or None."""
+        table = self.hops if through_locked else self.free_hops
+        if b not in table[a]:
+            return None
+        rooms = [a]
+        while rooms[-1] != b:
+            rooms.append(table[rooms[-1]][b][1])
+        return rooms
+
+    def reachable(self, a, through_locked=False):
+        """Rooms that can be reached from ``a``."""
+        table = self.hops if through_locked else self.free_hops
+        return set(table[a])
+
+    def object_removed(self, pos, obj):
+        """Update the per-room victim count and key list after a pickup."""
+        node = self.nodes[self.room_of(pos)]
+        if isinstance(obj, self.victim_types):
+            node.victims -= 1
+        elif isinstance(obj, Key):
+            node.keys = [(p, c) for p, c in node.keys if p != tuple(pos)]
+
+    def object_added(self, pos, obj):
+        """Update the per-room counts after an object is put down."""
+        node = self.nodes[self.room_of(pos)]
+        if isinstance(obj, self.victim_types):
+            node.victims += 1
+        elif isinstance(obj, Key):
+            node.keys.append((tuple(pos), obj.color))
+
+
+def door_states(env):
+    """Open/locked state of every door in the lattice, used as the cache key."""
+    states = []
+    for row in env.room_grid:
+        for room in row:
+            for door in room.doors[:2]:
+                if isinstance(door, Door):
+                    states.append((door.is_open, door.is_locked))
+    return tuple(states)
@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+from itertools import count
+
+from minigrid.core.world_object import Door
+
+
+@dataclass(frozen=True, slots=True)
+class Snapshot:
+    """
+    Compact, immutable encoding of an environment state.
+
+    Cells hold references to the grid objects rather than copies: victims,
+    walls and lava never change once placed, and doors, the only mutable
+    objects, have their state stored separately in ``doors``. The remaining
+    victims (the instruction progress) are read from the cells.
+    """
+
+    # Grid the snapshot was taken from, a restore needs the same one
+    grid: object
+    # Flat copy of ``grid.grid``, indexed ``y * width + x``
+    cells: tuple
+    # (is_open, is_locked) of every door, in ``SnapshotJournal.doors`` order
+    doors: tuple
+    agent_pos: tuple
+    agent_dir: int
+    carrying: object
+    saved_victims: int
+    step_count: int
+    max_steps: int
+    # Position in the journal when the snapshot was taken, as (length, last id)
+    mark: tuple
+
+
+class SnapshotJournal:
+    """
+    Log of the grid cells changed since the level was generated.
+
+    Every entry gets a unique id and entries are only appended or cut off
+    at the end, so a snapshot whose last entry is still in place is an
+    ancestor of the current state: restoring it only has to reset the cells
+    logged after it. Restoring any other snapshot compares all the cells.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.entries = []
+        self._ids = count()
+        self.base = next(self._ids)
+        # Door objects and their grid index; doors are never added after generation
+        self.doors = []
+        self.door_slots = {}
+        for index, obj in enumerate(grid.grid):
+            if isinstance(obj, Door):
+                self.door_slots[index] = len(self.doors)
+                self.doors.append(obj)
+
+    def record(self, pos):
+        """Log that the cell at ``pos`` (object or door state) may change."""
+        x, y = pos
+        self.entries.append((next(self._ids), int(y) * self.grid.width + int(x)))
+
+    def mark(self):
+        last = self.entries[-1][0] if self.entries else self.base
+        return (len(self.entries), last)
+
+    def changed_since(self, mark):
+        """Cell indices changed since ``mark``, or None if it is not an ancestor."""
+        length, last = mark
+        if length > len(self.entries):
+            return None
+        if (self.entries[length - 1][0] if length else self.base) != last:
+            return None
+        return [index for _, index in self.entries[length:]]
+
+    def truncate(self, mark):
+        del self.entries[mark[0] :]
+
+    def rebase(self):
+        """Forget the history, e.g. after the cells were replaced wholesale."""
+        self.entries.clear()
+        self.base = next(self._ids)
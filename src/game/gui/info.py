@@ -1,6 +1,12 @@
 import pygame
 from pygame_gui.elements import UILabel, UIPanel
 
+from ..core.events import EpisodeReset, StateRestored
+from ..sar.events import FakePicked, VictimLost, VictimRescued
+
+# Events that change the mission status shown in the panel
+STATUS_EVENTS = (EpisodeReset, StateRestored, VictimRescued, VictimLost, FakePicked)
+
 
 class InfoPanel:
     """Info panel using pygame_gui built-in elements."""
@@ -102,6 +108,27 @@ class InfoPanel:
             anchors={"bottom": "bottom"},
         )
 
+        # Mission status is rescanned only after a relevant event when attached
+        self._env = None
+        self._mission_status = None
+
+    def attach(self, env):
+        """Follow ``env``'s events instead of rescanning the grid every frame."""
+        self.detach()
+        self._env = env
+        self._mission_status = None
+        for event_type in STATUS_EVENTS:
+            env.events.subscribe(event_type, self._invalidate)
+
+    def detach(self):
+        if self._env is not None:
+            for event_type in STATUS_EVENTS:
+                self._env.events.unsubscribe(event_type, self._invalidate)
+        self._env = None
+
+    def _invalidate(self, event):
+        self._mission_status = None
+
     def _update_victims_section(self, mission_status):
         """Update the victims section labels."""
         saved = mission_status.get("saved_victims", 0)
@@ -157,7 +184,12 @@ class InfoPanel:
 
     def render(self, env):
         """Update the panel with current game state."""
-        mission_status = env.get_mission_status()
+        if env is not self._env:
+            mission_status = env.get_mission_status()
+        else:
+            if self._mission_status is None:
+                self._mission_status = env.get_mission_status()
+            mission_status = self._mission_status
         self._update_victims_section(mission_status)
         self._update_time_and_inventory(env)
         self._update_status(mission_status)
@@ -51,6 +51,7 @@ class SAREnvGUI:
         # Create info panel for displaying game statistics (top half)
         self.info_panel = InfoPanel(self.manager, self.env_size, self.panel_width)
         self.info_panel.env_size = info_panel_height  # Update to half height
+        self.info_panel.attach(self.user.env)
 
         # Create chat panel (bottom half)
         chat_y_position = info_panel_height
@@ -163,8 +164,10 @@ class SAREnvGUI:
         chat_panel_height = self.env_size // 2
         chat_y_position = info_panel_height
 
+        self.info_panel.detach()
         self.info_panel = InfoPanel(self.manager, self.env_size, self.panel_width)
         self.info_panel.env_size = info_panel_height
+        self.info_panel.attach(self.user.env)
 
         self.chat_panel = ChatPanel(
             self.manager,
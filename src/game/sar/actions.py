@@ -1,4 +1,9 @@
-from .objects import FAKE_VICTIMS, REAL_VICTIMS
+import numpy as np
+from minigrid.core.actions import Actions
+from minigrid.core.world_object import Box, Door, Key
+
+from .events import FakePicked, VictimRescued
+from .objects import KIND_OTHER, KIND_REAL, kind_of
 
 
 class BaseAction:
@@ -14,19 +19,37 @@ class BaseAction:
 class RescueAction(BaseAction):
     """Pick up a victim (reward +1) or fake victim (penalty -0.5)."""
 
-    def execute(self, action):
-        fwd_pos = self.env.front_pos
-        obj = self.env.grid.get(*fwd_pos)
-        reward = 0
+    def rescue(self, pos):
+        """
+        Rescue the victim or fake victim at ``pos``.
 
-        if isinstance(obj, REAL_VICTIMS):
-            self.env.grid.set(*fwd_pos, None)
-            self.env.saved_victims += 1
+        Returns:
+            float: The reward, or None if there is no victim at ``pos``
+        """
+        obj = self.env.grid.get(*pos)
+        kind = kind_of(obj)
+        if kind == KIND_OTHER:
+            return None
+
+        self.env._journal.record(pos)
+        self.env.grid.set(*pos, None)
+        if kind == KIND_REAL:
             reward = 1.0
-        elif isinstance(obj, FAKE_VICTIMS):
-            self.env.grid.set(*fwd_pos, None)
-            reward = -0.5
-        else:
+            health = self.env.victim_health
+            if health is not None:
+                # Triage: the reward scales with the health left
+                left = health.health_at(pos)
+                if left is not None:
+                    reward *= left
+            self.env.saved_victims += 1
+            self.env.events.emit(VictimRescued, tuple(pos), obj)
+            return reward
+        self.env.events.emit(FakePicked, tuple(pos), obj)
+        return -0.5
+
+    def execute(self, action):
+        reward = self.rescue(self.env.front_pos)
+        if reward is None:
             # fallback to normal pickup
             return self.env._step(self.env.actions.pickup)
 
@@ -34,3 +57,63 @@ class RescueAction(BaseAction):
         # Don't terminate here - let the instruction verification system handle it
         terminated = False
         return obs, reward, terminated, False, {}
+
+
+class ActionMask:
+    """
+    Valid-action mask over the 7 ``MiniGridEnv`` actions.
+
+    An action is masked out when it cannot change the state: moving into a
+    wall or closed door, picking up nothing (or a key with full hands),
+    dropping onto an occupied cell, toggling anything but a door that would
+    react, and ``done``. Turning is always valid. Only the forward cell and
+    the carried object matter, so ``update`` refreshes the four entries that
+    depend on them instead of inspecting the grid.
+    """
+
+    def __init__(self, env):
+        self.env = env
+        self.mask = np.zeros(len(Actions), dtype=bool)
+        self.mask[Actions.left] = True
+        self.mask[Actions.right] = True
+
+    def update(self):
+        """Refresh the mask from the current forward cell and carried object."""
+        env, mask = self.env, self.mask
+        fwd_obj = env.grid.get(*env.front_pos)
+        carrying = env.carrying
+
+        mask[Actions.forward] = fwd_obj is None or fwd_obj.can_overlap()
+        # Victims are rescued even with full hands (see RescueAction)
+        if fwd_obj is None:
+            mask[Actions.pickup] = False
+        else:
+            mask[Actions.pickup] = kind_of(fwd_obj) != KIND_OTHER or (
+                carrying is None and fwd_obj.can_pickup()
+            )
+        mask[Actions.drop] = carrying is not None and fwd_obj is None
+        if isinstance(fwd_obj, Door) and fwd_obj.is_locked:
+            mask[Actions.toggle] = (
+                isinstance(carrying, Key) and carrying.color == fwd_obj.color
+            )
+        else:
+            mask[Actions.toggle] = isinstance(fwd_obj, (Door, Box))
+        return mask
+
+
+def batch_action_masks(envs, out=None):
+    """
+    Stack the current action masks of several environments.
+
+    Args:
+        envs: Environments with an ``action_mask``
+        out: Optional bool array of shape ``(len(envs), 7)`` to write into
+
+    Returns:
+        np.ndarray: Bool array of shape ``(len(envs), 7)``
+    """
+    if out is None:
+        out = np.empty((len(envs), len(Actions)), dtype=bool)
+    for i, env in enumerate(envs):
+        out[i] = env.action_mask.mask
+    return out
@@ -0,0 +1,231 @@
+from collections import deque
+
+from minigrid.core.world_object import Door, Key, Lava
+
+from .objects import FAKE_VICTIMS, REAL_VICTIMS
+
+# Forward vector per agent direction (right, down, left, up)
+DIR_TO_VEC = ((1, 0), (0, 1), (-1, 0), (0, -1))
+
+
+class RescueBot:
+    """
+    Scripted expert for ``PickupVictimEnv``.
+
+    The bot repeatedly walks the shortest path to the nearest real victim
+    and rescues it. When the remaining victims sit behind locked doors it
+    fetches the matching key (dropping the key it holds away from doorways)
+    and unlocks the nearest locked door it can reach. Lava is never entered
+    and fake victims and spare keys are only picked up when one blocks the
+    sole route.
+
+    A path is computed once per target and replayed as a queue of actions;
+    the bot only replans when the queue runs out. It gives up when it keeps
+    replanning from the same situation (e.g. juggling keys around a key
+    that blocks a doorway).
+    """
+
+    def __init__(self, env, max_repeats=3):
+        """
+        Args:
+            env: ``PickupVictimEnv`` to play
+            max_repeats: Replans allowed from the same position, held key and
+                rescue count before giving up
+        """
+        self.env = env
+        self.actions = env.actions
+        self.max_repeats = max_repeats
+        self.queue = deque()
+        self.visits = {}
+
+    def reset(self):
+        self.queue.clear()
+        self.visits.clear()
+
+    def act(self):
+        """Return the next expert action, or ``actions.done`` if stuck."""
+        if not self.queue:
+            env = self.env
+            situation = (
+                tuple(int(v) for v in env.agent_pos),
+                getattr(env.carrying, "color", None),
+                env.saved_victims,
+            )
+            self.visits[situation] = self.visits.get(situation, 0) + 1
+            if self.visits[situation] > self.max_repeats:
+                return self.actions.done
+            self._plan()
+        if not self.queue:
+            return self.actions.done
+        return self.queue.popleft()
+
+    # Path search
+
+    def _passable(self, obj, allow_pickup):
+        if obj is None:
+            return True
+        carrying = self.env.carrying
+        if isinstance(obj, Door):
+            if not obj.is_locked:
+                return True
+            return isinstance(carrying, Key) and carrying.color == obj.color
+        if allow_pickup and isinstance(obj, FAKE_VICTIMS):
+            return True
+        if allow_pickup and isinstance(obj, Key) and carrying is None:
+            return True
+        return False
+
+    def _search(self, is_target, allow_pickup=False):
+        """
+        BFS from the agent to the nearest cell whose neighbour satisfies ``is_target``.
+
+        Returns:
+            tuple | None: ``(path, target)`` with ``path`` the list of cells
+            to walk through and ``target`` the cell to face at the end.
+        """
+        grid = self.env.grid
+        start = tuple(int(v) for v in self.env.agent_pos)
+        parent = {start: None}
+        queue = deque([start])
+        while queue:
+            x, y = queue.popleft()
+            for dx, dy in DIR_TO_VEC:
+                pos = (x + dx, y + dy)
+                if pos in parent:
+                    continue
+                obj = grid.get(*pos)
+                if is_target(pos, obj):
+                    path = []
+                    cell = (x, y)
+                    while cell != start:
+                        path.append(cell)
+                        cell = parent[cell]
+                    return path[::-1], pos
+                if isinstance(obj, Lava) or not self._passable(obj, allow_pickup):
+                    continue
+                parent[pos] = (x, y)
+                queue.append(pos)
+        return None
+
+    def _find(self, is_target):
+        """Search around obstacles first, then through objects that can be picked up."""
+        return self._search(is_target) or self._search(is_target, allow_pickup=True)
+
+    def _near_door(self, pos):
+        grid = self.env.grid
+        return any(
+            isinstance(grid.get(pos[0] + dx, pos[1] + dy), Door)
+            for dx, dy in DIR_TO_VEC
+        )
+
+    # Action generation
+
+    def _face(self, direction, pos_dir):
+        """Turn from ``direction`` to ``pos_dir`` with the fewest turns."""
+        diff = (pos_dir - direction) % 4
+        if diff == 1:
+            self.queue.append(self.actions.right)
+        elif diff == 2:
+            self.queue.extend([self.actions.right, self.actions.right])
+        elif diff == 3:
+            self.queue.append(self.actions.left)
+        return pos_dir
+
+    def _walk(self, path, target):
+        """Queue the actions that follow ``path`` and end facing ``target``."""
+        grid = self.env.grid
+        x, y = (int(v) for v in self.env.agent_pos)
+        direction = self.env.agent_dir
+        for nx, ny in [*path, target]:
+            direction = self._face(direction, DIR_TO_VEC.index((nx - x, ny - y)))
+            if (nx, ny) == target:
+                break
+            obj = grid.get(nx, ny)
+            if isinstance(obj, Door) and not obj.is_open:
+                self.queue.append(self.actions.toggle)
+            elif isinstance(obj, (Key, *FAKE_VICTIMS)):
+                self.queue.append(self.actions.pickup)
+            self.queue.append(self.actions.forward)
+            x, y = nx, ny
+        return direction
+
+    def _plan(self):
+        env = self.env
+        carrying = env.carrying
+
+        # Nearest real victim on the current side of the locked doors
+        found = self._find(lambda pos, obj: isinstance(obj, REAL_VICTIMS))
+        if found:
+            self._walk(*found)
+            self.queue.append(self.actions.pickup)
+            return
+
+        # Unlock a reachable door with the key in hand
+        if isinstance(carrying, Key):
+            found = self._find(
+                lambda pos, obj: isinstance(obj, Door)
+                and obj.is_locked
+                and obj.color == carrying.color
+            )
+            if found:
+                self._walk(*found)
+                self.queue.append(self.actions.toggle)
+                return
+
+        # Fetch a key that opens a reachable locked door
+        colors = set()
+
+        def collect_locked(pos, obj):
+            if isinstance(obj, Door) and obj.is_locked:
+                colors.add(obj.color)
+            return False
+
+        self._search(collect_locked, allow_pickup=True)
+        found = self._find(
+            lambda pos, obj: isinstance(obj, Key) and obj.color in colors
+        )
+        if not found:
+            return
+        if carrying is not None:
+            # Free the hand first, on a cell away from any doorway
+            found = self._search(
+                lambda pos, obj: obj is None and not self._near_door(pos)
+            )
+            if found:
+                self._walk(*found)
+                self.queue.append(self.actions.drop)
+            return
+        self._walk(*found)
+        self.queue.append(self.actions.pickup)
+
+
+def run_episode(env, bot, max_steps=None, on_step=None):
+    """
+    Play one episode with a scripted bot from the current environment state.
+
+    Args:
+        env: Environment, already reset
+        bot: Bot with ``reset()`` and ``act()``
+        max_steps: Hard cap on actions (defaults to ``env.max_steps``)
+        on_step: Optional callback ``(action, reward)`` after each step
+
+    Returns:
+        tuple: ``(actions, rewards, success)``
+    """
+    bot.reset()
+    max_steps = max_steps or env.max_steps
+    actions, rewards = [], []
+    success = False
+    for _ in range(max_steps):
+        action = bot.act()
+        if action == env.actions.done:
+            break
+        _, reward, terminated, truncated, info = env.step(action)
+        actions.append(int(action))
+        rewards.append(float(reward))
+        if on_step is not None:
+            on_step(action, reward)
+        if terminated or truncated:
+            success = bool(info.get("mission_complete"))
+            break
+    return actions, rewards, success
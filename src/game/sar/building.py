@@ -0,0 +1,119 @@
+from dataclasses import dataclass, field
+
+from minigrid.core.constants import COLOR_NAMES
+from minigrid.core.world_object import Door
+
+from ..core import osm
+from ..core.env import SAREnv
+from ..core.layout import WALL
+from .solver import solve_reachability
+from .utils import VictimPlacer
+
+
+@dataclass
+class BuildingRoom:
+    """Room of a building floor plan, as the placers see it."""
+
+    cells: list = field(default_factory=list)
+    locked: bool = False
+
+
+# Stands in for rooms of the room grid that fall outside the building
+NO_ROOM = BuildingRoom()
+
+
+class BuildingEnv(SAREnv):
+    """
+    Rescue level on the floor plan of a real building.
+
+    The walls and doors come from a ``BuildingLayout`` (see
+    ``core.osm.load_buildings``). Rooms are exposed through ``get_room`` and
+    ``place_in_room`` like a ``RoomGrid``, so lava and victims are placed by
+    the usual ``LavaPlacer`` and ``VictimPlacer``.
+    """
+
+    def __init__(
+        self,
+        layout,
+        victim_placer=None,
+        lava_placer=None,
+        max_steps=None,
+        max_tries=10,
+        **kwargs,
+    ):
+        self.layout = layout
+        self.num_cols, self.num_rows = layout.num_cols, layout.num_rows
+        self.rooms = {
+            key: BuildingRoom(cells) for key, cells in layout.rooms.items()
+        }
+        self.victim_placer = victim_placer or VictimPlacer(
+            num_fake_victims=1, num_real_victims=1
+        )
+        self.lava_placer = lava_placer
+        self.max_tries = max_tries
+
+        if max_steps is None:
+            max_steps = 4 * layout.width * layout.height
+        super().__init__(
+            grid_size=None,
+            width=layout.width,
+            height=layout.height,
+            agent_start_pos=None,
+            max_steps=max_steps,
+            **kwargs,
+        )
+
+    def get_room(self, i, j):
+        return self.rooms.get((i, j), NO_ROOM)
+
+    def place_in_room(self, i, j, obj):
+        """Put ``obj`` on a random free cell of room ``(i, j)``, if any."""
+        free = self._free_cells(self.get_room(i, j))
+        if not free:
+            return None
+        pos = self._rand_elem(free)
+        self.grid.set(*pos, obj)
+        obj.init_pos = obj.cur_pos = pos
+        return obj, pos
+
+    def _free_cells(self, room):
+        agent = tuple(self.agent_pos)
+        return [
+            pos for pos in room.cells if self.grid.get(*pos) is None and pos != agent
+        ]
+
+    def _gen_layout(self, width, height):
+        self.grid = self.grid_class(width, height)
+        cells = self.layout.cells
+        storage = self.grid.grid
+        for index, code in enumerate(cells.ravel().tolist()):
+            if code == osm.WALL:
+                storage[index] = WALL
+            elif code == osm.DOOR:
+                door = Door(self._rand_elem(COLOR_NAMES))
+                door.init_pos = door.cur_pos = (index % width, index // width)
+                storage[index] = door
+
+    def _gen_grid(self, width, height):
+        # Lava may cut victims off, in which case the contents are placed again
+        self.carrying = None
+        for attempt in range(self.max_tries):
+            self.agent_pos = (-1, -1)
+            self._gen_layout(width, height)
+            # The last attempt goes without lava, so it is always solvable
+            if self.lava_placer is not None and attempt < self.max_tries - 1:
+                # The placers take the room grid as (columns, rows)
+                self.lava_placer.place_all(self, self.num_cols, self.num_rows)
+
+            rooms = [room for room in self.rooms.values() if self._free_cells(room)]
+            if not rooms:
+                # Lava filled every room
+                continue
+            self.agent_pos = self._rand_elem(self._free_cells(self._rand_elem(rooms)))
+            self.agent_dir = self._rand_int(0, 4)
+
+            self.victim_placer.place_all(self, self.num_cols, self.num_rows)
+            if solve_reachability(self).solvable:
+                break
+
+        self.mission = "rescue all victims"
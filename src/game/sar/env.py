@@ -1,15 +1,30 @@
+import math
 import random
+from collections import deque
 
-from minigrid.core.world_object import Door
+from minigrid.core.world_object import Door, Key, Lava, Wall
+from minigrid.envs.babyai.core.roomgrid_level import RejectSampling
 
+from ..core.events import LavaDeath
+from ..core.layout import LayoutSkeleton
 from ..core.level import SARLevelGen
-from .actions import RescueAction
+from .actions import ActionMask, RescueAction
+from .events import VictimLost
 from .instructions import PickupAllVictimsInstr, calculate_max_steps
-from .objects import REAL_VICTIMS
+from .objects import KIND_REAL, REAL_VICTIMS, kind_of
+from .planner import RescuePlanner
+from .solver import solve_reachability
+from .symbolic import SymbolicGrid
 from .utils import LavaPlacer
 
 
+def _around(x, y):
+    return (x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)
+
+
 class PickupVictimEnv(SARLevelGen):
+    victim_types = REAL_VICTIMS
+
     def __init__(
         self,
         room_size=8,
@@ -22,6 +37,13 @@ class PickupVictimEnv(SARLevelGen):
         lava_probability=0.5,
         locked_room_prob=0.5,
         victim_placer=None,
+        planner_slack=None,
+        symbolic_obs=False,
+        reuse_layout=False,
+        large_map=False,
+        fire_spread=None,
+        victim_health=None,
+        lava_distance=None,
         **kwargs,
     ):
         # We add many distractors to increase the probability
@@ -46,8 +68,49 @@ class PickupVictimEnv(SARLevelGen):
                 lava_per_room=lava_per_room, lava_probability=lava_probability
             )
 
+        # Optimal rescue planner: when a slack factor is given, max_steps is
+        # set to the planned rescue length times the slack on every reset.
+        # The plan length is a relaxed lower bound (turns and door toggles
+        # are free), so the slack has to leave room above it.
+        if planner_slack is not None and planner_slack <= 1:
+            raise ValueError(f"planner_slack must be above 1, got {planner_slack}")
+        self.planner_slack = planner_slack
+        self.planner = None
+
+        # Optional fully observable symbolic grid, added to observations as "symbolic"
+        self.symbolic = None
+        if symbolic_obs:
+            self.symbolic = SymbolicGrid()
+            self.observation_space["symbolic"] = SymbolicGrid.space(
+                self.width, self.height
+            )
+
+        # Keep walls, doors, locked rooms and keys across resets and only
+        # place new lava, victims and agent (see new_layout)
+        self.reuse_layout = reuse_layout
+        self._layout = None
+
+        # Campus-scale maps (20x20 rooms and more): rooms are connected with a
+        # spanning tree instead of minigrid's sampling loop, so that
+        # generation is linear in the number of rooms (see gen_tree_layout)
+        self.large_map = large_map
+
+        # Optional core.hazard.FireSpread: lava spreads as fire every step
+        self.fire_spread = fire_spread
+        # Optional VictimHealth: victims deteriorate and are lost at zero
+        self.victim_health = victim_health
+        # Optional LavaDistance: distance-to-lava field, as an observation
+        # channel ("lava_distance") and a reward shaping near lava
+        self.lava_distance = lava_distance
+        if lava_distance is not None and lava_distance.observe:
+            self.observation_space["lava_distance"] = lava_distance.space(
+                self.agent_view_size
+            )
+
         # Custom actions
         self.resuce_action = RescueAction(self)
+        # Valid actions in the current state, also returned as info["action_mask"]
+        self.action_mask = ActionMask(self)
         self.saved_victims = 0
 
     def add_locked_rooms(self, n_locked):
@@ -94,6 +157,111 @@ class PickupVictimEnv(SARLevelGen):
 
             added += 1
 
+    def gen_tree_layout(self, n_locked):
+        """
+        Doors of a large map, linear in the number of rooms.
+
+        The doors form a random spanning tree over all rooms (Kruskal's
+        algorithm on shuffled room walls). Locked rooms are picked among the
+        leaves of the tree, so the unlocked rooms stay connected and every
+        key can be placed in any of them; minigrid's ``connect_all`` instead
+        samples doors one by one and recomputes reachability after each.
+        Maps with few leaves get fewer than ``n_locked`` locked rooms.
+        """
+        edges, degree = self._spanning_tree()
+        locked = self._lock_leaves(edges, degree, n_locked)
+
+        unlocked = [
+            (i, j)
+            for j in range(self.num_rows)
+            for i in range(self.num_cols)
+            if self.get_room(i, j) not in locked
+        ]
+        for i, j, k in edges:
+            room = self.get_room(i, j)
+            if room not in locked and room.neighbors[k] not in locked:
+                self.add_door(i, j, k, locked=False)
+        for room, ((i, j), door_idx) in locked.items():
+            door, _ = self.add_door(i, j, door_idx, locked=True)
+            ki, kj = unlocked[self._rand_int(0, len(unlocked))]
+            self.add_object(ki, kj, "key", door.color)
+
+    def _spanning_tree(self):
+        """
+        Random spanning tree over the rooms.
+
+        Returns:
+            tuple: ``(i, j, k)`` room walls of the tree, and the number of
+                tree doors of each room
+        """
+        parent = {}
+
+        def find(room):
+            while parent.setdefault(room, room) is not room:
+                parent[room] = parent[parent[room]]
+                room = parent[room]
+            return room
+
+        # Walls to the right and down neighbours, so each is listed once
+        walls = [
+            (i, j, k)
+            for j in range(self.num_rows)
+            for i in range(self.num_cols)
+            for k in (0, 1)
+            if self.get_room(i, j).neighbors[k] is not None
+        ]
+        edges = []
+        degree = {}
+        for index in self.np_random.permutation(len(walls)):
+            i, j, k = walls[index]
+            room = self.get_room(i, j)
+            neighbor = room.neighbors[k]
+            root, other = find(room), find(neighbor)
+            if root is other:
+                continue
+            parent[root] = other
+            edges.append(walls[index])
+            degree[room] = degree.get(room, 0) + 1
+            degree[neighbor] = degree.get(neighbor, 0) + 1
+        return edges, degree
+
+    def _lock_leaves(self, edges, degree, n_locked):
+        """
+        Up to ``n_locked`` leaves of the tree to lock, no two on one edge.
+
+        Returns:
+            dict: Leaf room -> ``((i, j), door_idx)`` of its only door
+        """
+        leaves = {}
+        for i, j, k in edges:
+            room = self.get_room(i, j)
+            neighbor = room.neighbors[k]
+            if degree[room] == 1:
+                leaves[room] = ((i, j), k, neighbor)
+            if degree[neighbor] == 1:
+                ni, nj = (i + 1, j) if k == 0 else (i, j + 1)
+                leaves[neighbor] = ((ni, nj), k + 2, room)
+        leaves = list(leaves.items())
+        locked = {}
+        for index in self.np_random.permutation(len(leaves)):
+            if len(locked) == n_locked:
+                break
+            leaf, (pos, door_idx, other) = leaves[index]
+            if other not in locked:
+                locked[leaf] = (pos, door_idx)
+        return locked
+
+    def _count_doors(self):
+        """Doors of the current level, read from the rooms instead of the grid."""
+        rooms = getattr(self, "room_grid", ())
+        # Right and down doors only, each shared door is stored on both rooms
+        return sum(
+            isinstance(door, Door)
+            for row in rooms
+            for room in row
+            for door in room.doors[:2]
+        )
+
     def _count_objects_by_type(self, obj_types):
         """
         Utility method to count objects of specific types on the grid.
@@ -130,11 +298,27 @@ class PickupVictimEnv(SARLevelGen):
                     objects.append(obj)
         return objects
 
+    def _count_objects_by_kind(self, kind):
+        """
+        Count objects with the given integer kind code (see ``objects.KIND_*``).
+
+        Faster than ``_count_objects_by_type``: one pass over the flat grid
+        storage with an integer comparison per object.
+        """
+        if hasattr(self.grid, "count_kind"):
+            return self.grid.count_kind(kind)
+        storage = self.grid.grid
+        return sum(1 for obj in storage if kind_of(obj) == kind)
+
+    def _find_objects_by_kind(self, kind):
+        """Objects with the given integer kind code, in grid storage order."""
+        return [obj for obj in self.grid.grid if kind_of(obj) == kind]
+
     def get_all_victims(self):
         """
         Returns a list of all victim objects currently present in the environment.
         """
-        return self._find_objects_by_type(REAL_VICTIMS)
+        return self._find_objects_by_kind(KIND_REAL)
 
     def get_mission_status(self):
         """
@@ -145,6 +329,7 @@ class PickupVictimEnv(SARLevelGen):
                 - 'status': 'success', 'failure', or 'incomplete'
                 - 'saved_victims': Number of victims saved
                 - 'total_victims': Total number of victims in the mission
+                - 'lost_victims': Number of victims whose health ran out
                 - 'remaining_victims': Number of victims left to save
         """
         if hasattr(self, "instrs") and self.instrs is not None:
@@ -152,12 +337,16 @@ class PickupVictimEnv(SARLevelGen):
         else:
             status = "incomplete"
 
-        # Count remaining victims on the grid
-        remaining_victims = len(self.get_all_victims())
+        # Kept up to date by the instruction, no need to scan the grid
+        if hasattr(self, "instrs") and self.instrs is not None:
+            remaining_victims = self.instrs.remaining
+        else:
+            remaining_victims = len(self.get_all_victims())
 
         return {
             "status": status,
             "saved_victims": self.saved_victims,
+            "lost_victims": self.lost_victims,
             "remaining_victims": remaining_victims,
         }
 
@@ -200,23 +389,103 @@ class PickupVictimEnv(SARLevelGen):
             num_cols=self.num_cols,
             num_rows=self.num_rows,
             victims_per_room=self.victim_placer.num_real_victims,
-            num_doors=self._count_objects_by_type(Door),
+            num_doors=self._count_doors(),
         )
         self.max_steps = self.fixed_max_steps
-        return super().reset(**kwargs)
+        obs, info = super().reset(**kwargs)
+        if self.fire_spread is not None:
+            self.fire_spread.reset(self.grid, self.np_random)
+        if self.victim_health is not None:
+            self.victim_health.reset(self)
+
+        self.planner = None
+        if self.planner_slack is not None:
+            self.planner = RescuePlanner(self)
+            self.rescue_plan = self.planner.plan()
+            self.max_steps = max(
+                1, math.ceil(self.rescue_plan.length * self.planner_slack)
+            )
+        info["action_mask"] = self.action_mask.update().copy()
+        return obs, info
+
+    def gen_obs(self):
+        obs = super().gen_obs()
+        if obs is not None and self.symbolic is not None:
+            obs["symbolic"] = self.symbolic.observe(self)
+        if obs is not None and self.lava_distance is not None:
+            if self.lava_distance.observe:
+                obs["lava_distance"] = self.lava_distance.view(self, obs["image"])
+        return obs
+
+    @property
+    def lost_victims(self):
+        """Victims whose health ran out, 0 without ``victim_health``."""
+        if self.victim_health is None:
+            return 0
+        return self.victim_health.lost_count()
+
+    def restore(self, snapshot):
+        if self.victim_health is not None:
+            self.victim_health.invalidate()
+        super().restore(snapshot)
+        if self.fire_spread is not None:
+            self.fire_spread.reset(self.grid, self.np_random)
+            if self.lava_distance is not None:
+                self.lava_distance.reset(self.grid)
+        self.action_mask.update()
+        if self.planner is not None:
+            self.planner.reset()
+
+    def new_layout(self):
+        """Generate a new building on the next reset when reusing layouts."""
+        self._layout = None
+
+    def _gen_grid(self, width, height, max_tries=10):
+        if self._layout is not None and self._layout.matches(self):
+            for _ in range(max_tries):
+                self._layout.restore(self)
+                try:
+                    self.gen_contents()
+                    self.validate_instrs(self.instrs)
+                except RejectSampling:
+                    # Expected now and then, try other contents
+                    continue
+                # Same final steps as a full generation
+                self.surface = self.instrs.surface(self)
+                self.mission = self.surface
+                return
+        super()._gen_grid(width, height)
 
     def gen_mission(self):
         """Generate the mission layout and instructions."""
+        self.gen_layout()
+        if self.reuse_layout:
+            self._layout = LayoutSkeleton(self)
+        self.gen_contents()
 
+    def gen_layout(self):
+        """Walls and doors of the rooms, locked rooms and their keys."""
         # Add locked rooms (20% of rooms - balanced between challenge and generation speed)
         n_locked = max(1, int(self.num_cols * self.num_rows * self.locked_room_prob))
+        if self.large_map:
+            self.gen_tree_layout(n_locked)
+            return
         self.add_locked_rooms(n_locked)
 
         self.connect_all()
 
+    def gen_contents(self):
+        """Lava, agent and victims on top of the layout, then the instruction."""
+
+        # minigrid only clears the carried object after generation, and the
+        # reachability check must not count a key left over from the last episode
+        self.carrying = None
+
         # Add lava obstacles (before victims to avoid blocking them)
         if self.add_lava:
             self.lava_placer.place_all(self, self.num_rows, self.num_cols)
+            if self.large_map:
+                self._clear_doorways()
 
         # Place agent outside locked room
         while True:
@@ -225,22 +494,277 @@ class PickupVictimEnv(SARLevelGen):
             if not start_room.locked:
                 break
 
-        # Check that all objects (including victims) are reachable from agent start position
+        self.victim_placer.place_all(self, self.num_rows, self.num_cols)
+
+        # Check that all victims and keys are reachable from the agent start
+        # position, repairing the level locally where they are not
         if not self.unblocking:
-            self.check_objs_reachable()
+            self.ensure_solvable()
 
-        # Add victims after checking reachability
-        self.victim_placer.place_all(self, self.num_rows, self.num_cols)
+        # Final lava of the level: distances to it
+        if self.lava_distance is not None:
+            self.lava_distance.reset(self.grid)
 
         victims = self.get_all_victims()
 
         # Create instruction to pick up all victims
         self.instrs = PickupAllVictimsInstr(victims)
 
+    def ensure_solvable(self, max_repairs=10):
+        """
+        Make every victim and key reachable, in key order.
+
+        Unreachable objects are fixed in place instead of regenerating the
+        level: an object cut off inside a partly reachable room is moved to
+        a reachable cell of that room. When the whole room is cut off, the
+        key of the nearest locked door on the edge of the reachable area is
+        moved within reach (or added if missing), and failing that the one
+        lava cell that opens the way to it is removed.
+
+        Args:
+            max_repairs: Repairs to try before giving up
+
+        Returns:
+            Reachability: Result of the final check
+
+        Raises:
+            RejectSampling: If the level is still unsolvable after the repairs
+        """
+        for _ in range(max_repairs):
+            result = solve_reachability(self)
+            if result.solvable:
+                return result
+            if self.large_map and self._repair_in_rooms(result):
+                continue
+            self._repair(*result.unreachable[0], result.reached, result.opened)
+
+        result = solve_reachability(self)
+        if not result.solvable:
+            raise RejectSampling("unreachable " + result.describe())
+        return result
+
+    def _clear_doorways(self):
+        """Remove lava next to doors, so it cannot cut off whole rooms."""
+        for row in self.room_grid:
+            for room in row:
+                # Right and down doors, the others belong to the neighbours
+                for door, pos in zip(room.doors[:2], room.door_pos[:2]):
+                    if door is None:
+                        continue
+                    x, y = pos
+                    for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                        if isinstance(self.grid.get(nx, ny), Lava):
+                            self.grid.set(nx, ny, None)
+
+    def _repair_in_rooms(self, result):
+        """
+        Move every unreachable object that is blocked inside a partly
+        reachable room, all in one pass instead of one per reachability check.
+
+        Returns:
+            bool: True if any object was moved
+        """
+        moved = False
+        for pos, _ in result.unreachable:
+            cells = self._free_cells(result.reached, self.room_from_pos(*pos))
+            if cells:
+                dst = self._rand_elem(cells)
+                self._move_object(pos, dst)
+                result.reached[dst] = False  # taken
+                moved = True
+        return moved
+
+    def _free_cells(self, reached, room=None):
+        """Empty reachable cells, inside ``room`` if given."""
+        rooms = [room] if room else [r for row in self.room_grid for r in row]
+        cells = []
+        for r in rooms:
+            (tx, ty), (sx, sy) = r.top, r.size
+            for x in range(tx + 1, tx + sx - 1):
+                for y in range(ty + 1, ty + sy - 1):
+                    if reached[x, y] and self.grid.get(x, y) is None:
+                        cells.append((x, y))
+        agent = tuple(int(v) for v in self.agent_pos)
+        return [cell for cell in cells if cell != agent]
+
+    def _move_object(self, src, dst):
+        obj = self.grid.get(*src)
+        self.grid.set(*src, None)
+        self.grid.set(*dst, obj)
+        obj.init_pos = obj.cur_pos = dst
+
+    def _repair(self, pos, obj, reached, opened):
+        """Apply one local repair for the unreachable object at ``pos``."""
+        room = self.room_from_pos(*pos)
+        cells = self._free_cells(reached, room)
+        if cells:
+            # Blocked inside its own room (lava or a wall of objects)
+            self._move_object(pos, self._rand_elem(cells))
+        elif not self._bring_key(pos, reached, opened):
+            # Cut off by lava: clear the one cell that opens the way
+            lava = self._blocking_lava(pos, reached)
+            if lava is None:
+                raise RejectSampling(f"{obj.type} at {pos} is walled off")
+            self.grid.set(*lava, None)
+
+    def _bring_key(self, pos, reached, opened):
+        """
+        Bring the key of the nearest locked door on the edge of the reachable
+        area within reach, adding one if missing. False if there is no such
+        door or no reachable free cell.
+        """
+        frontier = []
+        for x in range(self.width):
+            for y in range(self.height):
+                door = self.grid.get(x, y)
+                if not isinstance(door, Door) or not door.is_locked:
+                    continue
+                if (x, y) not in opened and any(reached[c] for c in _around(x, y)):
+                    dist = abs(x - pos[0]) + abs(y - pos[1])
+                    frontier.append((dist, (x, y), door))
+
+        cells = self._free_cells(reached)
+        if not (frontier and cells):
+            return False
+
+        _, _, door = min(frontier, key=lambda item: item[:2])
+        keys = [
+            (x, y)
+            for x in range(self.width)
+            for y in range(self.height)
+            if isinstance(self.grid.get(x, y), Key)
+            and self.grid.get(x, y).color == door.color
+            and not reached[x, y]
+        ]
+        dst = self._rand_elem(cells)
+        if keys:
+            self._move_object(keys[0], dst)
+        else:
+            self.grid.set(*dst, Key(door.color))
+        return True
+
+    def _blocking_lava(self, pos, reached):
+        """
+        Lava cell on the edge of the reachable area that starts the path to
+        ``pos`` crossing the fewest lava cells, or None if walls or locked
+        doors are in the way.
+        """
+        # 0-1 BFS out from pos: lava costs one, any other passable cell none
+        costs = {pos: 0}
+        queue = deque([pos])
+        while queue:
+            cell = queue.popleft()
+            lava = isinstance(self.grid.get(*cell), Lava)
+            if lava and any(reached[c] for c in _around(*cell)):
+                return cell
+            for nxt in _around(*cell):
+                obj = self.grid.get(*nxt)
+                if isinstance(obj, Wall) or (isinstance(obj, Door) and obj.is_locked):
+                    continue
+                cost = costs[cell] + isinstance(obj, Lava)
+                if cost < costs.get(nxt, cost + 1):
+                    costs[nxt] = cost
+                    if isinstance(obj, Lava):
+                        queue.append(nxt)
+                    else:
+                        queue.appendleft(nxt)
+        return None
+
     def _step(self, action):
         return super().step(action)
 
+    def _sync_caches(self, action, fwd_pos, fwd_obj, was_locked):
+        """Keep the planner and the room graph in sync with the front cell."""
+        after = self.grid.get(*fwd_pos)
+        if after is fwd_obj:
+            if was_locked and not fwd_obj.is_locked and self.planner is not None:
+                self.planner.cell_opened(fwd_pos)
+            return
+        if self._room_graph is not None:
+            if fwd_obj is not None:
+                self._room_graph.object_removed(fwd_pos, fwd_obj)
+            if after is not None:
+                self._room_graph.object_added(fwd_pos, after)
+        if self.planner is not None:
+            if action == self.actions.drop:
+                self.planner.reset()
+            else:
+                self.planner.object_removed(fwd_pos)
+
+    def _spread_fire(self):
+        """
+        Advance the fire by one step, turning the cells it reached into lava.
+
+        Returns:
+            list: ``(x, y)`` of the cells that caught fire
+        """
+        ignited = self.fire_spread.step()
+        for pos in ignited:
+            self._journal.record(pos)
+            self.grid.set(*pos, Lava())
+            if self.lava_distance is not None:
+                self.lava_distance.lava_added(pos)
+        if ignited and self.planner is not None:
+            self.planner.reset()
+        return ignited
+
+    def _burned(self):
+        """End the episode when the fire reached the agent's cell."""
+        self.step_count += 1
+        self.events.emit(LavaDeath, tuple(self.agent_pos))
+        info = {"action_mask": self.action_mask.update().copy()}
+        truncated = self.step_count >= self.max_steps
+        return self.gen_obs(), 0, True, truncated, info
+
+    def _expire_victims(self):
+        """
+        Remove the victims whose health runs out during the coming step.
+
+        Returns:
+            list: ``(x, y)`` of the lost victims
+        """
+        lost = self.victim_health.expire(self.step_count + 1)
+        for pos in lost:
+            victim = self.grid.get(*pos)
+            self._journal.record(pos)
+            self.grid.set(*pos, None)
+            if self._room_graph is not None:
+                self._room_graph.object_removed(pos, victim)
+            if self.planner is not None:
+                self.planner.object_removed(pos)
+            if self.fire_spread is not None:
+                self.fire_spread.update_cell(pos, None)
+            self.events.emit(VictimLost, pos, victim)
+        return lost
+
     def step(self, action):
+        # The fire spreads before the agent acts, so observations show it
+        if self.fire_spread is not None:
+            agent_pos = tuple(int(v) for v in self.agent_pos)
+            if agent_pos in self._spread_fire():
+                return self._burned()
+        lost = self.victim_health is not None and self._expire_victims()
+
+        fwd_pos = tuple(int(v) for v in self.front_pos)
+        fwd_obj = self.grid.get(*fwd_pos)
+        was_locked = isinstance(fwd_obj, Door) and fwd_obj.is_locked
+        obs, reward, terminated, truncated, info = self._dispatch(action)
+        self._sync_caches(action, fwd_pos, fwd_obj, was_locked)
+        if self.fire_spread is not None and action in (
+            self.actions.pickup,
+            self.actions.drop,
+            self.actions.toggle,
+        ):
+            self.fire_spread.update_cell(fwd_pos, self.grid.get(*fwd_pos))
+        if lost and self.instrs.verify(action) == "success":
+            # No victim left to rescue
+            terminated = True
+        if self.lava_distance is not None:
+            reward += self.lava_distance.shaping(self.agent_pos)
+        info["action_mask"] = self.action_mask.update().copy()
+        return obs, reward, terminated, truncated, info
+
+    def _dispatch(self, action):
         if action == self.actions.pickup:
             obs, reward, terminated, truncated, info = self.resuce_action.execute(
                 action
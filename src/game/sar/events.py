@@ -0,0 +1,21 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class VictimRescued:
+    pos: tuple
+    victim: object
+
+
+@dataclass(frozen=True, slots=True)
+class FakePicked:
+    pos: tuple
+    victim: object
+
+
+@dataclass(frozen=True, slots=True)
+class VictimLost:
+    """A victim's health ran out before the rescue."""
+
+    pos: tuple
+    victim: object
@@ -0,0 +1,130 @@
+import numpy as np
+
+from .events import VictimRescued
+from .objects import KIND_REAL, kind_of
+
+
+class VictimHealth:
+    """
+    Health of every real victim, running out over the episode.
+
+    Victims are indexed in grid storage order at reset. Victim ``i`` starts
+    with ``initial[i]`` health (in ``(0, 1]``) and loses ``rate[i]`` per
+    step, so its health at step ``t`` is ``initial[i] - rate[i] * t`` and it
+    is lost at step ``death[i]``. Health is a function of the step count
+    rather than a value decayed every step: a step only compares the step
+    count with the next death, and snapshots restore health with the step
+    count. ``health`` evaluates all victims in one array operation.
+
+    Lost victims are removed from the grid. The rescue reward of
+    ``RescueAction`` is scaled by the health left.
+    """
+
+    def __init__(self, initial=(0.5, 1.0), lifetime=(200, 600)):
+        """
+        Args:
+            initial: Range of the starting health, drawn per victim
+            lifetime: Range of the steps a victim at full health survives,
+                drawn per victim (the decay rate is its inverse)
+        """
+        self.initial_range = initial
+        self.lifetime_range = lifetime
+        self.env = None
+        self.positions = np.zeros((0, 2), dtype=np.intp)
+        self.index = {}
+        self.initial = np.zeros(0)
+        self.rate = np.zeros(0)
+        self.death = np.zeros(0, dtype=np.int64)
+        self.present = np.zeros(0, dtype=bool)
+        self.lost = 0
+        self._next_death = 0
+        self._stale = False
+
+    def reset(self, env):
+        """Index the victims of a new level and draw their health."""
+        self.env = env
+        grid = env.grid
+        positions = [
+            (index % grid.width, index // grid.width)
+            for index, obj in enumerate(grid.grid)
+            if kind_of(obj) == KIND_REAL
+        ]
+        count = len(positions)
+        self.positions = np.array(positions, dtype=np.intp).reshape(count, 2)
+        self.index = {pos: i for i, pos in enumerate(positions)}
+        self.initial = env.np_random.uniform(*self.initial_range, size=count)
+        self.rate = 1.0 / env.np_random.uniform(*self.lifetime_range, size=count)
+        self.death = np.ceil(self.initial / self.rate).astype(np.int64)
+        self.present = np.ones(count, dtype=bool)
+        self.lost = 0
+        self._next_death = int(self.death.min()) if count else np.iinfo(np.int64).max
+        self._stale = False
+        env.events.subscribe(VictimRescued, self._on_rescued, episode=True)
+
+    def invalidate(self):
+        """Re-read which victims are left on the next access, e.g. after a restore."""
+        self._stale = True
+
+    def _sync(self):
+        self._stale = False
+        env = self.env
+        self.present = np.array(
+            [
+                getattr(env.grid.get(x, y), "kind", None) == KIND_REAL
+                for x, y in self.positions.tolist()
+            ],
+            dtype=bool,
+        )
+        # Victims leave the grid by being rescued or lost
+        self.lost = len(self.present) - int(self.present.sum()) - env.saved_victims
+        self._update_next_death()
+
+    def _update_next_death(self):
+        left = self.death[self.present]
+        self._next_death = int(left.min()) if len(left) else np.iinfo(np.int64).max
+
+    def _on_rescued(self, event):
+        index = self.index.get(tuple(int(v) for v in event.pos))
+        if index is not None:
+            self.present[index] = False
+
+    def health(self, step=None):
+        """Health of every victim at ``step`` (default: now), 0 once gone."""
+        if self._stale:
+            self._sync()
+        step = self.env.step_count if step is None else step
+        health = np.maximum(self.initial - self.rate * step, 0.0)
+        health[~self.present] = 0.0
+        return health
+
+    def health_at(self, pos):
+        """Current health of the victim at ``pos``, or None if it is not one."""
+        if self._stale:
+            self._sync()
+        index = self.index.get(tuple(int(v) for v in pos))
+        if index is None:
+            return None
+        step = self.env.step_count
+        return max(self.initial[index] - self.rate[index] * step, 0.0)
+
+    def lost_count(self):
+        if self._stale:
+            self._sync()
+        return self.lost
+
+    def expire(self, step):
+        """
+        Victims whose health runs out by ``step``, removed from the present set.
+
+        Returns:
+            list: ``(x, y)`` of the victims lost, empty on almost every step
+        """
+        if self._stale:
+            self._sync()
+        if step < self._next_death:
+            return []
+        lost = np.flatnonzero(self.present & (self.death <= step))
+        self.present[lost] = False
+        self.lost += len(lost)
+        self._update_next_death()
+        return [tuple(pos) for pos in self.positions[lost].tolist()]
@@ -1,6 +1,8 @@
 from minigrid.envs.babyai.core.verifier import Instr
 
-from .objects import REAL_VICTIMS
+from ..core.events import StateRestored
+from .events import VictimLost, VictimRescued
+from .objects import KIND_REAL
 
 
 def calculate_max_steps(
@@ -82,6 +84,33 @@ class PickupAllVictimsInstr(Instr):
         self.victims = victims
         self.victim_types = [type(v) for v in victims]
         self.num_victims = len(victims)
+        self.remaining = self.num_victims
+
+    def reset_verifier(self, env):
+        """
+        Count the victims once and follow rescues through the env's events.
+
+        Victims only leave the grid through rescues and losses (see
+        ``VictimHealth``), so after a restore the count follows from the
+        restored ``saved_victims`` and ``lost_victims``.
+        """
+        super().reset_verifier(env)
+        self.remaining = env._count_objects_by_kind(KIND_REAL)
+        self._total = self.remaining + env.saved_victims
+        env.events.subscribe(VictimRescued, self._on_rescued, episode=True)
+        env.events.subscribe(VictimLost, self._on_lost, episode=True)
+        env.events.subscribe(StateRestored, self._on_restored, episode=True)
+
+    def _on_rescued(self, event):
+        self.remaining -= 1
+
+    def _on_lost(self, event):
+        self.remaining -= 1
+
+    def _on_restored(self, event):
+        self.remaining = (
+            self._total - self.env.saved_victims - self.env.lost_victims
+        )
 
     def verify(self, action):
         """
@@ -93,11 +122,8 @@ class PickupAllVictimsInstr(Instr):
         Returns:
             str: 'success' if all victims picked up, 'continue' otherwise
         """
-        # Use utility method to count remaining victims
-        remaining_victims = self.env._count_objects_by_type(REAL_VICTIMS)
-
         # All victims have been picked up
-        if remaining_victims == 0:
+        if self.remaining == 0:
             return "success"
 
         # Still victims to pick up
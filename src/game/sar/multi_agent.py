@@ -0,0 +1,309 @@
+import numpy as np
+from gymnasium import spaces
+from minigrid.core.actions import Actions
+from minigrid.core.constants import DIR_TO_VEC, OBJECT_TO_IDX, STATE_TO_IDX
+from minigrid.core.world_object import Lava
+
+from ..core.layout import WALL
+from ..core.observation import EMPTY, batch_process_vis, view_offsets
+from .env import PickupVictimEnv
+
+AGENT = OBJECT_TO_IDX["agent"]
+WALL_IDX = OBJECT_TO_IDX["wall"]
+DOOR_IDX = OBJECT_TO_IDX["door"]
+OPEN = STATE_TO_IDX["open"]
+FORWARD = np.array(DIR_TO_VEC)
+
+
+class MultiAgentRescueEnv(PickupVictimEnv):
+    """
+    Team of ``num_agents`` rescuers acting simultaneously on one level.
+
+    ``step`` takes one action per agent and returns batched observations,
+    per-agent rewards and team-wide ``terminated``/``truncated`` flags. Agent
+    0 is minigrid's own agent (``agent_pos``, ``agent_dir``, ``carrying``),
+    so rendering and the single-agent helpers follow it; all agents live in
+    ``positions``, ``directions`` and ``carried``.
+
+    Conflicts are resolved deterministically, by agent index:
+
+    - Pickups, drops and toggles happen first, in agent order, so when two
+      agents face the same victim the lower index rescues it and the other
+      finds the cell empty. Nothing is dropped on a cell holding an agent.
+    - Moves are resolved on the result: when several agents move into the
+      same cell the lowest index wins; a move into a cell held by an agent
+      that does not leave it (or that moves into the mover's cell, a swap)
+      is blocked. Chains and rotations of agents moving in a row go through.
+
+    ``occupancy`` is a ``(width, height)`` array holding the index of the
+    agent on each cell, or -1, so collision checks are array lookups.
+    Observations are gathered for all agents at once from an encoding of
+    the grid that is only updated on the cells the agents changed; other
+    agents show up in views as minigrid ``agent`` cells with their direction.
+
+    Snapshots and the rescue planner only cover agent 0.
+    """
+
+    def __init__(self, num_agents=2, **kwargs):
+        self.num_agents = num_agents
+        super().__init__(**kwargs)
+
+        size = self.agent_view_size
+        self._offsets = view_offsets(size)
+        self.observation_space = spaces.Dict(
+            {
+                "image": spaces.Box(
+                    0, 255, (num_agents, size, size, 3), dtype=np.uint8
+                ),
+                "direction": spaces.Box(0, 3, (num_agents,), dtype=np.int64),
+                "mission": self.observation_space["mission"],
+            }
+        )
+        self.action_space = spaces.MultiDiscrete([len(Actions)] * num_agents)
+
+        self.positions = np.zeros((num_agents, 2), dtype=np.intp)
+        self.directions = np.zeros(num_agents, dtype=np.intp)
+        self.carried = [None] * num_agents
+        self._last_rescuer = None
+        self.occupancy = None
+        # Grid encoding padded with `size` cells of wall on every side, so
+        # that views never need bounds checks
+        self._encoded = None
+        self._occupancy = None
+
+    def reset(self, **kwargs):
+        _, info = super().reset(**kwargs)
+
+        size = self.agent_view_size
+        self._encoded = np.empty(
+            (self.width + 2 * size, self.height + 2 * size, 3), dtype=np.uint8
+        )
+        self._encoded[...] = WALL.encode()
+        self._encoded[size:-size, size:-size] = self.grid.encode()
+        self._occupancy = np.full(self._encoded.shape[:2], -1, dtype=np.intp)
+        self.occupancy = self._occupancy[size:-size, size:-size]
+
+        self.carried = [None] * self.num_agents
+        self.positions[0] = self.agent_pos
+        self.directions[0] = self.agent_dir
+        self.occupancy[tuple(self.agent_pos)] = 0
+        for agent in range(1, self.num_agents):
+            self._place_teammate(agent)
+
+        return self.gen_batch_obs(), info
+
+    def _place_teammate(self, agent):
+        """Put ``agent`` on a free cell of a random unlocked room."""
+        while True:
+            room = self.get_room(
+                self._rand_int(0, self.num_cols), self._rand_int(0, self.num_rows)
+            )
+            if not room.locked:
+                break
+        pos = self.place_obj(
+            None,
+            room.top,
+            room.size,
+            reject_fn=lambda env, pos: env.occupancy[pos] >= 0,
+        )
+        self.positions[agent] = pos
+        self.directions[agent] = self._rand_int(0, 4)
+        self.occupancy[pos] = agent
+
+    def _encode_cell(self, pos):
+        obj = self.grid.get(*pos)
+        size = self.agent_view_size
+        self._encoded[pos[0] + size, pos[1] + size] = (
+            EMPTY if obj is None else obj.encode()
+        )
+
+    def gen_batch_obs(self):
+        """
+        Observations of all agents, gathered in one pass.
+
+        Returns:
+            dict: ``image`` of shape ``(num_agents, view, view, 3)`` with the
+            same encoding as ``MiniGridEnv.gen_obs``, ``direction`` of shape
+            ``(num_agents,)`` and the shared ``mission``
+        """
+        size = self.agent_view_size
+        xs = self.positions[:, 0, None, None] + self._offsets[self.directions, 0]
+        ys = self.positions[:, 1, None, None] + self._offsets[self.directions, 1]
+        xs += size
+        ys += size
+        image = self._encoded[xs, ys]
+
+        if self.see_through_walls:
+            visible = None
+        else:
+            types, states = image[..., 0], image[..., 2]
+            opaque = (types == WALL_IDX) | ((types == DOOR_IDX) & (states != OPEN))
+            visible = batch_process_vis(opaque)
+
+        # Teammates in view
+        others = self._occupancy[xs, ys]
+        seen = (others >= 0) & (others != np.arange(self.num_agents)[:, None, None])
+        if seen.any():
+            image[seen, 0] = AGENT
+            image[seen, 1] = 0
+            image[seen, 2] = self.directions[others[seen]]
+
+        # Each agent sees what it carries in its own cell
+        for agent, obj in enumerate(self.carried):
+            image[agent, size // 2, size - 1] = EMPTY if obj is None else obj.encode()
+
+        if visible is not None:
+            image[~visible] = 0
+        if self.seen_cells is not None:
+            self.seen_cells.observe(self.positions, self.directions, image)
+        return {
+            "image": image,
+            "direction": self.directions.copy(),
+            "mission": self.mission,
+        }
+
+    def step(self, actions):
+        """
+        Apply one action per agent.
+
+        Returns:
+            tuple: ``(obs, rewards, terminated, truncated, info)`` with batched
+            observations (see ``gen_batch_obs``) and a float array of
+            per-agent rewards; ``info["blocked"]`` lists the agents whose
+            move lost a conflict
+        """
+        actions = np.asarray(actions)
+        assert actions.shape == (self.num_agents,)
+        rewards = np.zeros(self.num_agents, dtype=np.float32)
+        self._last_rescuer = None
+
+        # The fire spreads first, ending the episode if it reaches an agent
+        terminated = self._update_hazards()
+        self.step_count += 1
+
+        fronts = self.positions + FORWARD[self.directions]
+        self._turn_and_interact(actions, fronts, rewards)
+
+        if self.instrs.verify(None) == "success":
+            terminated = True
+            # Completion bonus for the agent that rescued the last victim
+            if self._last_rescuer is not None:
+                rewards[self._last_rescuer] += 1.0
+
+        moving, blocked = self._resolve_moves(actions, fronts)
+        terminated |= self._apply_moves(moving)
+
+        if self.lava_distance is not None:
+            for agent, pos in enumerate(self.positions.tolist()):
+                rewards[agent] += self.lava_distance.shaping(pos)
+
+        # Agent 0 is minigrid's agent
+        self.agent_pos = tuple(int(v) for v in self.positions[0])
+        self.agent_dir = int(self.directions[0])
+        self.carrying = self.carried[0]
+
+        truncated = self.step_count >= self.max_steps
+        info = {"blocked": blocked}
+        return self.gen_batch_obs(), rewards, terminated, truncated, info
+
+    def _update_hazards(self):
+        """Spread the fire and expire victims; whether the fire hit an agent."""
+        burned = False
+        if self.fire_spread is not None:
+            for pos in self._spread_fire():
+                self._encode_cell(pos)
+                burned |= bool(self.occupancy[pos] >= 0)
+        if self.victim_health is not None:
+            for pos in self._expire_victims():
+                self._encode_cell(pos)
+        return burned
+
+    def _turn_and_interact(self, actions, fronts, rewards):
+        """Apply the turns and the front-cell actions, adding to ``rewards``."""
+        for agent, action in enumerate(actions.tolist()):
+            if action == Actions.left:
+                self.directions[agent] = (self.directions[agent] - 1) % 4
+            elif action == Actions.right:
+                self.directions[agent] = (self.directions[agent] + 1) % 4
+            elif action in (Actions.pickup, Actions.drop, Actions.toggle):
+                rewards[agent] += self._interact(agent, action, tuple(fronts[agent]))
+
+    def _apply_moves(self, moving):
+        """Move the agents of ``moving``; whether one stepped into lava."""
+        if not moving:
+            return False
+        movers = list(moving)
+        self.occupancy[tuple(self.positions[movers].T)] = -1
+        into_lava = False
+        for agent, target in moving.items():
+            self.positions[agent] = target
+            self.occupancy[target] = agent
+            into_lava |= isinstance(self.grid.get(*target), Lava)
+        return into_lava
+
+    def _interact(self, agent, action, pos):
+        """Pickup, drop or toggle of one agent on its front cell; the reward."""
+        obj = self.grid.get(*pos)
+        reward = 0.0
+        if action == Actions.pickup:
+            rescued = self.resuce_action.rescue(pos)
+            if rescued is not None:
+                reward = rescued
+                if rescued > 0:
+                    self._last_rescuer = agent
+            elif obj is not None and obj.can_pickup() and self.carried[agent] is None:
+                self._journal.record(pos)
+                self.grid.set(*pos, None)
+                obj.cur_pos = (-1, -1)
+                self.carried[agent] = obj
+        elif action == Actions.drop:
+            carried = self.carried[agent]
+            if carried is not None and obj is None and self.occupancy[pos] < 0:
+                self._journal.record(pos)
+                self.grid.set(*pos, carried)
+                carried.cur_pos = pos
+                self.carried[agent] = None
+        elif obj is not None:
+            # Door.toggle looks for the key in env.carrying
+            self._journal.record(pos)
+            self.carrying = self.carried[agent]
+            obj.toggle(self, pos)
+        self._encode_cell(pos)
+        self._room_graph = None
+        if self.fire_spread is not None:
+            self.fire_spread.update_cell(pos, self.grid.get(*pos))
+        return reward
+
+    def _resolve_moves(self, actions, fronts):
+        """
+        Moves that go through, as ``{agent: target}``, and the blocked agents.
+        """
+        moving = {}
+        claimed = set()
+        blocked = []
+        for agent in np.flatnonzero(actions == Actions.forward).tolist():
+            target = tuple(int(v) for v in fronts[agent])
+            obj = self.grid.get(*target)
+            if obj is not None and not obj.can_overlap():
+                continue
+            if target in claimed:
+                # A lower index already claimed the cell
+                blocked.append(agent)
+                continue
+            claimed.add(target)
+            moving[agent] = target
+
+        # Drop moves into cells that stay occupied, until none is left
+        changed = True
+        while changed:
+            changed = False
+            for agent, target in list(moving.items()):
+                other = int(self.occupancy[target])
+                if other < 0:
+                    continue
+                here = tuple(int(v) for v in self.positions[agent])
+                if other not in moving or moving[other] == here:
+                    del moving[agent]
+                    blocked.append(agent)
+                    changed = True
+        return moving, sorted(blocked)
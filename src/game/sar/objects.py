@@ -2,6 +2,8 @@ from minigrid.core.constants import COLORS, IDX_TO_OBJECT, OBJECT_TO_IDX
 from minigrid.core.world_object import WorldObj
 from minigrid.utils.rendering import fill_coords, point_in_rect
 
+from ..core.array_grid import register_decoder
+
 # Register new objects
 new_objects = [
     "victim_up",
@@ -22,10 +24,46 @@ for new_object in new_objects:
         OBJECT_TO_IDX[new_object] = len(OBJECT_TO_IDX)
         IDX_TO_OBJECT[len(IDX_TO_OBJECT)] = new_object
 
+# Integer kind codes, so hot paths can dispatch on ``obj.kind`` with one
+# comparison instead of isinstance checks. Only victims carry a ``kind``,
+# use ``kind_of`` for any grid cell.
+KIND_OTHER = 0
+KIND_REAL = 1
+KIND_FAKE = 2
+
+
+def kind_of(obj):
+    """Kind code of a cell's content, KIND_OTHER for None and non-victims."""
+    return getattr(obj, "kind", KIND_OTHER)
+
 
 class VictimBase(WorldObj):
     """Base class for all victim objects with common functionality."""
 
+    # Flyweight instances, see ``shared``
+    _shared = {}
+
+    # A shared victim sits on many cells at once, so victims keep no
+    # position: placements (minigrid's place_obj, snapshot and layout
+    # restores) leave init_pos and cur_pos at None
+    init_pos = property(lambda self: None, lambda self, pos: None)
+    cur_pos = property(lambda self: None, lambda self, pos: None)
+
+    @classmethod
+    def shared(cls, *args, **kwargs):
+        """
+        Shared instance of this victim variant.
+
+        Victims are immutable once placed, so all cells showing the same
+        variant can hold the same object. Their position is the cell they
+        are read from, ``init_pos`` and ``cur_pos`` are always None.
+        """
+        key = (cls, args, tuple(sorted(kwargs.items())))
+        obj = VictimBase._shared.get(key)
+        if obj is None:
+            obj = VictimBase._shared[key] = cls(*args, **kwargs)
+        return obj
+
     def can_overlap(self):
         """Victims cannot be walked over."""
         return False
@@ -48,6 +86,8 @@ class VictimBase(WorldObj):
 class Victim(VictimBase):
     """Real victim with symmetric cross shape."""
 
+    kind = KIND_REAL
+
     # Coordinate mapping for each direction
     _COORDS = {
         "up": [
@@ -103,6 +143,8 @@ VictimRight = RealVictims.RIGHT
 class FakeVictim(VictimBase):
     """Fake victim with asymmetric T-shape."""
 
+    kind = KIND_FAKE
+
     # Coordinate mapping for each shift and direction combination
     _COORDS = {
         ("left", "up"): [
@@ -189,3 +231,18 @@ FakeVictimRightRight = FakeVictims.RIGHT_RIGHT
 REAL_VICTIMS = (Victim,)
 FAKE_VICTIMS = (FakeVictim,)
 ALL_VICTIMS = REAL_VICTIMS + FAKE_VICTIMS
+
+
+# Rebuild victims from their encoding in array-backed grids
+for _direction in ("up", "down", "left", "right"):
+    register_decoder(
+        f"victim_{_direction}",
+        lambda color, state, d=_direction: Victim.shared(d, color=color),
+    )
+    for _shift in ("left", "right"):
+        register_decoder(
+            f"fake_victim_{_shift}_{_direction}",
+            lambda color, state, s=_shift, d=_direction: FakeVictim.shared(
+                s, d, color=color
+            ),
+        )
@@ -0,0 +1,516 @@
+import heapq
+from collections import deque
+from dataclasses import dataclass, field
+
+import numpy as np
+from minigrid.core.world_object import Door, Key, Lava, Wall
+
+from .objects import REAL_VICTIMS
+
+# Marks cells that cannot reach the sources of a distance field
+UNREACHABLE = np.iinfo(np.int32).max
+
+# Neighbour offsets in minigrid direction order (right, down, left, up)
+NEIGHBORS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+
+
+def walkable_mask(grid, open_colors=()):
+    """
+    Cells a route may pass through.
+
+    Walls, lava and locked doors whose color is not in ``open_colors`` block
+    the route. Everything else is walkable: closed doors can be opened and
+    objects in the way (fake victims, keys, victims) can be picked up, so
+    they are treated as free cells.
+
+    Args:
+        grid: Minigrid grid
+        open_colors: Colors of locked doors the agent can unlock
+
+    Returns:
+        np.ndarray: Bool array of shape (width, height)
+    """
+    mask = np.ones((grid.width, grid.height), dtype=bool)
+    for x in range(grid.width):
+        for y in range(grid.height):
+            obj = grid.get(x, y)
+            if isinstance(obj, (Wall, Lava)):
+                mask[x, y] = False
+            elif isinstance(obj, Door) and obj.is_locked:
+                mask[x, y] = obj.color in open_colors
+    return mask
+
+
+class DistanceField:
+    """
+    BFS move counts from every cell to the nearest source cell.
+
+    Besides the sources (distance 0), paths may start at other cells with
+    some moves already made (``set_start``), e.g. the length of a detour
+    that continues from that cell. Every update is incremental: it only
+    visits the cells whose distance changes.
+    """
+
+    def __init__(self, walkable, sources, dist=None, starts=None):
+        """
+        Args:
+            walkable: Bool array (width, height), shared with the planner
+            sources: Cells at distance 0
+            dist: Distances already computed for these sources, if any
+            starts: Dict of other start cells and their start distances
+        """
+        self.walkable = walkable
+        self.sources = set(sources)
+        self.starts = dict(starts or {})
+        if dist is not None:
+            self.dist = dist
+            return
+        self.dist = np.full(walkable.shape, UNREACHABLE, dtype=np.int32)
+        queue = deque()
+        for (x, y), start in sorted(
+            [(pos, 0) for pos in self.sources] + list(self.starts.items()),
+            key=lambda item: item[1],
+        ):
+            if walkable[x, y] and start < self.dist[x, y]:
+                self.dist[x, y] = start
+                queue.append((x, y))
+        self._propagate(queue)
+
+    def __getitem__(self, pos):
+        return int(self.dist[pos[0], pos[1]])
+
+    def start_at(self, pos):
+        """Distance paths start with at ``pos``, ``UNREACHABLE`` for none."""
+        if pos in self.sources:
+            return 0
+        return self.starts.get(pos, UNREACHABLE)
+
+    def _propagate(self, queue):
+        dist, walkable = self.dist, self.walkable
+        width, height = walkable.shape
+        while queue:
+            x, y = queue.popleft()
+            nd = dist[x, y] + 1
+            for dx, dy in NEIGHBORS:
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < width and 0 <= ny < height:
+                    if walkable[nx, ny] and dist[nx, ny] > nd:
+                        dist[nx, ny] = nd
+                        queue.append((nx, ny))
+
+    def open_cell(self, pos):
+        """
+        Update the field after ``pos`` became walkable.
+
+        Opening a cell can only shorten paths, so only the cells whose
+        distance decreases are revisited.
+        """
+        x, y = pos
+        self.walkable[x, y] = True
+        best = self.start_at((x, y))
+        for dx, dy in NEIGHBORS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.dist.shape[0] and 0 <= ny < self.dist.shape[1]:
+                if self.dist[nx, ny] != UNREACHABLE:
+                    best = min(best, int(self.dist[nx, ny]) + 1)
+        if best < self.dist[x, y]:
+            self.dist[x, y] = best
+            self._propagate(deque([(x, y)]))
+
+    def add_source(self, pos):
+        """
+        Update the field after ``pos`` became a source.
+
+        Like ``open_cell``, a new source only shortens distances, so the
+        update only visits the cells that get closer.
+        """
+        x, y = pos
+        self.walkable[x, y] = True
+        self.set_start((x, y), 0)
+
+    def remove_source(self, pos):
+        """Update the field after ``pos`` stopped being a source."""
+        self.set_start(pos, UNREACHABLE)
+
+    def set_start(self, pos, start):
+        """
+        Let paths start at ``pos`` with ``start`` moves already made.
+
+        ``start`` 0 makes ``pos`` a source and ``UNREACHABLE`` removes it.
+        A smaller start only shortens paths, as in ``add_source``. A larger
+        one makes the cells whose every shortest path started at ``pos``
+        further away: only those are reset and recomputed from the cells
+        around them.
+        """
+        x, y = pos = (int(pos[0]), int(pos[1]))
+        old = self.start_at(pos)
+        self.sources.discard(pos)
+        self.starts.pop(pos, None)
+        if start == 0:
+            self.sources.add(pos)
+        elif start < UNREACHABLE:
+            self.starts[pos] = start
+
+        if start < self.dist[x, y]:
+            self.dist[x, y] = start
+            self._propagate(deque([pos]))
+        elif start > old and self.dist[x, y] == old:
+            self._repair(pos)
+
+    def _neighbors(self, pos):
+        """In-bounds 4-neighbours of ``pos``."""
+        x, y = pos
+        width, height = self.dist.shape
+        for dx, dy in NEIGHBORS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height:
+                yield nx, ny
+
+    def _supported(self, pos, affected):
+        """Whether ``pos`` keeps its distance without the ``affected`` cells."""
+        d = int(self.dist[pos])
+        if self.start_at(pos) == d:
+            return True
+        return any(
+            self.dist[cell] == d - 1 and cell not in affected
+            for cell in self._neighbors(pos)
+        )
+
+    def _repair(self, pos):
+        """Recompute the cells whose shortest paths all went through ``pos``."""
+        if self._supported(pos, ()):
+            return
+        affected = self._affected(pos)
+        for cell in affected:
+            self.dist[cell] = UNREACHABLE
+
+        # Restart them from their own start and the unaffected cells around
+        frontier = []
+        for cell in affected:
+            best = self.start_at(cell)
+            for near in self._neighbors(cell):
+                if self.dist[near] != UNREACHABLE and near not in affected:
+                    best = min(best, int(self.dist[near]) + 1)
+            if best < UNREACHABLE:
+                self.dist[cell] = best
+                frontier.append((best, cell))
+        frontier.sort()
+        self._propagate(deque(cell for _, cell in frontier))
+
+    def _affected(self, pos):
+        """
+        Cells only reached through ``pos``, ``pos`` included.
+
+        They are found in increasing distance, so a cell's closer neighbours
+        are classified before it.
+        """
+        affected = {pos}
+        queue = deque([pos])
+        while queue:
+            cell = queue.popleft()
+            nd = self.dist[cell] + 1
+            for near in self._neighbors(cell):
+                if self.dist[near] == nd and near not in affected:
+                    if not self._supported(near, affected):
+                        affected.add(near)
+                        queue.append(near)
+        return affected
+
+    def next_step(self, pos):
+        """Return the neighbour of ``pos`` that is closest to the sources, or None."""
+        x, y = pos
+        best, best_pos = self.dist[x, y], None
+        for dx, dy in NEIGHBORS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.dist.shape[0] and 0 <= ny < self.dist.shape[1]:
+                if self.dist[nx, ny] < best:
+                    best, best_pos = self.dist[nx, ny], (nx, ny)
+        return best_pos
+
+
+@dataclass
+class RescuePlan:
+    """Result of a rescue search."""
+
+    # Moves plus one pickup per victim and key
+    length: int
+    # Visited stops in order as ("victim" | "key", object position)
+    order: list = field(default_factory=list)
+    # False when the search budget ran out and a greedy plan was returned
+    optimal: bool = True
+
+
+class RescuePlanner:
+    """
+    Optimal rescue planner on top of a generated ``PickupVictimEnv`` level.
+
+    The search is an A* over ``(last stop, rescued victims, collected keys)``
+    where stops are real victims and keys that open a locked door. Costs are
+    forward moves plus one pickup per stop. The model is a relaxation, so
+    the plan length is a lower bound on the number of steps:
+
+    - turning and opening unlocked doors are free,
+    - objects in the way can be walked through,
+    - a collected key keeps opening its doors (the one-item carry limit is
+      not modelled),
+    - a leg starting next to a stop may be one move shorter than the
+      agent's actual standing cell allows.
+
+    Distance fields are BFS fields from every stop, cached per level and per
+    set of usable key colors. ``cell_opened`` updates them incrementally
+    when a locked door opens.
+    """
+
+    def __init__(self, env, max_states=20_000):
+        """
+        Args:
+            env: Environment whose current level is planned
+            max_states: A* expansions before falling back to a greedy plan
+        """
+        self.env = env
+        self.max_states = max_states
+        self.reset()
+
+    def reset(self):
+        """Re-read the level from the environment and drop all cached fields."""
+        grid = self.env.grid
+        self.victims = []
+        self.keys = []
+        self.locked_colors = set()
+        for x in range(grid.width):
+            for y in range(grid.height):
+                obj = grid.get(x, y)
+                if isinstance(obj, REAL_VICTIMS):
+                    self.victims.append((x, y))
+                elif isinstance(obj, Key):
+                    self.keys.append(((x, y), obj.color))
+                elif isinstance(obj, Door) and obj.is_locked:
+                    self.locked_colors.add(obj.color)
+        # Keys are only useful if they open a locked door
+        self.keys = [(pos, c) for pos, c in self.keys if c in self.locked_colors]
+        self._masks = {}
+        self._fields = {}
+        self._leg_cache = {}
+
+    def _mask(self, open_colors):
+        open_colors = frozenset(open_colors) & self.locked_colors
+        if open_colors not in self._masks:
+            self._masks[open_colors] = walkable_mask(self.env.grid, open_colors)
+        return open_colors, self._masks[open_colors]
+
+    def field(self, pos, open_colors=()):
+        """Cached distance field towards the cell ``pos``."""
+        open_colors, mask = self._mask(open_colors)
+        key = (tuple(pos), open_colors)
+        if key not in self._fields:
+            self._fields[key] = DistanceField(mask, [tuple(pos)])
+        return self._fields[key]
+
+    def cell_opened(self, pos):
+        """Incrementally update all cached fields after ``pos`` became walkable."""
+        pos = (int(pos[0]), int(pos[1]))
+        for mask in self._masks.values():
+            mask[pos] = True
+        for dist_field in self._fields.values():
+            dist_field.open_cell(pos)
+        self._leg_cache = {}
+
+    def object_removed(self, pos):
+        """Forget a rescued victim or a collected key."""
+        pos = (int(pos[0]), int(pos[1]))
+        self.victims = [v for v in self.victims if v != pos]
+        self.keys = [(p, c) for p, c in self.keys if p != pos]
+        self._leg_cache = {}
+
+    def distance(self, start, target, open_colors=()):
+        """Moves from ``start`` to a cell next to ``target``, or None if unreachable."""
+        d = self.field(target, open_colors)[start]
+        return None if d == UNREACHABLE else max(d - 1, 0)
+
+    def next_step(self, start, target, open_colors=()):
+        """Shortest-path oracle: the neighbour of ``start`` to move to next."""
+        return self.field(target, open_colors).next_step(start)
+
+    def _start(self):
+        carrying = self.env.carrying
+        color = carrying.color if isinstance(carrying, Key) else None
+        return tuple(int(v) for v in self.env.agent_pos), color
+
+    def _colors(self, collected, carrying):
+        colors = {c for k, (_, c) in enumerate(self.keys) if collected & (1 << k)}
+        if carrying is not None:
+            colors.add(carrying)
+        return frozenset(colors) & self.locked_colors
+
+    def _legs(self, colors):
+        """
+        Lower-bound moves between stops for one set of usable key colors.
+
+        Row and column 0 are the agent start, followed by the victims and
+        then the keys. Standing next to the destination saves one move, and
+        leaving from next to a stop may save another.
+        """
+        if colors not in self._leg_cache:
+            points = [self._start()[0], *self.victims, *(p for p, _ in self.keys)]
+            legs = np.full((len(points), len(points)), UNREACHABLE, dtype=np.int64)
+            for j, dst in enumerate(points[1:], start=1):
+                dist = self.field(dst, colors).dist
+                for i, (x, y) in enumerate(points):
+                    if dist[x, y] != UNREACHABLE:
+                        legs[i, j] = max(int(dist[x, y]) - 1 - (i > 0), 0)
+            self._leg_cache[colors] = legs
+        return self._leg_cache[colors]
+
+    def _stop(self, j):
+        """Describe stop ``j`` (indexed as in ``_legs``) as (kind, position)."""
+        if j <= len(self.victims):
+            return "victim", self.victims[j - 1]
+        return "key", self.keys[j - 1 - len(self.victims)][0]
+
+    def plan(self):
+        """
+        Find the shortest rescue of all remaining victims from the agent's position.
+
+        The length is optimal for the relaxed model of the class docstring,
+        so it is a lower bound on the steps the rescue takes in the env.
+
+        Returns:
+            RescuePlan: Optimal plan, or a greedy plan with ``optimal=False``
+            if the search exceeded ``max_states`` or some victim can never
+            be reached.
+        """
+        self._leg_cache = {}
+        _, carrying = self._start()
+        goal = (1 << len(self.victims)) - 1
+        heuristic = self._heuristic()
+
+        counter = 0
+        root = (0, 0, 0)
+        frontier = [(heuristic(0, 0), counter, 0, root)]
+        best = {root: 0}
+        parent = {}
+        expanded = 0
+
+        while frontier:
+            _, _, cost, state = heapq.heappop(frontier)
+            if cost > best[state]:
+                continue
+            if state[1] == goal:
+                return RescuePlan(cost, self._unwind(parent, state), optimal=True)
+            expanded += 1
+            if expanded > self.max_states:
+                return self.greedy_plan()
+
+            for nxt, leg in self._successors(state, carrying):
+                new_cost = cost + leg + 1
+                if new_cost < best.get(nxt, UNREACHABLE):
+                    best[nxt] = new_cost
+                    parent[nxt] = state
+                    counter += 1
+                    priority = new_cost + heuristic(nxt[0], nxt[1])
+                    heapq.heappush(frontier, (priority, counter, new_cost, nxt))
+
+        # Some victims cannot be reached at all
+        return self.greedy_plan()
+
+    def _heuristic(self):
+        """Admissible estimate: farthest remaining victim plus one pickup each."""
+        num_victims = len(self.victims)
+        victim_bits = 1 << np.arange(num_victims)
+        relaxed = self._legs(frozenset(self.locked_colors))[:, 1 : num_victims + 1]
+        relaxed = np.where(relaxed == UNREACHABLE, 0, relaxed)
+
+        def heuristic(i, rescued):
+            remaining = (rescued & victim_bits) == 0
+            if not remaining.any():
+                return 0
+            return int(relaxed[i, remaining].max()) + int(remaining.sum())
+
+        return heuristic
+
+    def _successors(self, state, carrying):
+        """
+        Search states one stop after ``state``.
+
+        Yields:
+            tuple: ``(next state, moves to the stop)`` for every victim left
+            to rescue and key left to collect that is reachable
+        """
+        i, rescued, collected = state
+        num_victims = len(self.victims)
+        legs = self._legs(self._colors(collected, carrying))[i]
+        for j in range(1, len(legs)):
+            if legs[j] == UNREACHABLE:
+                continue
+            if j <= num_victims:
+                bit = 1 << (j - 1)
+                if not rescued & bit:
+                    yield (j, rescued | bit, collected), int(legs[j])
+            else:
+                bit = 1 << (j - 1 - num_victims)
+                if not collected & bit:
+                    yield (j, rescued, collected | bit), int(legs[j])
+
+    def _unwind(self, parent, state):
+        order = []
+        while state in parent:
+            order.append(self._stop(state[0]))
+            state = parent[state]
+        return order[::-1]
+
+    def greedy_plan(self):
+        """
+        Nearest-stop rescue plan.
+
+        Repeatedly walks to the closest reachable victim or useful key until
+        every reachable victim is rescued. Victims that stay unreachable are
+        left out of the order.
+        """
+        _, carrying = self._start()
+        num_victims = len(self.victims)
+        i, rescued, collected = 0, 0, 0
+        length = 0
+        order = []
+        while rescued != (1 << num_victims) - 1:
+            legs = self._legs(self._colors(collected, carrying))[i].copy()
+            legs[0] = UNREACHABLE
+            for j in range(1, len(legs)):
+                if j <= num_victims and rescued & (1 << (j - 1)):
+                    legs[j] = UNREACHABLE
+                elif j > num_victims and collected & (1 << (j - 1 - num_victims)):
+                    legs[j] = UNREACHABLE
+            j = int(np.argmin(legs))
+            if legs[j] == UNREACHABLE:
+                break
+            if j <= num_victims:
+                rescued |= 1 << (j - 1)
+            else:
+                collected |= 1 << (j - 1 - num_victims)
+            length += int(legs[j]) + 1
+            order.append(self._stop(j))
+            i = j
+        return RescuePlan(length, order, optimal=False)
+
+    def difficulty(self, plan=None):
+        """
+        Per-level difficulty scores derived from the rescue plan.
+
+        Returns:
+            dict: ``rescue_length``, ``optimal``, ``num_victims``,
+            ``keys_needed``, ``steps_per_victim`` and ``locked_fraction``
+            (share of victims that need a key to be reached).
+        """
+        plan = plan or self.plan()
+        start, _ = self._start()
+        free = [v for v in self.victims if self.distance(start, v) is not None]
+        num_victims = len(self.victims)
+        return {
+            "rescue_length": plan.length,
+            "optimal": plan.optimal,
+            "num_victims": num_victims,
+            "keys_needed": sum(1 for kind, _ in plan.order if kind == "key"),
+            "steps_per_victim": plan.length / num_victims if num_victims else 0.0,
+            "locked_fraction": (
+                1.0 - len(free) / num_victims if num_victims else 0.0
+            ),
+        }
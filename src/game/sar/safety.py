@@ -0,0 +1,148 @@
+import numpy as np
+from gymnasium import spaces
+from minigrid.core.constants import OBJECT_TO_IDX
+
+from ..core.observation import view_offsets
+from .planner import UNREACHABLE, DistanceField
+
+WALL = OBJECT_TO_IDX["wall"]
+LAVA = OBJECT_TO_IDX["lava"]
+
+
+def cell_types(grid):
+    """
+    Minigrid type index of every cell, as a ``(width, height)`` array.
+
+    Reads the objects straight from the grid storage, much cheaper than
+    ``Grid.encode`` on large maps.
+    """
+    storage = grid.grid
+    types = np.fromiter(
+        (0 if obj is None else OBJECT_TO_IDX[obj.type] for obj in storage),
+        dtype=np.uint8,
+        count=len(storage),
+    )
+    return types.reshape(grid.height, grid.width).T
+
+
+def layered_bfs(walkable, sources):
+    """
+    Multi-source BFS distances, one array dilation per distance.
+
+    Args:
+        walkable: Bool array ``(width, height)`` of the cells to go through
+        sources: Bool array of the cells at distance 0, or int array of the
+            distance each source starts at (``UNREACHABLE`` for none)
+
+    Returns:
+        np.ndarray: int32 distances, ``UNREACHABLE`` where no source is in reach
+    """
+    dist = np.full(walkable.shape, UNREACHABLE, dtype=np.int32)
+    if sources.dtype == bool:
+        sources = np.where(sources, 0, UNREACHABLE)
+    seeded = walkable & (sources < UNREACHABLE)
+    if not seeded.any():
+        return dist
+
+    reached = np.zeros(walkable.shape, dtype=bool)
+    frontier = np.zeros(walkable.shape, dtype=bool)
+    step = int(sources[seeded].min())
+    while True:
+        frontier |= seeded & (sources == step) & ~reached
+        if not frontier.any():
+            # Jump over distances where nothing starts
+            later = sources[seeded & (sources > step)]
+            if not len(later):
+                return dist
+            step = int(later.min())
+            continue
+        dist[frontier] = step
+        reached |= frontier
+        grown = np.zeros_like(frontier)
+        grown[1:] |= frontier[:-1]
+        grown[:-1] |= frontier[1:]
+        grown[:, 1:] |= frontier[:, :-1]
+        grown[:, :-1] |= frontier[:, 1:]
+        frontier = grown & walkable & ~reached
+        step += 1
+
+
+class LavaDistance:
+    """
+    Moves from every cell to the nearest lava, for safety-aware agents.
+
+    A multi-source BFS from all lava cells through every cell but walls
+    (``layered_bfs``) is run once per level, after the lava is placed and
+    the level repaired, and new lava (see ``FireSpread``) is added
+    incrementally, so asking how close the nearest lava is costs an array
+    lookup. Cells with no lava in reach are at ``UNREACHABLE``.
+
+    Optionally the field is added to observations as ``lava_distance``, a
+    ``(view, view)`` uint8 array aligned with ``image`` (distances above
+    ``clip`` and cells out of sight read ``clip``), and steps ending within
+    ``radius`` moves of lava are penalized, linearly up to ``penalty`` on
+    a cell next to lava.
+    """
+
+    def __init__(self, observe=False, penalty=0.0, radius=2, clip=255):
+        """
+        Args:
+            observe: Add the ``lava_distance`` observation channel
+            penalty: Reward shaping weight, 0 disables the shaping
+            radius: Distance from which the penalty applies
+            clip: Largest distance in the observation channel
+        """
+        self.observe = observe
+        self.penalty = penalty
+        self.radius = radius
+        self.clip = clip
+        self.field = None
+        self._offsets = None
+
+    def space(self, view_size):
+        """Observation space of the ``lava_distance`` channel."""
+        return spaces.Box(0, self.clip, (view_size, view_size), dtype=np.uint8)
+
+    def reset(self, grid):
+        """Run the BFS over the lava of a level."""
+        types = cell_types(grid)
+        walkable, lava = types != WALL, types == LAVA
+        sources = [(int(x), int(y)) for x, y in zip(*np.nonzero(lava))]
+        dist = layered_bfs(walkable, lava)
+        self.field = DistanceField(walkable, sources, dist)
+
+    @property
+    def dist(self):
+        """Int array ``(width, height)`` of the distances."""
+        return self.field.dist
+
+    def __getitem__(self, pos):
+        return self.field[pos]
+
+    def lava_added(self, pos):
+        """Update the distances after lava appeared at ``pos``."""
+        self.field.add_source((int(pos[0]), int(pos[1])))
+
+    def shaping(self, pos):
+        """Penalty (a negative reward) for standing on ``pos``."""
+        if not self.penalty:
+            return 0.0
+        dist = self.field[pos]
+        if dist > self.radius:
+            return 0.0
+        return -self.penalty * (self.radius + 1 - dist) / self.radius
+
+    def view(self, env, image):
+        """The ``lava_distance`` observation channel matching ``image``."""
+        size = image.shape[0]
+        if self._offsets is None or self._offsets.shape[-1] != size:
+            self._offsets = view_offsets(size)
+        dist = self.field.dist
+        width, height = dist.shape
+        xs = env.agent_pos[0] + self._offsets[env.agent_dir, 0]
+        ys = env.agent_pos[1] + self._offsets[env.agent_dir, 1]
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        channel = np.full((size, size), self.clip, dtype=np.uint8)
+        visible = inside & (image[..., 0] != 0)
+        channel[visible] = np.minimum(dist[xs[visible], ys[visible]], self.clip)
+        return channel
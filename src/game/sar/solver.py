@@ -0,0 +1,124 @@
+from collections import deque
+from dataclasses import dataclass, field
+
+import numpy as np
+from minigrid.core.world_object import Door, Key, Lava, Wall
+
+from .objects import FAKE_VICTIMS, REAL_VICTIMS
+
+# Objects that have to be reachable for a level to be solvable
+TARGET_TYPES = REAL_VICTIMS + FAKE_VICTIMS + (Key,)
+
+NEIGHBORS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+
+
+@dataclass
+class Reachability:
+    """Result of a key-aware reachability check."""
+
+    # True when every target object can be reached
+    solvable: bool
+    # Targets that cannot be reached, as ((x, y), object)
+    unreachable: list = field(default_factory=list)
+    # Bool array (width, height) of cells the agent can stand on
+    reached: np.ndarray = None
+    # Locked door positions the agent can unlock
+    opened: set = field(default_factory=set)
+    # Number of (position, held key) states expanded
+    states: int = 0
+
+    def describe(self):
+        """Human readable list of the unreachable objects."""
+        return ", ".join(f"{obj.type} at {pos}" for pos, obj in self.unreachable)
+
+
+def solve_reachability(env, targets=TARGET_TYPES):
+    """
+    Check that every target object can be reached, taking keys into account.
+
+    The search is a BFS over ``(position, held key color)`` states. A locked
+    door becomes passable for good once it is reached while holding its key.
+    Victims, fake victims and keys can be picked up, so they do not block
+    the way; walls, lava and locked doors do. Keys are assumed to stay where
+    they were found, which holds as long as a swapped key is dropped next to
+    the one picked up. The search stops as soon as every target is reached.
+
+    Args:
+        env: Environment with a generated grid and agent position
+        targets: Object classes that have to be reachable
+
+    Returns:
+        Reachability: Solvability, the unreachable objects and reached cells
+    """
+    grid = env.grid
+    width, height = grid.width, grid.height
+    remaining = _find_targets(grid, targets)
+
+    carrying = env.carrying
+    start = (tuple(int(v) for v in env.agent_pos), getattr(carrying, "color", None))
+    seen = {start}
+    queue = deque([start])
+    reached = np.zeros((width, height), dtype=bool)
+    opened = set()
+    # Locked door -> held keys that bumped into it before it was opened
+    waiting = {}
+
+    while queue and remaining:
+        (x, y), held = queue.popleft()
+        reached[x, y] = True
+        for pos in _neighbors(x, y, width, height):
+            remaining.pop(pos, None)
+            obj = grid.get(*pos)
+            for state in _enter(obj, pos, (x, y), held, opened, waiting):
+                if state not in seen:
+                    seen.add(state)
+                    queue.append(state)
+
+    return Reachability(
+        solvable=not remaining,
+        unreachable=sorted(remaining.items(), key=lambda item: item[0]),
+        reached=reached,
+        opened=opened,
+        states=len(seen),
+    )
+
+
+def _find_targets(grid, targets):
+    """``{(x, y): object}`` of the target objects on ``grid``."""
+    found = {}
+    for x in range(grid.width):
+        for y in range(grid.height):
+            obj = grid.get(x, y)
+            if isinstance(obj, targets):
+                found[(x, y)] = obj
+    return found
+
+
+def _neighbors(x, y, width, height):
+    for dx, dy in NEIGHBORS:
+        nx, ny = x + dx, y + dy
+        if 0 <= nx < width and 0 <= ny < height:
+            yield nx, ny
+
+
+def _enter(obj, pos, origin, held, opened, waiting):
+    """
+    Search states after trying to step from ``origin`` onto ``pos``.
+
+    Picking up a key switches the held color without moving. A locked door
+    is opened for good by its key; other held keys wait at the door until
+    it is opened.
+    """
+    if isinstance(obj, (Wall, Lava)):
+        return []
+    states = []
+    if isinstance(obj, Key):
+        states.append((origin, obj.color))
+    if isinstance(obj, Door) and obj.is_locked and pos not in opened:
+        if held != obj.color:
+            waiting.setdefault(pos, set()).add(held)
+            return states
+        opened.add(pos)
+        states.extend((pos, other) for other in waiting.pop(pos, ()))
+    states.append((pos, held))
+    return states
@@ -0,0 +1,121 @@
+import numpy as np
+from gymnasium import spaces
+from minigrid.core.constants import COLOR_TO_IDX, OBJECT_TO_IDX, STATE_TO_IDX
+from minigrid.core.world_object import Door
+
+from .objects import KIND_OTHER, kind_of
+
+# Channels of the symbolic observation, in order
+CHANNELS = ("type", "color", "door_state", "victim", "victim_dir", "shift", "agent")
+
+# Values of the "victim_dir" and "shift" channels; 0 means not a victim. The
+# "victim" channel holds the object kind code (objects.KIND_REAL / KIND_FAKE).
+VICTIM_DIRECTIONS = {"up": 1, "down": 2, "left": 3, "right": 4}
+VICTIM_SHIFTS = {"left": 1, "right": 2}
+
+EMPTY_FEATURES = (OBJECT_TO_IDX["empty"], 0, 0, KIND_OTHER, 0, 0, 0)
+
+
+def cell_features(obj):
+    """
+    Symbolic features of one grid cell, one value per channel.
+
+    ``door_state`` is 0 for cells without a door and the minigrid door
+    state plus one otherwise. ``agent`` is left at 0, it is set per
+    observation.
+    """
+    if obj is None:
+        return EMPTY_FEATURES
+    door_state = 0
+    if isinstance(obj, Door):
+        if obj.is_locked:
+            door_state = STATE_TO_IDX["locked"] + 1
+        elif obj.is_open:
+            door_state = STATE_TO_IDX["open"] + 1
+        else:
+            door_state = STATE_TO_IDX["closed"] + 1
+    return (
+        OBJECT_TO_IDX[obj.type],
+        COLOR_TO_IDX[obj.color],
+        door_state,
+        kind_of(obj),
+        VICTIM_DIRECTIONS.get(getattr(obj, "direction", None), 0),
+        VICTIM_SHIFTS.get(getattr(obj, "shift", None), 0),
+        0,
+    )
+
+
+class SymbolicGrid:
+    """
+    Fully observable symbolic observation of a level.
+
+    The grid is kept as a ``(height, width)`` array of kind indices into a
+    table holding the features of every distinct cell kind seen so far
+    (empty, red wall, locked blue door, left-shifted fake victim facing up,
+    ...). An observation is a single table lookup over that array plus the
+    agent cell. Cells changed by steps are taken from the environment's
+    snapshot journal, so only those are refreshed; after a reset or a
+    restore the array is rebuilt.
+    """
+
+    def __init__(self):
+        self._kinds = {}
+        self._rows = []
+        self._table = None
+        self.kinds = None
+        self._grid = None
+        self._mark = None
+
+    @staticmethod
+    def space(width, height):
+        return spaces.Box(
+            low=0, high=255, shape=(height, width, len(CHANNELS)), dtype=np.uint8
+        )
+
+    def _kind(self, obj):
+        features = cell_features(obj)
+        kind = self._kinds.get(features)
+        if kind is None:
+            kind = self._kinds[features] = len(self._rows)
+            self._rows.append(features)
+            self._table = None
+        return kind
+
+    def _rebuild(self, grid):
+        kinds = np.fromiter((self._kind(obj) for obj in grid.grid), dtype=np.int16)
+        self.kinds = kinds.reshape(grid.height, grid.width)
+        self._grid = grid
+
+    def _sync(self, env):
+        journal = env._journal
+        if journal is None or journal.grid is not env.grid:
+            # Reset in progress, the journal of the new level does not exist yet
+            self._rebuild(env.grid)
+            self._mark = None
+            return
+
+        changed = None
+        if self._grid is env.grid and self._mark is not None:
+            changed = journal.changed_since(self._mark)
+        if changed is None:
+            self._rebuild(env.grid)
+        else:
+            storage, width = env.grid.grid, env.grid.width
+            for index in changed:
+                self.kinds[index // width, index % width] = self._kind(storage[index])
+        self._mark = journal.mark()
+
+    def observe(self, env):
+        """
+        Symbolic observation of ``env``.
+
+        Returns:
+            np.ndarray: uint8 array of shape ``(height, width, len(CHANNELS))``
+        """
+        self._sync(env)
+        if self._table is None:
+            self._table = np.array(self._rows, dtype=np.uint8)
+        obs = self._table[self.kinds]
+        x, y = env.agent_pos
+        obs[y, x, -1] = env.agent_dir + 1
+        return obs
@@ -22,18 +22,19 @@ class VictimPlacer:
         """
         self.num_fake_victims = num_fake_victims
         self.num_real_victims = num_real_victims
-        # Can use either the factory or direct instantiation
+        # Shared flyweight instances, one per variant
         self.victims = {
-            direction: Victim(direction, color="red") for direction in self.DIRECTIONS
+            direction: Victim.shared(direction, color="red")
+            for direction in self.DIRECTIONS
         }
         self.important_victim = important_victim
 
     def place_fake_victims(self, level_gen, i, j):
-        """Place fake victims in a room using factory pattern."""
+        """Place fake victims in a room, sharing one instance per variant."""
         for _ in range(self.num_fake_victims):
             shift = random.choice(self.SHIFTS)
             direction = random.choice(self.DIRECTIONS)
-            obj = FakeVictim(shift, direction, color="red")
+            obj = FakeVictim.shared(shift, direction, color="red")
             level_gen.place_in_room(i, j, obj)
 
     def place_all(self, level_gen, num_rows, num_cols):
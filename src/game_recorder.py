@@ -42,6 +42,9 @@ class GameRecording:
     actions: list = field(default_factory=list)
     rewards: list = field(default_factory=list)
 
+    # Agent pose (x, y, dir) after each action
+    poses: list = field(default_factory=list)
+
     # Optional: frames
     frames: list = field(default_factory=list)
 
@@ -88,6 +91,8 @@ class GameRecorder:
         """Record a step."""
         self.recording.actions.append(action)
         self.recording.rewards.append(reward)
+        x, y = self.env.agent_pos
+        self.recording.poses.append((int(x), int(y), int(self.env.agent_dir)))
         if self.record_frames:
             self.recording.frames.append(self.env.render())
 
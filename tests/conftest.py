@@ -0,0 +1,48 @@
+"""
+Shared test fixtures.
+"""
+
+import random
+
+import pytest
+
+from src.game.sar.env import PickupVictimEnv
+from src.game.sar.utils import VictimPlacer
+
+DEFAULT_ENV_KWARGS = {
+    "env_class": PickupVictimEnv,
+    "num_rows": 2,
+    "num_cols": 2,
+    "num_fake_victims": 2,
+    "num_real_victims": 1,
+    "render_mode": "rgb_array",
+}
+
+
+@pytest.fixture
+def make_env(request):
+    """
+    Factory of small seeded levels.
+
+    ``make_env(seed=0, reset=True, **kwargs)`` builds a 2x2 ``PickupVictimEnv``
+    with 2 fake victims and 1 real one, then applies the test module's
+    ``ENV_KWARGS`` and the call's keyword arguments on top (``env_class``
+    and the victim counts included). ``random`` is seeded with ``seed``
+    first, and the env is reset with it unless ``reset`` is False.
+    """
+    module_kwargs = getattr(request.module, "ENV_KWARGS", {})
+
+    def make(seed=0, reset=True, **kwargs):
+        kwargs = {**DEFAULT_ENV_KWARGS, **module_kwargs, **kwargs}
+        env_class = kwargs.pop("env_class")
+        random.seed(seed)
+        placer = VictimPlacer(
+            num_fake_victims=kwargs.pop("num_fake_victims"),
+            num_real_victims=kwargs.pop("num_real_victims"),
+        )
+        env = env_class(victim_placer=placer, **kwargs)
+        if reset:
+            env.reset(seed=seed)
+        return env
+
+    return make
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Test the valid-action mask.
+"""
+
+import random
+
+import numpy as np
+
+from src.game.sar.actions import batch_action_masks
+
+ENV_KWARGS = {"num_fake_victims": 3, "num_real_victims": 2}
+
+
+def state(env):
+    return (
+        env.grid.encode().tobytes(),
+        tuple(int(v) for v in env.agent_pos),
+        env.agent_dir,
+        env.carrying,
+    )
+
+
+def test_mask_marks_exactly_the_actions_that_change_the_state(make_env):
+    env = make_env()
+    rng = random.Random(0)
+    for _ in range(200):
+        mask = env.action_mask.mask.copy()
+        before = state(env)
+        snap = env.snapshot()
+        for action in range(len(mask)):
+            env.step_fast(action)
+            assert mask[action] == (state(env) != before), action
+            env.restore(snap)
+
+        _, _, terminated, truncated, info = env.step(rng.choice((0, 1, 2, 2, 3, 4, 5)))
+        np.testing.assert_array_equal(info["action_mask"], env.action_mask.mask)
+        if terminated or truncated:
+            env.reset()
+
+
+def test_batch_action_masks(make_env):
+    envs = [make_env(seed) for seed in range(3)]
+    masks = batch_action_masks(envs)
+    assert masks.shape == (3, 7)
+    for env, mask in zip(envs, masks):
+        np.testing.assert_array_equal(mask, env.action_mask.mask)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test the array-backed grid storage.
+"""
+
+import pickle
+import random
+
+import numpy as np
+from minigrid.core.world_object import Door, Key, Wall
+
+from src.game.core.array_grid import ArrayGrid
+from src.game.sar.objects import KIND_FAKE, KIND_REAL, FakeVictim, Victim
+
+ENV_KWARGS = {"num_fake_victims": 3, "num_real_victims": 2}
+
+
+def test_same_episode_as_list_grid(make_env):
+    env = make_env(array_grid=True)
+    reference = make_env()
+    assert isinstance(env.grid, ArrayGrid)
+    np.testing.assert_array_equal(env.grid.encode(), reference.grid.encode())
+
+    rng = random.Random(0)
+    for _ in range(300):
+        action = rng.choice((0, 1, 2, 2, 3, 4, 5))
+        obs, reward, terminated, truncated, _ = env.step(action)
+        ref_obs, ref_reward, ref_terminated, ref_truncated, _ = reference.step(action)
+        np.testing.assert_array_equal(obs["image"], ref_obs["image"])
+        assert reward == ref_reward
+        assert (terminated, truncated) == (ref_terminated, ref_truncated)
+        if terminated or truncated:
+            break
+    np.testing.assert_array_equal(env.grid.encode(), reference.grid.encode())
+    np.testing.assert_array_equal(env.render(), reference.render())
+
+
+def test_objects_and_scans():
+    grid = ArrayGrid(5, 4)
+    door = Door("blue", is_locked=True)
+    grid.set(1, 1, door)
+    grid.set(2, 1, Victim("up"))
+    grid.set(3, 1, FakeVictim("left", "down"))
+    grid.set(3, 2, Key("blue"))
+    grid.wall_rect(0, 0, 5, 4)
+
+    # Stateful objects keep their identity, their state is read back
+    assert grid.get(1, 1) is door
+    door.is_locked = False
+    door.is_open = True
+    assert grid.encode()[1, 1, 2] == 0
+
+    assert grid.get(2, 1) is Victim.shared("up", color="red")
+    assert grid.get(3, 1).shift == "left" and grid.get(3, 1).direction == "down"
+    assert isinstance(grid.get(0, 0), Wall) and grid.get(1, 2) is None
+    assert grid.count("wall") == 14
+    assert grid.count_kind(KIND_REAL) == 1 and grid.count_kind(KIND_FAKE) == 1
+    assert grid.find_kind(KIND_REAL) == [(2, 1)]
+
+
+def test_round_trips(make_env):
+    env = make_env()
+    compact = ArrayGrid.from_grid(env.grid)
+    assert compact.nbytes == 4 * env.width * env.height
+    np.testing.assert_array_equal(compact.encode(), env.grid.encode())
+    np.testing.assert_array_equal(compact.to_grid().encode(), env.grid.encode())
+
+    copy = pickle.loads(pickle.dumps(compact))
+    np.testing.assert_array_equal(copy.encode(), env.grid.encode())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test the chunked sparse grid.
+"""
+
+import random
+
+import numpy as np
+from minigrid.core.grid import Grid
+from minigrid.core.world_object import Door, Lava, Wall
+
+from src.game.core.camera import CameraConfig, EdgeFollowCamera, render_window
+from src.game.core.chunked_grid import ChunkedGrid
+from src.game.core.env import SAREnv
+from src.game.core.layout import WALL
+from src.game.sar.objects import KIND_REAL, Victim
+
+
+class OpenFieldEnv(SAREnv):
+    """Huge open map with a few walled plots."""
+
+    def _gen_grid(self, width, height):
+        self.grid = self.grid_class(width, height)
+        self.grid.wall_rect(0, 0, width, height)
+        for x in range(100, 4000, 500):
+            self.grid.wall_rect(x, x, 20, 20)
+            self.grid.set(x + 10, x, Door("red"))
+        self.grid.set(60, 50, Victim.shared("up", color="red"))
+        self.grid.set(55, 52, Lava())
+        self.agent_pos = (50, 50)
+        self.agent_dir = 0
+        self.mission = "rescue all victims"
+
+
+def test_matches_dense_grid():
+    rng = random.Random(0)
+    dense, sparse = Grid(40, 30), ChunkedGrid(40, 30, chunk_size=8)
+    objects = [None, None, WALL, Lava(), Door("blue")]
+    for _ in range(2000):
+        x, y, obj = rng.randrange(40), rng.randrange(30), rng.choice(objects)
+        dense.set(x, y, obj)
+        sparse.set(x, y, obj)
+    assert list(sparse.grid) == list(dense.grid)
+    assert np.array_equal(sparse.encode(), dense.encode())
+    assert np.array_equal(
+        sparse.slice(-3, 5, 7, 7).encode(), dense.slice(-3, 5, 7, 7).encode()
+    )
+    assert sorted(pos for pos, _ in sparse.objects()) == sorted(
+        (i % 40, i // 40) for i, obj in enumerate(dense.grid) if obj is not None
+    )
+
+
+def test_chunks_follow_content():
+    grid = ChunkedGrid(100_000, 100_000, chunk_size=16)
+    assert grid.num_cells == 0
+
+    grid.set(5, 5, WALL)
+    grid.set(70_000, 123, WALL)
+    assert set(grid.chunks) == {(0, 0), (4375, 7)}
+    assert grid.chunk(*grid.chunk_coords(70_000, 123))[11 * 16] is WALL
+    assert grid.get(70_001, 123) is None and grid.get(99_999, 99_999) is None
+
+    # Emptied chunks are dropped, clearing a missing chunk allocates nothing
+    grid.set(5, 5, None)
+    grid.set(90_000, 90_000, None)
+    assert set(grid.chunks) == {(4375, 7)}
+
+
+def test_kind_scans():
+    grid = ChunkedGrid(64, 64)
+    victim = Victim.shared("up", color="red")
+    for pos in ((40, 3), (2, 50), (10, 3)):
+        grid.set(*pos, victim)
+    grid.set(11, 3, Wall())
+    assert grid.count_kind(KIND_REAL) == 3
+    assert grid.find_kind(KIND_REAL) == [(10, 3), (40, 3), (2, 50)]
+
+
+def test_env_on_a_huge_sparse_map():
+    camera = EdgeFollowCamera(CameraConfig(view_tiles=(12, 12), tile_size=8))
+    env = OpenFieldEnv(
+        grid_size=4096,
+        grid_class=ChunkedGrid,
+        camera_strategy=camera,
+        render_mode="rgb_array",
+    )
+    obs, _ = env.reset(seed=0)
+    assert isinstance(env.grid, ChunkedGrid)
+    # The outer walls and plots only, a tiny share of the 16M cells
+    assert env.grid.num_cells < 0.05 * env.width * env.height
+    assert obs["image"].shape == (7, 7, 3)
+
+    for action in (2, 2, 2, 1, 2, 2, 0):
+        env.step(action)
+        frame = env.render()
+        assert frame.shape == (96, 96, 3)
+        pose = (env.agent_pos, env.agent_dir)
+        expected = render_window(env.grid, camera.top_x, camera.top_y, 12, 12, 8, *pose)
+        assert np.array_equal(frame, expected)
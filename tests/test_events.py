@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test the environment event bus.
+"""
+
+import random
+
+from minigrid.core.world_object import Door
+
+from src.game.core import events
+from src.game.sar.events import FakePicked, VictimRescued
+
+ALL_EVENTS = (
+    events.AgentMoved,
+    events.DoorOpened,
+    events.DoorClosed,
+    events.DoorUnlocked,
+    events.KeyPicked,
+    events.ObjectDropped,
+    events.LavaDeath,
+    events.EpisodeReset,
+    events.StateRestored,
+    VictimRescued,
+    FakePicked,
+)
+
+ENV_KWARGS = {"num_fake_victims": 3, "num_real_victims": 2}
+
+
+def test_events_follow_the_steps(make_env):
+    env = make_env()
+    log = []
+    for event_type in ALL_EVENTS:
+        env.events.subscribe(event_type, log.append)
+
+    rng = random.Random(0)
+    rescued = 0
+    for _ in range(500):
+        del log[:]
+        pos, direction = tuple(env.agent_pos), env.agent_dir
+        fwd_pos = tuple(env.front_pos)
+        fwd_obj = env.grid.get(*fwd_pos)
+        was_open = isinstance(fwd_obj, Door) and fwd_obj.is_open
+        _, _, terminated, truncated, _ = env.step(rng.choice((0, 1, 2, 2, 3, 4, 5)))
+        kinds = [type(event) for event in log]
+
+        moved = tuple(env.agent_pos) != pos or env.agent_dir != direction
+        assert (events.AgentMoved in kinds) == moved
+        if isinstance(fwd_obj, Door):
+            assert (events.DoorOpened in kinds) == (fwd_obj.is_open and not was_open)
+        for event in log:
+            if isinstance(event, VictimRescued):
+                rescued += 1
+                assert event.pos == fwd_pos and env.grid.get(*fwd_pos) is None
+            if isinstance(event, events.KeyPicked):
+                assert env.carrying is event.key
+        if events.LavaDeath in kinds:
+            assert terminated
+
+        if terminated or truncated:
+            assert rescued == env.saved_victims
+            rescued = 0
+            env.reset()
+            assert isinstance(log[-1], events.EpisodeReset)
+
+
+def test_instruction_counts_rescues_through_events(make_env):
+    env = make_env(1)
+    snap = env.snapshot()
+    total = env.instrs.remaining
+    assert total == len(env.get_all_victims())
+
+    rng = random.Random(1)
+    for _ in range(400):
+        env.step_fast(rng.choice((0, 1, 2, 2, 3, 5)))
+        assert env.instrs.remaining == len(env.get_all_victims())
+
+    env.restore(snap)
+    assert env.instrs.remaining == total
+
+
+def test_unsubscribe(make_env):
+    env = make_env()
+    assert not env.events._handlers.get(events.AgentMoved)
+
+    calls = []
+    env.events.subscribe(events.AgentMoved, calls.append)
+    env.step(env.actions.left)
+    env.events.unsubscribe(events.AgentMoved, calls.append)
+    env.step(env.actions.left)
+    assert len(calls) == 1
+
+
+def test_steps_skip_events_nobody_listens_to(make_env, monkeypatch):
+    env = make_env()
+    published = []
+    original = env._publish
+
+    def publish(*args):
+        published.append(args)
+        original(*args)
+
+    monkeypatch.setattr(env, "_publish", publish)
+
+    env.step(env.actions.left)
+    assert not published
+
+    env.events.subscribe(events.DoorOpened, lambda event: None)
+    env.step(env.actions.left)
+    assert not published
+    env.step(env.actions.toggle)
+    assert len(published) == 1
+
+
+def test_episode_handlers_are_dropped_on_reset(make_env):
+    env = make_env()
+    instrs = env.instrs
+    env.reset()
+    assert instrs._on_rescued not in env.events._handlers.get(VictimRescued, [])
+    assert len(env.events._handlers[VictimRescued]) == 1
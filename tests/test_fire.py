@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test the spreading fire hazard.
+"""
+
+import numpy as np
+from minigrid.core.grid import Grid
+from minigrid.core.world_object import Door, Lava
+
+from src.game.core.hazard import FireSpread, spread_fire
+from src.game.sar.objects import KIND_REAL
+
+ENV_KWARGS = {"lava_per_room": 2, "num_fake_victims": 1, "num_real_victims": 1}
+
+
+def lava_cells(grid):
+    return {
+        (x, y)
+        for x in range(grid.width)
+        for y in range(grid.height)
+        if isinstance(grid.get(x, y), Lava)
+    }
+
+
+def test_certain_spread_grows_a_diamond():
+    burning = np.zeros((2, 9, 9), dtype=bool)
+    burning[0, 4, 4] = burning[1, 0, 0] = True
+    fuel = ~burning
+    rng = np.random.default_rng(0)
+    for _ in range(2):
+        spread_fire(burning, fuel, 1.0, rng)
+    xs, ys = np.mgrid[0:9, 0:9]
+    assert np.array_equal(burning[0], abs(xs - 4) + abs(ys - 4) <= 2)
+    assert np.array_equal(burning[1], xs + ys <= 2)
+    assert not (burning & fuel).any()
+
+
+def test_walls_doors_and_barriers_stop_the_fire():
+    grid = Grid(7, 5)
+    grid.wall_rect(0, 0, 7, 5)
+    grid.vert_wall(3, 0)
+    grid.set(3, 2, Door("red", is_open=False))
+    grid.set(1, 1, Lava())
+
+    fire = FireSpread(spread_probability=1.0, barriers=[(1, 3)])
+    fire.reset(grid, np.random.default_rng(0))
+    for _ in range(10):
+        fire.step()
+    # The closed door holds, the barrier cell never burns
+    assert not fire.burning[4:].any()
+    assert not fire.burning[1, 3]
+    assert fire.burning[2, 3]
+
+    # Once opened, the door burns and lets the fire through
+    grid.get(3, 2).is_open = True
+    fire.update_cell((3, 2), grid.get(3, 2))
+    for _ in range(10):
+        fire.step()
+    assert fire.burning[3, 2] and fire.burning[5, 3]
+
+
+def test_env_turns_the_fire_into_lava(make_env):
+    env = make_env(fire_spread=FireSpread(spread_probability=0.5))
+    victims = env._count_objects_by_kind(KIND_REAL)
+    before = lava_cells(env.grid)
+    snapshot = env.snapshot()
+    for _ in range(10):
+        _, _, terminated, _, _ = env.step(env.actions.left)
+        if terminated:
+            break
+    after = lava_cells(env.grid)
+    assert before < after
+    assert after == set(zip(*np.nonzero(env.fire_spread.burning)))
+    # Victims stop the fire rather than burn
+    assert env._count_objects_by_kind(KIND_REAL) == victims
+
+    env.restore(snapshot)
+    assert lava_cells(env.grid) == before
+    assert not (env.fire_spread.burning & env.fire_spread.fuel).any()
+    assert set(zip(*np.nonzero(env.fire_spread.burning))) == before
+
+
+def test_fire_reaching_the_agent_ends_the_episode(make_env):
+    env = make_env(fire_spread=FireSpread(spread_probability=1.0))
+    x, y = env.agent_pos
+    env.grid.set(x + 1, y, Lava())
+    env.fire_spread.reset(env.grid, env.np_random)
+    _, reward, terminated, _, _ = env.step(env.actions.left)
+    assert terminated and reward == 0
+    assert isinstance(env.grid.get(x, y), Lava)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test the seen-cells tracking and the fog of war.
+"""
+
+import random
+
+import numpy as np
+
+from src.game.core.camera import (
+    FOG_DIVISOR,
+    CameraConfig,
+    EdgeFollowCamera,
+    render_window,
+)
+from src.game.sar.multi_agent import MultiAgentRescueEnv
+
+ENV_KWARGS = {"fog_of_war": True}
+
+
+def visible_cells(env):
+    """World cells visible to the agent, from minigrid's own visibility."""
+    _, vis_mask = env.gen_obs_grid()
+    cells = set()
+    for x in range(env.width):
+        for y in range(env.height):
+            coords = env.relative_coords(x, y)
+            if coords is not None and vis_mask[coords]:
+                cells.add((x, y))
+    return cells
+
+
+def seen_set(env):
+    return set(zip(*np.nonzero(env.seen_cells.seen)))
+
+
+def test_seen_cells_accumulate_visibility(make_env):
+    for reuse in (False, True):
+        env = make_env(reuse_obs_buffers=reuse)
+        expected = visible_cells(env)
+        rng = random.Random(0)
+        for _ in range(100):
+            env.step(rng.choice((0, 1, 2, 2, 5)))
+            expected |= visible_cells(env)
+            assert seen_set(env) == expected
+        seen = env.seen_cells
+        assert seen.count == seen.seen.sum()
+        assert seen.coverage == len(expected) / (env.width * env.height)
+
+        env.reset()
+        assert seen_set(env) == visible_cells(env)
+
+
+def test_team_sees_the_union_of_views(make_env):
+    env = make_env(env_class=MultiAgentRescueEnv, num_agents=3)
+    rng = random.Random(0)
+    for _ in range(50):
+        env.step([rng.choice((0, 1, 2)) for _ in range(3)])
+    assert env.seen_cells.count == env.seen_cells.seen.sum()
+    assert env.seen_cells.count > 0
+
+
+def test_fog_overlay_darkens_unseen_tiles(make_env):
+    camera = EdgeFollowCamera(CameraConfig(view_tiles=(10, 10), tile_size=8))
+    env = make_env(camera_strategy=camera)
+    frame = env.render()
+    clear = render_window(
+        env.grid, camera.top_x, camera.top_y, 10, 10, 8, env.agent_pos, env.agent_dir
+    )
+    seen = env.seen_cells.seen
+    for ty in range(10):
+        for tx in range(10):
+            tile = np.s_[ty * 8 : (ty + 1) * 8, tx * 8 : (tx + 1) * 8]
+            if seen[camera.top_x + tx, camera.top_y + ty]:
+                assert np.array_equal(frame[tile], clear[tile])
+            else:
+                assert np.array_equal(frame[tile], clear[tile] // FOG_DIVISOR)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test the large map mode and the windowed camera rendering.
+"""
+
+import random
+
+import numpy as np
+from minigrid.core.world_object import Door
+
+from src.game.core.camera import CameraConfig, EdgeFollowCamera, render_window
+from src.game.sar.solver import solve_reachability
+
+ENV_KWARGS = {
+    "num_rows": 10,
+    "num_cols": 10,
+    "large_map": True,
+    "num_fake_victims": 1,
+    "num_real_victims": 1,
+}
+
+
+def test_large_map_is_connected_and_solvable(make_env):
+    for seed in range(3):
+        env = make_env(seed=seed)
+        rooms = [room for row in env.room_grid for room in row]
+        locked = [room for room in rooms if room.locked]
+        assert locked
+
+        # Locked rooms are leaves of the door tree, behind their only door
+        for room in locked:
+            doors = [door for door in room.doors if door is not None]
+            assert len(doors) == 1 and doors[0].is_locked
+        # A tree: one door less than rooms
+        assert env._count_doors() == len(rooms) - 1
+        assert env._count_doors() == env._count_objects_by_type(Door)
+        assert solve_reachability(env).solvable
+
+
+def test_mission_status_follows_rescues(make_env):
+    env = make_env(num_rows=4, num_cols=4)
+    status = env.get_mission_status()
+    assert status["remaining_victims"] == len(env.get_all_victims())
+
+    rng = random.Random(0)
+    for _ in range(300):
+        env.step(rng.choice((0, 1, 2, 2, 3)))
+        assert env.get_mission_status()["remaining_victims"] == len(
+            env.get_all_victims()
+        )
+
+
+def test_render_window_matches_full_render(make_env):
+    env = make_env(num_rows=3, num_cols=3)
+    tile = 16
+    full = env.grid.render(tile, env.agent_pos, env.agent_dir)
+    for top_x, top_y, w, h in ((0, 0, 5, 5), (3, 7, 12, 12), (-2, -3, 6, 4)):
+        crop = full[
+            max(0, top_y) * tile : (top_y + h) * tile,
+            max(0, top_x) * tile : (top_x + w) * tile,
+        ]
+        window = render_window(
+            env.grid, top_x, top_y, w, h, tile, env.agent_pos, env.agent_dir
+        )
+        assert np.array_equal(window, crop)
+
+
+def test_edge_follow_camera_matches_full_render(make_env):
+    env = make_env(num_rows=3, num_cols=3)
+    camera = EdgeFollowCamera(CameraConfig(view_tiles=(12, 12), tile_size=8))
+    env.switch_camera(camera)
+    rng = random.Random(0)
+    for _ in range(100):
+        env.step(rng.choice((0, 1, 2, 2)))
+        frame = env.render()
+        full = env.grid.render(8, env.agent_pos, env.agent_dir)
+        top_x, top_y = camera.top_x * 8, camera.top_y * 8
+        assert frame.shape == (96, 96, 3)
+        assert np.array_equal(frame, full[top_y : top_y + 96, top_x : top_x + 96])
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test the distance-to-lava field.
+"""
+
+import random
+from collections import deque
+
+import numpy as np
+import pytest
+from minigrid.core.world_object import Lava, Wall
+
+from src.game.core.hazard import FireSpread
+from src.game.sar.planner import UNREACHABLE
+from src.game.sar.safety import LavaDistance
+
+ENV_KWARGS = {"lava_per_room": 2, "num_fake_victims": 1, "num_real_victims": 1}
+
+
+def bfs_from_lava(grid):
+    dist = np.full((grid.width, grid.height), UNREACHABLE, dtype=np.int64)
+    queue = deque()
+    for x in range(grid.width):
+        for y in range(grid.height):
+            if isinstance(grid.get(x, y), Lava):
+                dist[x, y] = 0
+                queue.append((x, y))
+    while queue:
+        x, y = queue.popleft()
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if 0 <= nx < grid.width and 0 <= ny < grid.height:
+                if dist[nx, ny] == UNREACHABLE and not isinstance(
+                    grid.get(nx, ny), Wall
+                ):
+                    dist[nx, ny] = dist[x, y] + 1
+                    queue.append((nx, ny))
+    return dist
+
+
+def test_field_matches_bfs(make_env):
+    for seed in range(3):
+        env = make_env(seed, lava_distance=LavaDistance())
+        assert np.array_equal(env.lava_distance.dist, bfs_from_lava(env.grid))
+
+
+def test_field_follows_spreading_fire(make_env):
+    env = make_env(
+        lava_distance=LavaDistance(), fire_spread=FireSpread(spread_probability=0.3)
+    )
+    before = env.lava_distance.dist.copy()
+    for _ in range(15):
+        _, _, terminated, _, _ = env.step(env.actions.left)
+        if terminated:
+            break
+    assert (env.lava_distance.dist <= before).all()
+    assert np.array_equal(env.lava_distance.dist, bfs_from_lava(env.grid))
+
+
+def test_observation_channel(make_env):
+    env = make_env(lava_distance=LavaDistance(observe=True, clip=6))
+    assert env.observation_space["lava_distance"].shape == (7, 7)
+    rng = random.Random(0)
+    for _ in range(30):
+        obs, _, terminated, _, _ = env.step(rng.choice((0, 1, 2)))
+        if terminated:
+            obs, _ = env.reset()
+        channel, image = obs["lava_distance"], obs["image"]
+        for x in range(env.width):
+            for y in range(env.height):
+                coords = env.relative_coords(x, y)
+                if coords is not None and image[coords][0] != 0:
+                    expected = min(env.lava_distance[x, y], 6)
+                    assert channel[coords] == expected
+        assert (channel[image[..., 0] == 0] == 6).all()
+
+
+def test_reward_shaping_near_lava(make_env):
+    safety = LavaDistance(penalty=0.1, radius=2)
+    env = make_env(lava_distance=safety)
+    dist = safety.dist
+    x, y = next(zip(*np.nonzero(dist == 1)))
+    assert safety.shaping((x, y)) == pytest.approx(-0.1)
+    x, y = next(zip(*np.nonzero(dist == 2)))
+    assert safety.shaping((x, y)) == pytest.approx(-0.05)
+    x, y = next(zip(*np.nonzero((dist > 2) & (dist < UNREACHABLE))))
+    assert safety.shaping((x, y)) == 0.0
+
+    # Each step adds the penalty of the cell the agent ends on
+    _, reward, _, _, _ = env.step(env.actions.left)
+    assert reward == pytest.approx(safety.shaping(env.agent_pos))
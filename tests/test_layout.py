@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test the compiled wall templates and resets that reuse the level layout.
+"""
+
+import random
+
+from minigrid.core.grid import Grid
+from minigrid.core.roomgrid import RoomGrid
+from minigrid.core.world_object import Door, Key, Lava, Wall
+
+from src.game.core.layout import wall_template
+from src.game.sar.solver import solve_reachability
+
+ENV_KWARGS = {"lava_per_room": 1}
+
+
+def cells(env, types):
+    return {
+        (x, y): (obj.type, obj.color)
+        for x in range(env.width)
+        for y in range(env.height)
+        if isinstance(obj := env.grid.get(x, y), types)
+    }
+
+
+def test_reset_keeps_structure_and_moves_contents(make_env):
+    env = make_env(reuse_layout=True)
+    walls, doors = cells(env, Wall), cells(env, Door)
+    locked = {pos for pos in doors if env.grid.get(*pos).is_locked}
+    keys = cells(env, Key)
+
+    layouts = set()
+    for _ in range(5):
+        # Open doors and pick up a key, they must be back after the reset
+        for pos in doors:
+            env.grid.get(*pos).is_open = True
+        env.reset()
+        assert cells(env, Wall) == walls
+        assert cells(env, Door) == doors
+        assert cells(env, Key) == keys
+        assert {p for p in doors if env.grid.get(*p).is_locked} == locked
+        assert solve_reachability(env).solvable
+        layouts.add(frozenset(cells(env, Lava)))
+        assert env.get_all_victims()
+
+    assert len(layouts) > 1
+
+
+def test_reset_sets_the_mission(make_env):
+    env = make_env(reset=False)
+    for seed in range(3):
+        obs, _ = env.reset(seed=seed)
+        expected = f"pick up all {len(env.get_all_victims())} victims"
+        assert env.mission == expected and obs["mission"] == expected
+
+
+def test_reused_layout_sets_the_mission(make_env):
+    env = make_env(reuse_layout=True)
+    for _ in range(3):
+        # A stale mission must not survive the reset
+        env.mission = env.surface = "go"
+        obs, _ = env.reset()
+        expected = f"pick up all {len(env.get_all_victims())} victims"
+        assert env.mission == expected and obs["mission"] == expected
+
+
+def test_new_layout(make_env):
+    env = make_env(reuse_layout=True)
+    walls = cells(env, Wall)
+    env.new_layout()
+    for _ in range(5):
+        env.reset()
+        if cells(env, Wall) != walls:
+            break
+    else:
+        raise AssertionError("layout never changed")
+
+
+def test_default_regenerates_layout(make_env):
+    env = make_env()
+    doors = cells(env, Door)
+    changed = False
+    for _ in range(5):
+        env.reset()
+        changed |= cells(env, Door) != doors
+    assert changed
+
+
+def test_wall_template_matches_roomgrid():
+    for room_size, rows, cols in ((8, 2, 2), (6, 3, 4), (5, 1, 3)):
+        width = (room_size - 1) * cols + 1
+        height = (room_size - 1) * rows + 1
+        grid = Grid(width, height)
+        step = room_size - 1
+        for j in range(rows):
+            for i in range(cols):
+                grid.wall_rect(i * step, j * step, room_size, room_size)
+
+        template = wall_template(room_size, rows, cols)
+        assert [type(obj) for obj in template] == [type(obj) for obj in grid.grid]
+        assert template is wall_template(room_size, rows, cols)
+
+
+def test_seeded_levels_unchanged_by_template(make_env):
+    for seed in range(3):
+        env = make_env()
+        random.seed(seed)
+        env.reset(seed=seed)
+
+        reference = make_env()
+        reference._gen_rooms = lambda w, h, env=reference: RoomGrid._gen_grid(env, w, h)
+        random.seed(seed)
+        reference.reset(seed=seed)
+
+        assert (env.grid.encode() == reference.grid.encode()).all()
+        assert tuple(env.agent_pos) == tuple(reference.agent_pos)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test the multi-agent rescue mode.
+"""
+
+import random
+
+import numpy as np
+from minigrid.core.grid import Grid
+from minigrid.core.world_object import Wall
+from minigrid.minigrid_env import MiniGridEnv
+
+from src.game.core.observation import batch_process_vis
+from src.game.sar.multi_agent import MultiAgentRescueEnv
+from src.game.sar.objects import FakeVictim
+
+LEFT, RIGHT, FORWARD, PICKUP, STAY = 0, 1, 2, 3, 6
+
+ENV_KWARGS = {
+    "env_class": MultiAgentRescueEnv,
+    "num_agents": 2,
+    "num_real_victims": 2,
+}
+
+
+def place(env, agent, pos, direction):
+    """Move ``agent`` to the free cell ``pos``."""
+    env.occupancy[tuple(env.positions[agent])] = -1
+    env.grid.set(*pos, None)
+    env._encode_cell(pos)
+    env.positions[agent] = pos
+    env.directions[agent] = direction
+    env.occupancy[pos] = agent
+
+
+def clear_row(env, y=3):
+    """Empty cells (1..5, y) of the top left room, away from the agents."""
+    for agent in range(env.num_agents):
+        place(env, agent, (1, 6 - agent), 0)
+    for x in range(1, 6):
+        env.grid.set(x, y, None)
+        env._encode_cell((x, y))
+
+
+def test_batch_process_vis_matches_minigrid():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        size = int(rng.choice([3, 5, 7, 9]))
+        opaque = rng.random((3, size, size)) < rng.random() * 0.6
+        visible = batch_process_vis(opaque)
+        for view, mask in zip(opaque, visible):
+            grid = Grid(size, size)
+            for i, j in zip(*np.nonzero(view)):
+                grid.set(int(i), int(j), Wall())
+            assert np.array_equal(grid.process_vis((size // 2, size - 1)), mask)
+
+
+def test_single_agent_obs_match_gen_obs(make_env):
+    env = make_env(num_agents=1)
+    rng = random.Random(0)
+    for _ in range(300):
+        obs, _, terminated, truncated, _ = env.step([rng.randrange(6)])
+        expected = MiniGridEnv.gen_obs(env)
+        assert np.array_equal(obs["image"][0], expected["image"])
+        assert obs["direction"][0] == expected["direction"]
+        if terminated or truncated:
+            env.reset()
+
+
+def test_teammates_show_in_views(make_env):
+    env = make_env()
+    clear_row(env)
+    place(env, 0, (2, 3), 0)
+    place(env, 1, (4, 3), 2)
+    obs = env.gen_batch_obs()
+    size = env.agent_view_size
+    # Facing each other two cells apart
+    assert tuple(obs["image"][0, size // 2, size - 3]) == (10, 0, 2)
+    assert tuple(obs["image"][1, size // 2, size - 3]) == (10, 0, 0)
+
+
+def test_same_target_lowest_index_wins(make_env):
+    env = make_env(num_agents=3)
+    clear_row(env)
+    place(env, 0, (2, 3), 0)
+    place(env, 1, (4, 3), 2)
+    _, _, _, _, info = env.step([FORWARD, FORWARD, STAY])
+    assert tuple(env.positions[0]) == (3, 3)
+    assert tuple(env.positions[1]) == (4, 3)
+    assert info["blocked"] == [1]
+
+
+def test_swaps_are_blocked_and_chains_move(make_env):
+    env = make_env()
+    clear_row(env)
+    place(env, 0, (2, 3), 0)
+    place(env, 1, (3, 3), 2)
+    _, _, _, _, info = env.step([FORWARD, FORWARD])
+    assert info["blocked"] == [0, 1]
+    assert tuple(env.positions[0]) == (2, 3) and tuple(env.positions[1]) == (3, 3)
+
+    # Following a leaving agent goes through
+    env.directions[1] = 0
+    env.step([FORWARD, FORWARD])
+    assert tuple(env.positions[0]) == (3, 3) and tuple(env.positions[1]) == (4, 3)
+
+
+def test_shared_victim_goes_to_lowest_index(make_env):
+    env = make_env()
+    clear_row(env)
+    place(env, 0, (2, 3), 0)
+    place(env, 1, (4, 3), 2)
+    env.grid.set(3, 3, FakeVictim("left", "up"))
+    env._encode_cell((3, 3))
+    _, rewards, _, _, _ = env.step([PICKUP, PICKUP])
+    assert rewards.tolist() == [-0.5, 0.0]
+    assert env.grid.get(3, 3) is None
+
+
+def test_occupancy_tracks_agents(make_env):
+    env = make_env(num_agents=6)
+    rng = random.Random(0)
+    for _ in range(500):
+        actions = [rng.choice((LEFT, RIGHT, FORWARD, FORWARD)) for _ in range(6)]
+        _, _, terminated, truncated, _ = env.step(actions)
+        if terminated or truncated:
+            env.reset()
+        occupied = np.argwhere(env.occupancy >= 0)
+        assert len(occupied) == 6
+        for agent, pos in enumerate(env.positions):
+            assert env.occupancy[tuple(pos)] == agent
+            obj = env.grid.get(*pos)
+            assert obj is None or obj.can_overlap()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test the preallocated observation buffers.
+"""
+
+import random
+
+import numpy as np
+from minigrid.minigrid_env import MiniGridEnv
+
+
+def test_buffer_matches_gen_obs(make_env):
+    env = make_env(reuse_obs_buffers=True)
+    rng = random.Random(0)
+    for _ in range(500):
+        obs, _, terminated, truncated, _ = env.step(rng.randrange(6))
+        expected = MiniGridEnv.gen_obs(env)
+        assert np.array_equal(obs["image"], expected["image"])
+        assert obs["direction"] == expected["direction"]
+        assert obs["mission"] == expected["mission"]
+        if terminated or truncated:
+            env.reset()
+
+
+def test_buffer_is_reused(make_env):
+    env = make_env(reuse_obs_buffers=True)
+    first, *_ = env.step(env.actions.left)
+    second, *_ = env.step(env.actions.left)
+
+    assert second is first
+    assert second["image"] is first["image"]
+
+
+def test_default_allocates_fresh_observations(make_env):
+    env = make_env()
+    first, *_ = env.step(env.actions.left)
+    second, *_ = env.step(env.actions.left)
+    assert first["image"] is not second["image"]
+
+
+def test_step_fast_matches_step(make_env):
+    env, twin = make_env(), make_env()
+    rng = random.Random(1)
+    for _ in range(300):
+        action = rng.randrange(6)
+        reward, terminated, truncated, _ = env.step_fast(action)
+        expected = twin.step(action)
+        assert (reward, terminated, truncated) == expected[1:4]
+        assert env.agent_pos == twin.agent_pos and env.agent_dir == twin.agent_dir
+        if terminated or truncated:
+            break
+
+    assert np.array_equal(env.get_obs()["image"], expected[0]["image"])
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test the OpenStreetMap building importer.
+"""
+
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+from minigrid.core.world_object import Lava
+
+from src.game.core import osm
+from src.game.sar.building import BuildingEnv
+from src.game.sar.objects import KIND_REAL, kind_of
+from src.game.sar.solver import solve_reachability
+from src.game.sar.utils import LavaPlacer
+
+MAP = Path(__file__).resolve().parent.parent / "data" / "map.osm"
+
+
+def square(size_m, lat=36.0, lon=-97.0):
+    """Footprint of a square building with ``size_m`` meter sides."""
+    dlat = size_m / osm.METERS_PER_DEGREE
+    dlon = dlat / np.cos(np.radians(lat))
+    points = [
+        (lat, lon),
+        (lat, lon + dlon),
+        (lat - dlat, lon + dlon),
+        (lat - dlat, lon),
+    ]
+    return osm.Footprint(1, "square", points + points[:1])
+
+
+def reachable(cells, start):
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        for pos in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if cells[pos[1], pos[0]] != osm.WALL and pos not in seen:
+                seen.add(pos)
+                queue.append(pos)
+    return seen
+
+
+def test_iter_footprints():
+    footprints = list(osm.iter_footprints(MAP))
+    assert len(footprints) > 100
+    assert all(fp.points[0] == fp.points[-1] for fp in footprints)
+    assert "Gallagher-Iba Arena" in {fp.name for fp in footprints}
+
+
+def test_rasterize_square():
+    layout = osm.rasterize(square(19.9), cell_size=1.0, room_size=8)
+    cells = layout.cells
+    # Outer walls, 3x3 rooms of 6x6 floor cells
+    assert (cells[0] == osm.WALL).all() and (cells[:, 0] == osm.WALL).all()
+    assert (layout.num_cols, layout.num_rows) == (3, 3)
+    assert len(layout.rooms) == 9
+    assert all(len(room) == 36 for room in layout.rooms.values())
+    # One door per shared wall, and every floor cell is connected
+    assert (cells == osm.DOOR).sum() == 12
+    start = layout.rooms[(0, 0)][0]
+    floor = {(x, y) for y, x in zip(*np.nonzero(cells != osm.WALL))}
+    assert reachable(cells, start) == floor
+
+
+def test_buildings_are_connected(tmp_path):
+    for layout in osm.load_buildings(MAP, cache_dir=tmp_path)[:20]:
+        floor = {(x, y) for y, x in zip(*np.nonzero(layout.cells != osm.WALL))}
+        start = next(iter(layout.rooms.values()))[0]
+        assert reachable(layout.cells, start) == floor
+
+
+def test_load_buildings_uses_the_cache(tmp_path, monkeypatch):
+    layouts = osm.load_buildings(MAP, cache_dir=tmp_path)
+    assert len(list(tmp_path.iterdir())) == 1
+
+    def fail(path):
+        raise AssertionError("parsed the extract again")
+
+    monkeypatch.setattr(osm, "iter_footprints", fail)
+    cached = osm.load_buildings(MAP, cache_dir=tmp_path)
+    assert [layout.osm_id for layout in cached] == [
+        layout.osm_id for layout in layouts
+    ]
+    assert all(np.array_equal(a.cells, b.cells) for a, b in zip(cached, layouts))
+
+
+def test_building_env(tmp_path):
+    layouts = osm.load_buildings(MAP, cache_dir=tmp_path)
+    layout = max(layouts, key=lambda layout: len(layout.rooms))
+    env = BuildingEnv(
+        layout, lava_placer=LavaPlacer(lava_probability=0.5), render_mode="rgb_array"
+    )
+    for seed in range(3):
+        env.reset(seed=seed)
+        x, y = env.agent_pos
+        assert layout.cells[y, x] == osm.OPEN and env.grid.get(x, y) is None
+        victims = [obj for obj in env.grid.grid if kind_of(obj) == KIND_REAL]
+        # One per room, unless lava filled a tiny room
+        assert 0.9 * len(layout.rooms) <= len(victims) <= len(layout.rooms)
+        assert solve_reachability(env).solvable
+
+
+class FloodPlacer:
+    """Covers every free cell with lava."""
+
+    def place_all(self, env, num_cols, num_rows):
+        for room in env.rooms.values():
+            for pos in env._free_cells(room):
+                env.grid.set(*pos, Lava())
+
+
+def test_building_env_with_every_room_flooded(tmp_path):
+    layout = osm.load_buildings(MAP, cache_dir=tmp_path)[0]
+    env = BuildingEnv(layout, lava_placer=FloodPlacer(), render_mode="rgb_array")
+    env.reset(seed=0)
+    x, y = env.agent_pos
+    assert layout.cells[y, x] == osm.OPEN and env.grid.get(x, y) is None
+    assert solve_reachability(env).solvable
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test the optimal rescue planner and its cached distance fields.
+"""
+
+import functools
+
+import numpy as np
+import pytest
+
+from src.game.sar.planner import (
+    UNREACHABLE,
+    DistanceField,
+    RescuePlanner,
+    walkable_mask,
+)
+
+
+def brute_force_length(planner):
+    """Shortest rescue over every order of stops, with the planner's legs."""
+    _, carrying = planner._start()
+    num_victims = len(planner.victims)
+    stops = range(1, num_victims + len(planner.keys) + 1)
+
+    @functools.cache
+    def shortest(i, visited):
+        if all(j in visited for j in range(1, num_victims + 1)):
+            return 0
+        collected = sum(1 << (j - 1 - num_victims) for j in visited if j > num_victims)
+        legs = planner._legs(planner._colors(collected, carrying))[i]
+        return min(
+            (
+                int(legs[j]) + 1 + shortest(j, visited | {j})
+                for j in stops
+                if j not in visited and legs[j] != UNREACHABLE
+            ),
+            default=UNREACHABLE,
+        )
+
+    return shortest(0, frozenset())
+
+
+def test_plan_is_optimal_and_beats_greedy(make_env):
+    env = make_env(reset=False)
+    for seed in range(3):
+        env.reset(seed=seed)
+        planner = RescuePlanner(env)
+        plan = planner.plan()
+
+        assert plan.optimal
+        assert [kind for kind, _ in plan.order].count("victim") == len(planner.victims)
+        assert plan.length <= planner.greedy_plan().length
+        # At least one move and one pickup per victim
+        assert plan.length >= 2 * len(planner.victims)
+
+
+def test_plan_matches_brute_force(make_env):
+    env = make_env(reset=False, num_real_victims=2)
+    for seed in range(4):
+        env.reset(seed=seed)
+        planner = RescuePlanner(env)
+        plan = planner.plan()
+
+        assert plan.optimal
+        assert plan.length == brute_force_length(planner)
+
+
+def test_open_cell_matches_fresh_bfs(make_env):
+    env = make_env(reset=False)
+    env.reset(seed=1)
+    planner = RescuePlanner(env)
+    victim = planner.victims[0]
+    dist_field = planner.field(victim)
+
+    mask = walkable_mask(env.grid)
+    blocked = [tuple(p) for p in np.argwhere(~mask) if 0 < p[0] < env.width - 1]
+    for pos in blocked[:20]:
+        planner.cell_opened(pos)
+        mask[pos] = True
+        assert np.array_equal(dist_field.dist, DistanceField(mask, [victim]).dist)
+
+
+def test_moved_starts_match_fresh_bfs(make_env):
+    env = make_env(reset=False)
+    env.reset(seed=1)
+    mask = walkable_mask(env.grid)
+    free = [tuple(p) for p in np.argwhere(mask)]
+    rng = np.random.default_rng(0)
+    sources = {free[i] for i in rng.choice(len(free), 6, replace=False)}
+    dist_field = DistanceField(mask, sources)
+    for _ in range(40):
+        pos = free[rng.integers(len(free))]
+        if rng.random() < 0.3:
+            dist_field.remove_source(pos)
+        else:
+            dist_field.set_start(pos, int(rng.integers(0, 12)))
+        fresh = DistanceField(mask, dist_field.sources, starts=dist_field.starts)
+        assert np.array_equal(dist_field.dist, fresh.dist)
+
+
+def test_max_steps_from_plan(make_env):
+    env = make_env(reset=False, planner_slack=2.0)
+    env.reset(seed=0)
+
+    assert env.max_steps == 2 * env.rescue_plan.length
+    assert env.planner.difficulty(env.rescue_plan)["num_victims"] == len(
+        env.get_all_victims()
+    )
+
+
+def test_slack_must_leave_room_above_the_plan(make_env):
+    with pytest.raises(ValueError):
+        make_env(reset=False, planner_slack=1.0)
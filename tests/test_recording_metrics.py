@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test the per-episode recording metrics and the parallel scanner.
+"""
+
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from src.features.recording_metrics import scan_recordings, write_summary
+from src.game_recorder import GameRecorder, GameRecording
+
+
+def save_recording(path, actions, rewards):
+    """Save a recording of a walled 7x7 room with one victim, one fake and lava."""
+    grid = np.zeros((7, 7), dtype=np.int8)
+    grid[0, :] = grid[-1, :] = grid[:, 0] = grid[:, -1] = 1
+    grid[3, 5] = 5  # victim
+    grid[1, 1] = 6  # fake victim
+    grid[5, 1] = 4  # lava
+    recorder = GameRecorder(env=None)
+    recorder.recording = GameRecording(
+        grid=grid,
+        config={"room_size": 7, "num_rows": 1, "num_cols": 1, "max_steps": 20},
+        agent_start_pos=(1, 3),
+        agent_start_dir=0,
+        actions=actions,
+        rewards=rewards,
+    )
+    recorder.save(path)
+
+
+def test_scan_recordings():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        # Straight to the victim: 3 moves, optimal path
+        save_recording(tmp / "a.pkl", [2, 2, 2, 3], [0, 0, 0, 2.0])
+        # Detour up to the fake victim, then back down into the lava
+        save_recording(
+            tmp / "b.pkl",
+            [0, 2, 3, 1, 1, 2, 2, 2],
+            [0, 0, -0.5, 0, 0, 0, 0, 0],
+        )
+
+        rows = scan_recordings([tmp / "a.pkl", tmp / "b.pkl"], workers=2)
+
+        a, b = rows
+        assert a["victims_saved"] == 1 and a["fake_pickups"] == 0
+        assert a["path_efficiency"] == 1.0
+        assert a["step_ratio"] == 4 / 20
+        assert a["steps_per_victim"] == 4
+        assert not a["lava_death"]
+
+        assert b["victims_saved"] == 0 and b["fake_pickups"] == 1
+        assert b["lava_death"]
+        assert b["path_efficiency"] is None
+
+        write_summary(rows, tmp / "summary.csv")
+        lines = (tmp / "summary.csv").read_text().splitlines()
+        assert len(lines) == 3
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test the cached room-level graph.
+"""
+
+from minigrid.core.world_object import Door
+
+ENV_KWARGS = {
+    "num_rows": 3,
+    "num_cols": 3,
+    "num_fake_victims": 1,
+    "num_real_victims": 1,
+}
+
+
+def test_graph_matches_level(make_env):
+    env = make_env()
+    graph = env.room_graph
+
+    assert len(graph.nodes) == 9
+    assert sum(node.victims for node in graph.nodes.values()) == len(
+        env.get_all_victims()
+    )
+    for (a, b), edge in graph.edges.items():
+        assert graph.edges[b, a] is edge
+        assert b in graph.adjacency[a]
+
+    # Every room is reachable once locked doors may be passed
+    start = graph.room_of(env.agent_pos)
+    assert graph.reachable(start, through_locked=True) == set(graph.nodes)
+    for room in graph.nodes:
+        path = graph.path(start, room, through_locked=True)
+        assert path[0] == start and path[-1] == room
+        assert len(path) - 1 == graph.distance(start, room, through_locked=True)
+
+
+def test_cache_invalidated_on_door_change(make_env):
+    env = make_env()
+    graph = env.room_graph
+    assert env.room_graph is graph
+
+    locked = [e for e in graph.edges.values() if e.is_locked]
+    assert locked
+    door = env.grid.get(*locked[0].pos)
+    assert isinstance(door, Door)
+    door.is_locked = False
+    door.is_open = True
+
+    rebuilt = env.room_graph
+    assert rebuilt is not graph
+    assert not rebuilt.edges[
+        next(k for k, e in graph.edges.items() if e is locked[0])
+    ].is_locked
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Test the potential-based shaping towards the nearest victim.
+"""
+
+import random
+from collections import deque
+
+import pytest
+from minigrid.core.world_object import Door, Key, Lava, Wall
+
+from src.game.sar import shaping as shaping_module
+from src.game.sar.objects import KIND_REAL, kind_of
+from src.game.sar.shaping import PotentialShaping
+
+ENV_KWARGS = {"num_fake_victims": 1, "num_real_victims": 3}
+
+
+def shaped_env(make_env, seed=0, **kwargs):
+    env = PotentialShaping(make_env(seed, reset=False), **kwargs)
+    env.reset(seed=seed)
+    return env
+
+
+def is_real(obj):
+    return kind_of(obj) == KIND_REAL
+
+
+def cells(grid, test):
+    return [
+        (x, y)
+        for x in range(grid.width)
+        for y in range(grid.height)
+        if test(grid.get(x, y))
+    ]
+
+
+def nearest_victim(env, held=None, keys=True):
+    """Brute-force BFS over (cell, carried key color) states."""
+    base = env.unwrapped
+    grid = base.grid
+    victims = set(cells(grid, is_real))
+    start = (tuple(base.agent_pos), held)
+    dist = {start: 0}
+    queue = deque([start])
+    while queue:
+        (x, y), color = state = queue.popleft()
+        if (x, y) in victims:
+            return dist[state]
+        moves = [
+            ((nx, ny), color, 1)
+            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1))
+        ]
+        obj = grid.get(x, y)
+        if keys and color is None and isinstance(obj, Key):
+            moves.append(((x, y), obj.color, 1))
+        for pos, new_color, cost in moves:
+            obj = grid.get(*pos)
+            if isinstance(obj, (Wall, Lava)):
+                continue
+            if isinstance(obj, Door) and obj.is_locked and obj.color != new_color:
+                continue
+            if (pos, new_color) not in dist:
+                dist[pos, new_color] = dist[state] + cost
+                queue.append((pos, new_color))
+    return None
+
+
+def locked_doors(env):
+    grid = env.unwrapped.grid
+    return cells(grid, lambda obj: isinstance(obj, Door) and obj.is_locked)
+
+
+def test_reward_is_potential_difference(make_env):
+    env = shaped_env(make_env, scale=0.1, gamma=0.9)
+    rng = random.Random(0)
+    for _ in range(100):
+        before = env.potential()
+        assert env.distance() == nearest_victim(env)
+        _, reward, terminated, _, _ = env.step(rng.choice((0, 1, 2, 2, 3, 4, 5)))
+        after = 0.0 if terminated else env.potential()
+        base = reward - (0.9 * after - before)
+        # The bare env rewards are sparse: rescues, fakes and the lava
+        assert base == pytest.approx(round(base, 6))
+        if terminated:
+            env.reset()
+
+
+def test_locked_victims_go_through_the_key(make_env):
+    tested = 0
+    for seed in range(8):
+        env = shaped_env(make_env, seed)
+        assert locked_doors(env)
+        grid = env.unwrapped.grid
+        victims = {pos: grid.get(*pos) for pos in cells(grid, is_real)}
+        for pos in victims:
+            grid.set(*pos, None)
+        # Keep only the victims behind locked doors
+        locked = []
+        for pos, victim in victims.items():
+            grid.set(*pos, victim)
+            if nearest_victim(env, keys=False) is None:
+                locked.append(pos)
+            grid.set(*pos, None)
+        if not locked:
+            continue
+        for pos in locked:
+            grid.set(*pos, victims[pos])
+        env._scan()
+        assert env.distance() == nearest_victim(env) is not None
+        tested += 1
+    assert tested
+
+
+def test_carried_key_opens_its_doors(make_env):
+    env = shaped_env(make_env, 1)
+    base = env.unwrapped
+    x, y = locked_doors(env)[0]
+    color = base.grid.get(x, y).color
+    for pos in cells(base.grid, lambda obj: isinstance(obj, Key)):
+        base.grid.set(*pos, None)
+    env._scan()
+    assert env.distance() == nearest_victim(env, keys=False)
+
+    base.carrying = Key(color)
+    assert env.distance() == nearest_victim(env, held=color, keys=False)
+
+
+def test_fields_are_updated_in_place_on_events(make_env, monkeypatch):
+    calls = []
+    bfs = shaping_module.layered_bfs
+
+    def counting_bfs(*args):
+        calls.append(1)
+        return bfs(*args)
+
+    monkeypatch.setattr(shaping_module, "layered_bfs", counting_bfs)
+    env = shaped_env(make_env)
+    base = env.unwrapped
+    built = len(calls)
+    assert built > 0
+    for _ in range(4):
+        env.step(base.actions.left)
+    assert len(calls) == built
+
+    for pos in cells(base.grid, is_real)[:2]:
+        victim = base.grid.get(*pos)
+        base.grid.set(*pos, None)
+        base.events.emit(shaping_module.VictimRescued, pos, victim)
+        env.step(base.actions.left)
+        assert env.distance() == nearest_victim(env)
+    assert len(calls) == built
+
+
+def test_unlocked_doors_open_the_fields(make_env):
+    for seed in range(4):
+        env = shaped_env(make_env, seed)
+        base = env.unwrapped
+        doors = locked_doors(env)
+        colors = [base.grid.get(*pos).color for pos in doors]
+        # Build the fields of the carried keys before the doors open
+        for color in colors:
+            base.carrying = Key(color)
+            env.distance()
+        base.carrying = None
+        for pos in doors:
+            door = base.grid.get(*pos)
+            door.is_locked = False
+            base.events.emit(shaping_module.DoorUnlocked, pos, door)
+            assert env.distance() == nearest_victim(env)
+        for color in colors:
+            base.carrying = Key(color)
+            assert env.distance() == nearest_victim(env, held=color)
+
+
+def test_no_penalty_once_every_victim_is_gone(make_env):
+    env = shaped_env(make_env)
+    base = env.unwrapped
+    for pos in cells(base.grid, is_real):
+        victim = base.grid.get(*pos)
+        base.grid.set(*pos, None)
+        base.events.emit(shaping_module.VictimLost, pos, victim)
+    assert env.potential() == 0.0
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test environment snapshots and restores.
+"""
+
+import random
+
+import pytest
+
+ENV_KWARGS = {"num_fake_victims": 3, "num_real_victims": 2}
+
+
+def state(env):
+    return (
+        env.grid.encode().tobytes(),
+        tuple(int(v) for v in env.agent_pos),
+        env.agent_dir,
+        env.carrying,
+        env.saved_victims,
+        env.step_count,
+    )
+
+
+def play(env, rng, n):
+    """Random steps that pick up, drop and toggle often; returns the rewards."""
+    rewards = []
+    for _ in range(n):
+        _, reward, terminated, truncated, _ = env.step(
+            rng.choice((0, 1, 2, 2, 3, 4, 5))
+        )
+        rewards.append(reward)
+        if terminated or truncated:
+            break
+    return rewards
+
+
+def test_restore_ancestor_repeatedly(make_env):
+    env = make_env()
+    rng = random.Random(0)
+    play(env, rng, 10)
+    root = env.snapshot()
+    expected = state(env)
+
+    for _ in range(20):
+        play(env, rng, 30)
+        env.restore(root)
+        assert state(env) == expected
+
+
+def test_restore_other_branch(make_env):
+    env = make_env(1)
+    rng = random.Random(1)
+    root = env.snapshot()
+    play(env, rng, 40)
+    branch = env.snapshot()
+    expected = state(env)
+
+    env.restore(root)
+    play(env, rng, 40)
+    env.restore(branch)
+    assert state(env) == expected
+
+    # The root is no longer an ancestor after the full restore
+    env.restore(root)
+    assert env.step_count == 0
+
+
+def test_restored_episode_replays_identically(make_env):
+    env = make_env(2)
+    rng = random.Random(2)
+    play(env, rng, 5)
+    snap = env.snapshot()
+    actions = [rng.choice((0, 1, 2, 2, 3, 5)) for _ in range(60)]
+
+    first = [env.step(a)[1:4] for a in actions]
+    env.restore(snap)
+    second = [env.step(a)[1:4] for a in actions]
+
+    assert first == second
+
+
+def test_restore_after_reset_is_rejected(make_env):
+    env = make_env()
+    snap = env.snapshot()
+    env.reset()
+    with pytest.raises(ValueError):
+        env.restore(snap)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test the key-aware reachability solver and the local level repair.
+"""
+
+from minigrid.core.world_object import Door, Key, Lava, Wall
+
+from src.game.sar.objects import REAL_VICTIMS
+from src.game.sar.solver import solve_reachability
+
+
+def find(env, obj_types):
+    return [
+        (x, y)
+        for x in range(env.width)
+        for y in range(env.height)
+        if isinstance(env.grid.get(x, y), obj_types)
+    ]
+
+
+def test_generated_levels_are_solvable(make_env):
+    for seed in range(5):
+        env = make_env(seed)
+        result = solve_reachability(env)
+        assert result.solvable, result.describe()
+
+
+def test_reports_victim_walled_in_by_lava(make_env):
+    env = make_env(0)
+    x, y = find(env, REAL_VICTIMS)[0]
+    for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+        if not isinstance(env.grid.get(nx, ny), (Wall, Door)):
+            env.grid.set(nx, ny, Lava())
+
+    result = solve_reachability(env)
+
+    assert not result.solvable
+    assert (x, y) in [pos for pos, _ in result.unreachable]
+    assert f"at {(x, y)}" in result.describe()
+
+    env.ensure_solvable()
+    assert solve_reachability(env).solvable
+
+
+def test_key_locked_behind_its_own_door(make_env):
+    env = make_env(1)
+    doors = [pos for pos in find(env, Door) if env.grid.get(*pos).is_locked]
+    door = env.grid.get(*doors[0])
+    key_pos = next(p for p in find(env, Key) if env.grid.get(*p).color == door.color)
+
+    # Move the key into the room that its door locks
+    locked_room = next(
+        room
+        for row in env.room_grid
+        for room in row
+        if door in room.doors and room.locked
+    )
+    (tx, ty), (sx, sy) = locked_room.top, locked_room.size
+    dst = next(
+        (x, y)
+        for x in range(tx + 1, tx + sx - 1)
+        for y in range(ty + 1, ty + sy - 1)
+        if env.grid.get(x, y) is None
+    )
+    env.grid.set(*dst, env.grid.get(*key_pos))
+    env.grid.set(*key_pos, None)
+
+    result = solve_reachability(env)
+    assert not result.solvable
+    assert doors[0] not in result.opened
+
+    result = env.ensure_solvable()
+    assert result.solvable
+    assert doors[0] in result.opened
+
+
+def test_clears_only_the_lava_in_the_way(make_env):
+    env = make_env(0)
+    for pos in find(env, Door):
+        env.grid.get(*pos).is_locked = False
+    agent_room = env.room_from_pos(*env.agent_pos)
+    x, y = next(
+        p for p in find(env, REAL_VICTIMS) if env.room_from_pos(*p) is not agent_room
+    )
+
+    # Flood the victim's room with lava
+    room = env.room_from_pos(x, y)
+    (tx, ty), (sx, sy) = room.top, room.size
+    for cx in range(tx + 1, tx + sx - 1):
+        for cy in range(ty + 1, ty + sy - 1):
+            if env.grid.get(cx, cy) is None:
+                env.grid.set(cx, cy, Lava())
+    lava = len(find(env, Lava))
+    assert not solve_reachability(env).solvable
+
+    assert env.ensure_solvable().solvable
+    cleared = lava - len(find(env, Lava))
+    assert 0 < cleared <= min(abs(x - dx) + abs(y - dy) for dx, dy in find(env, Door))
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test the fully observable symbolic observation.
+"""
+
+import random
+
+import numpy as np
+
+from src.game.sar.objects import FakeVictim, Victim
+from src.game.sar.symbolic import CHANNELS, cell_features
+
+ENV_KWARGS = {
+    "num_fake_victims": 3,
+    "num_real_victims": 2,
+    "symbolic_obs": True,
+}
+
+
+def reference(env):
+    """Per-cell version of the symbolic observation."""
+    obs = np.zeros((env.height, env.width, len(CHANNELS)), dtype=np.uint8)
+    for x in range(env.width):
+        for y in range(env.height):
+            obs[y, x] = cell_features(env.grid.get(x, y))
+    x, y = env.agent_pos
+    obs[y, x, -1] = env.agent_dir + 1
+    return obs
+
+
+def test_matches_grid_after_random_steps(make_env):
+    env = make_env()
+    obs = env.get_obs()
+    assert env.observation_space["symbolic"].contains(obs["symbolic"])
+    np.testing.assert_array_equal(obs["symbolic"], reference(env))
+
+    rng = random.Random(0)
+    for _ in range(300):
+        obs, _, terminated, truncated, _ = env.step(rng.choice((0, 1, 2, 2, 3, 4, 5)))
+        np.testing.assert_array_equal(obs["symbolic"], reference(env))
+        if terminated or truncated:
+            obs, _ = env.reset()
+            np.testing.assert_array_equal(obs["symbolic"], reference(env))
+
+
+def test_type_and_color_match_minigrid_encoding(make_env):
+    env = make_env(1)
+    obs = env.get_obs()
+    encoded = env.grid.encode().transpose(1, 0, 2)
+    np.testing.assert_array_equal(obs["symbolic"][..., 0], encoded[..., 0])
+    np.testing.assert_array_equal(obs["symbolic"][..., 1], encoded[..., 1])
+
+
+def test_victim_channels(make_env):
+    env = make_env(2)
+    obs = env.get_obs()
+    symbolic = obs["symbolic"]
+    victim = CHANNELS.index("victim")
+    for x in range(env.width):
+        for y in range(env.height):
+            obj = env.grid.get(x, y)
+            if isinstance(obj, Victim):
+                assert symbolic[y, x, victim] == 1
+            elif isinstance(obj, FakeVictim):
+                assert symbolic[y, x, victim] == 2
+                assert symbolic[y, x, CHANNELS.index("shift")] in (1, 2)
+            else:
+                assert symbolic[y, x, victim] == 0
+
+
+def test_in_sync_after_step_fast_and_restore(make_env):
+    env = make_env(3)
+    snap = env.snapshot()
+    rng = random.Random(3)
+    for _ in range(50):
+        env.step_fast(rng.choice((0, 1, 2, 3, 4, 5)))
+    np.testing.assert_array_equal(env.get_obs()["symbolic"], reference(env))
+
+    env.restore(snap)
+    np.testing.assert_array_equal(env.get_obs()["symbolic"], reference(env))
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test the per-victim health timers.
+"""
+
+import numpy as np
+import pytest
+from minigrid.core.constants import DIR_TO_VEC
+
+from src.game.core.hazard import FireSpread
+from src.game.sar.health import VictimHealth
+from src.game.sar.multi_agent import MultiAgentRescueEnv
+from src.game.sar.objects import KIND_REAL
+
+ENV_KWARGS = {"add_lava": False, "num_fake_victims": 1, "num_real_victims": 1}
+
+
+def timers(lifetime=100):
+    return VictimHealth(initial=(1.0, 1.0), lifetime=(lifetime, lifetime))
+
+
+def face_victim(env, index):
+    """Put the agent on a free cell next to victim ``index``, facing it."""
+    x, y = env.victim_health.positions[index]
+    for direction, (dx, dy) in enumerate(DIR_TO_VEC):
+        cell = (int(x - dx), int(y - dy))
+        if env.grid.get(*cell) is None:
+            env.agent_pos, env.agent_dir = cell, direction
+            return
+    raise AssertionError("victim is boxed in")
+
+
+def test_health_decays_and_scales_the_reward(make_env):
+    env = make_env(victim_health=timers())
+    health = env.victim_health
+    assert len(health.positions) == env._count_objects_by_kind(KIND_REAL)
+    for _ in range(10):
+        env.step(env.actions.left)
+    assert np.allclose(health.health(), 0.9)
+
+    face_victim(env, 0)
+    _, reward, _, _, _ = env.step(env.actions.pickup)
+    assert reward == pytest.approx(0.9)
+    assert health.health()[0] == 0.0 and health.health()[1:].min() > 0
+
+
+def test_victims_are_lost_at_zero(make_env):
+    env = make_env(victim_health=timers(20))
+    victims = len(env.victim_health.positions)
+    for step in range(1, 21):
+        _, _, terminated, _, _ = env.step(env.actions.left)
+        assert terminated == (step == 20)
+    assert env._count_objects_by_kind(KIND_REAL) == 0
+    status = env.get_mission_status()
+    assert status["lost_victims"] == victims
+    assert status["remaining_victims"] == 0 and status["saved_victims"] == 0
+
+
+def test_team_loses_victims_on_the_same_step(make_env):
+    env = make_env(
+        env_class=MultiAgentRescueEnv, num_agents=2, victim_health=timers(20)
+    )
+    victims = len(env.victim_health.positions)
+    for step in range(1, 21):
+        _, _, terminated, _, _ = env.step([env.actions.left] * 2)
+        assert env.lost_victims == (victims if step == 20 else 0)
+        assert terminated == (step == 20)
+
+
+def test_lost_victims_leave_fuel(make_env):
+    env = make_env(
+        victim_health=timers(1), fire_spread=FireSpread(spread_probability=0.0)
+    )
+    positions = [tuple(pos) for pos in env.victim_health.positions.tolist()]
+    assert not any(env.fire_spread.fuel[pos] for pos in positions)
+    env.step(env.actions.left)
+    assert all(env.fire_spread.fuel[pos] for pos in positions)
+
+
+def test_restore_brings_lost_victims_back(make_env):
+    env = make_env(victim_health=timers(20))
+    victims = len(env.victim_health.positions)
+    face_victim(env, 0)
+    env.step(env.actions.pickup)
+    snapshot = env.snapshot()
+    for _ in range(25):
+        env.step(env.actions.left)
+    assert env.lost_victims == victims - 1
+
+    env.restore(snapshot)
+    assert env.lost_victims == 0 and env.saved_victims == 1
+    assert env.get_mission_status()["remaining_victims"] == victims - 1
+    assert env._count_objects_by_kind(KIND_REAL) == victims - 1
+    assert (env.victim_health.health()[1:] > 0).all()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test the victim flyweights and kind codes.
+"""
+
+import random
+
+from minigrid.core.world_object import Key, Wall
+
+from src.game.sar.env import PickupVictimEnv
+from src.game.sar.objects import (
+    KIND_FAKE,
+    KIND_OTHER,
+    KIND_REAL,
+    FakeVictim,
+    Victim,
+    kind_of,
+)
+from src.game.sar.utils import VictimPlacer
+
+
+def test_shared_instances_per_variant():
+    assert Victim.shared("up", color="red") is Victim.shared("up", color="red")
+    assert Victim.shared("up") is not Victim.shared("down")
+    fake = FakeVictim.shared("left", "up")
+    assert fake is FakeVictim.shared("left", "up")
+    assert fake is not FakeVictim.shared("right", "up")
+    assert fake.direction == "up"
+
+
+def test_shared_instances_keep_no_position():
+    victim = Victim.shared("up", color="red")
+    victim.init_pos = victim.cur_pos = (1, 2)
+    assert victim.init_pos is None and victim.cur_pos is None
+
+
+def test_kind_codes():
+    assert Victim("up").kind == KIND_REAL
+    assert FakeVictim("left", "up").kind == KIND_FAKE
+    assert kind_of(Wall()) == KIND_OTHER and kind_of(Key("red")) == KIND_OTHER
+    assert kind_of(None) == KIND_OTHER
+
+
+def test_level_shares_victim_objects():
+    random.seed(0)
+    env = PickupVictimEnv(
+        num_rows=2,
+        num_cols=2,
+        victim_placer=VictimPlacer(num_fake_victims=6, num_real_victims=2),
+        render_mode="rgb_array",
+    )
+    env.reset(seed=0)
+
+    fakes = env._find_objects_by_kind(KIND_FAKE)
+    assert len(fakes) == 6 * 4
+    # At most one object per fake variant (2 shifts x 4 directions)
+    assert len({id(obj) for obj in fakes}) <= 8
+    assert env._count_objects_by_kind(KIND_REAL) == len(env.get_all_victims())
+    assert all(obj.cur_pos is None for obj in fakes)